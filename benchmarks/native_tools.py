@@ -0,0 +1,92 @@
+"""Compare the TOOL:/INPUT: text protocol with native Ollama tool calling.
+
+Static mode (default) measures the prompt overhead of each mode for the
+registered tools. With --live it also runs a set of queries against a real
+Ollama server in both modes and reports model calls, prompt tokens and
+turns where a tool call could not be used.
+
+Usage:
+    python benchmarks/native_tools.py
+    python benchmarks/native_tools.py --live --model llama3.2
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from ollama_agent import TOOLS, OllamaAgent
+from ollama_agent.agent import _build_system_prompt, _tool_schema
+from ollama_agent.history import estimate_tokens
+from langchain_core.messages import SystemMessage
+
+QUERIES = [
+    "What time is it right now?",
+    "What's the weather in Paris and in Tokyo?",
+    "Calculate sqrt(1764) * 3",
+    "Give me a short summary of the Wikipedia article on Python (programming language).",
+    "What is my public IP address?",
+    "List the files in the current directory.",
+]
+
+
+def prompt_overhead() -> dict:
+    """Estimate tokens spent on tool instructions in each mode."""
+    text_prompt = _build_system_prompt(TOOLS)
+    native_prompt = _build_system_prompt(TOOLS, native_tools=True)
+    schemas = json.dumps([_tool_schema(name, info) for name, info in TOOLS.items()])
+    return {
+        "tools": len(TOOLS),
+        "text_prompt_tokens": estimate_tokens([SystemMessage(content=text_prompt)]),
+        "native_prompt_tokens": estimate_tokens([SystemMessage(content=native_prompt)]),
+        "native_schema_tokens": estimate_tokens([SystemMessage(content=schemas)]),
+    }
+
+
+def run_live(model: str, native: bool) -> dict:
+    """Run QUERIES in one mode and count model calls and prompt tokens."""
+    calls, prompt_tokens, unused_calls, latencies = 0, 0, 0, []
+
+    for query in QUERIES:
+        agent = OllamaAgent(model=model, native_tools=native, temperature=0)
+        original = agent._invoke_llm
+
+        def counting_invoke():
+            nonlocal calls, prompt_tokens, unused_calls
+            response = original()
+            calls += 1
+            prompt_tokens += response.response_metadata.get("prompt_eval_count") or 0
+            text = response.content or ""
+            if not native and "TOOL:" in text and not agent._parse_tool_calls(text):
+                unused_calls += 1
+            return response
+
+        agent._invoke_llm = counting_invoke
+        start = time.perf_counter()
+        agent.run(query)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "mode": "native" if native else "text",
+        "queries": len(QUERIES),
+        "model_calls": calls,
+        "prompt_tokens": prompt_tokens,
+        "unparsed_tool_turns": unused_calls,
+        "median_latency_s": round(statistics.median(latencies), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="run queries against Ollama")
+    parser.add_argument("--model", default=None, help="model for --live runs")
+    args = parser.parse_args()
+
+    print(json.dumps(prompt_overhead(), indent=2))
+    if args.live:
+        for native in (False, True):
+            print(json.dumps(run_live(args.model, native), indent=2))
+
+
+if __name__ == "__main__":
+    main()
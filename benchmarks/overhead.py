@@ -0,0 +1,400 @@
+"""Benchmarks of the library's own overhead, run against a fake Ollama.
+
+Usage:
+    python benchmarks/overhead.py --out bench.json
+    python benchmarks/overhead.py --out new.json --compare bench.json
+
+Measured:
+
+- ``loop_overhead``: agent-loop time per iteration with an in-process model,
+  i.e. everything but the model and the network
+- ``http_iteration``: the same loop through FakeOllama over HTTP
+- ``parse_tool_call``: tool-call parsing throughput on large responses
+- ``system_prompt``: system prompt building with hundreds of tools
+- ``throughput``: end-to-end runs/sec and latency at several concurrency
+  levels, against a FakeOllama with the given latency and token rate
+- ``import``: cold ``import ollama_agent`` time, and the time to import and
+  create an OllamaAgent, each in a fresh interpreter
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from langchain_core.messages import AIMessage
+
+from ollama_agent import __version__
+from ollama_agent.agent import OllamaAgent, _build_system_prompt
+from ollama_agent.metrics import Metrics
+from ollama_agent.testing import FakeOllama
+
+TOOL_CALL = "TOOL: echo\nINPUT: ping"
+FINAL_ANSWER = "All done, the echo tool answered."
+
+
+def _echo(text: str = "") -> str:
+    return text
+
+
+BENCH_TOOLS = {"echo": {"func": _echo, "description": "Echo the input back"}}
+
+# Dependencies that are only imported once something needs them
+LAZY_DEPENDENCIES = ("langchain_core", "langchain_ollama", "ollama", "ddgs", "httpx")
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+loaded = [name for name in {modules!r} if name in sys.modules]
+print(json.dumps({{"seconds": seconds, "loaded": loaded}}))
+"""
+
+
+def _measure(fn: Callable[[], Any], min_time: float, repeat: int) -> Dict[str, float]:
+    """Time fn, calling it in batches of at least min_time seconds.
+
+    Returns:
+        Dict with the best and median seconds per call, and calls per second
+    """
+    fn()  # warm up
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    median = statistics.median(samples)
+    return {"seconds": median, "best_seconds": min(samples), "ops_per_sec": 1 / median}
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _ScriptedModel:
+    """In-process chat model answering with tool calls, then a final answer."""
+
+    def __init__(self, tool_iterations: int):
+        self.tool_iterations = tool_iterations
+
+    def invoke(self, messages: List[Any]) -> AIMessage:
+        # Tool results come back as a user message; count the ones so far
+        done = sum(1 for m in messages if str(m.content).startswith("TOOL RESULT:"))
+        return AIMessage(content=TOOL_CALL if done < self.tool_iterations else FINAL_ANSWER)
+
+
+def _scripted_reply(tool_iterations: int) -> Callable[[List[Dict[str, Any]]], str]:
+    """FakeOllama reply function with the same script as _ScriptedModel."""
+
+    def reply(messages: List[Dict[str, Any]]) -> str:
+        done = sum(1 for m in messages if str(m.get("content", "")).startswith("TOOL RESULT:"))
+        return TOOL_CALL if done < tool_iterations else FINAL_ANSWER
+
+    return reply
+
+
+def bench_loop_overhead(
+    tool_iterations: int = 3, min_time: float = 0.2, repeat: int = 5
+) -> Dict[str, Any]:
+    """Agent-loop time per iteration with the model replaced in-process."""
+    agent = OllamaAgent(model="bench", tools=dict(BENCH_TOOLS), metrics=Metrics())
+    agent._chat_llm = _ScriptedModel(tool_iterations)
+
+    def run() -> None:
+        agent.reset()
+        agent.run("Echo ping")
+
+    result = _measure(run, min_time, repeat)
+    iterations = tool_iterations + 1
+    return {
+        "iterations_per_run": iterations,
+        "seconds_per_iteration": result["seconds"] / iterations,
+        "best_seconds_per_iteration": result["best_seconds"] / iterations,
+    }
+
+
+def bench_http_iteration(
+    tool_iterations: int = 3, min_time: float = 0.2, repeat: int = 5
+) -> Dict[str, Any]:
+    """Agent-loop time per iteration through a zero-latency FakeOllama."""
+    with FakeOllama(_scripted_reply(tool_iterations)) as fake:
+        agent = OllamaAgent(
+            model="bench", base_url=fake.url, tools=dict(BENCH_TOOLS), metrics=Metrics()
+        )
+
+        def run() -> None:
+            agent.reset()
+            agent.run("Echo ping")
+
+        result = _measure(run, min_time, repeat)
+    iterations = tool_iterations + 1
+    return {
+        "iterations_per_run": iterations,
+        "seconds_per_iteration": result["seconds"] / iterations,
+        "best_seconds_per_iteration": result["best_seconds"] / iterations,
+    }
+
+
+def bench_parse_tool_call(
+    sizes_kb: Iterable[int] = (1, 64, 1024), min_time: float = 0.2, repeat: int = 5
+) -> Dict[str, Any]:
+    """Tool-call parsing throughput on responses of the given sizes."""
+    agent = OllamaAgent(model="bench", tools=dict(BENCH_TOOLS), metrics=Metrics())
+    line = "The quick brown fox jumps over the lazy dog while thinking about tools.\n"
+    results = {}
+    for size in sizes_kb:
+        filler = line * (size * 1024 // len(line) + 1)
+        response = filler[: size * 1024] + "\n" + TOOL_CALL
+        assert agent._parse_tool_call(response) == ("echo", "ping")
+        result = _measure(lambda: agent._parse_tool_call(response), min_time, repeat)
+        results[f"{size}KB"] = {
+            "seconds": result["seconds"],
+            "mb_per_sec": len(response) / result["seconds"] / 1e6,
+        }
+    return results
+
+
+def bench_system_prompt(
+    tool_counts: Iterable[int] = (10, 100, 500), min_time: float = 0.2, repeat: int = 5
+) -> Dict[str, Any]:
+    """System prompt build time for registries of the given sizes."""
+    results = {}
+    for count in tool_counts:
+        tools = {
+            f"tool_{i}": {
+                "func": _echo,
+                "description": f"Tool number {i}; takes a query and returns a result",
+            }
+            for i in range(count)
+        }
+        result = _measure(lambda: _build_system_prompt(tools), min_time, repeat)
+        results[str(count)] = {"seconds": result["seconds"], "ops_per_sec": result["ops_per_sec"]}
+    return results
+
+
+def bench_throughput(
+    concurrency: Iterable[int] = (1, 4, 16),
+    latency: float = 0.02,
+    token_rate: float = 0.0,
+    runs_per_worker: int = 4,
+    tool_iterations: int = 1,
+) -> Dict[str, Any]:
+    """End-to-end runs/sec and latency against a FakeOllama.
+
+    Args:
+        concurrency: Concurrency levels to measure
+        latency: FakeOllama time to first token, in seconds
+        token_rate: FakeOllama tokens per second, 0 for no delay
+        runs_per_worker: Runs per concurrent worker at each level
+        tool_iterations: Tool calls per run before the final answer
+    """
+    token_delay = 1 / token_rate if token_rate > 0 else 0.0
+    results = {}
+    with FakeOllama(
+        _scripted_reply(tool_iterations), latency=latency, token_delay=token_delay
+    ) as fake:
+        agent = OllamaAgent(
+            model="bench", base_url=fake.url, tools=dict(BENCH_TOOLS), metrics=Metrics()
+        )
+        for level in concurrency:
+            queries = ["Echo ping"] * (level * runs_per_worker)
+            start = time.perf_counter()
+            latencies = [r.latency for r in agent.run_many(queries, concurrency=level)]
+            elapsed = time.perf_counter() - start
+            results[str(level)] = {
+                "runs_per_sec": len(queries) / elapsed,
+                "p50_seconds": _percentile(latencies, 0.5),
+                "p95_seconds": _percentile(latencies, 0.95),
+            }
+    return results
+
+
+def bench_import(repeat: int = 5) -> Dict[str, Any]:
+    """Cold import times, each measured in a fresh interpreter.
+
+    Returns:
+        Best seconds for ``import ollama_agent`` ("package") and for
+        importing and creating an OllamaAgent ("agent"), with the lazily
+        loaded dependencies each of them pulled in
+    """
+    statements = {
+        "package": "import ollama_agent",
+        "agent": "from ollama_agent import OllamaAgent\nOllamaAgent()",
+    }
+    results = {}
+    for name, statement in statements.items():
+        script = _IMPORT_SCRIPT.format(statement=statement, modules=LAZY_DEPENDENCIES)
+        samples = [
+            json.loads(
+                subprocess.run(
+                    [sys.executable, "-c", script], capture_output=True, text=True, check=True
+                ).stdout
+            )
+            for _ in range(repeat)
+        ]
+        results[name] = {
+            "best_seconds": min(sample["seconds"] for sample in samples),
+            "loaded": samples[-1]["loaded"],
+        }
+    return results
+
+
+def run_benchmarks(
+    only: Optional[Iterable[str]] = None,
+    quick: bool = False,
+    concurrency: Iterable[int] = (1, 4, 16),
+    latency: float = 0.02,
+    token_rate: float = 0.0,
+) -> Dict[str, Any]:
+    """Run the benchmark suite.
+
+    Args:
+        only: Names of the benchmarks to run (default: all)
+        quick: Shorter timings and smaller inputs, e.g. for CI smoke runs
+        concurrency: Concurrency levels for the throughput benchmark
+        latency: FakeOllama time to first token for the throughput benchmark
+        token_rate: FakeOllama tokens per second for the throughput benchmark
+
+    Returns:
+        Dict with "meta" (environment and options) and "benchmarks"
+    """
+    timing = {"min_time": 0.01, "repeat": 2} if quick else {"min_time": 0.2, "repeat": 5}
+    suite: Dict[str, Callable[[], Dict[str, Any]]] = {
+        "loop_overhead": lambda: bench_loop_overhead(**timing),
+        "http_iteration": lambda: bench_http_iteration(**timing),
+        "parse_tool_call": lambda: bench_parse_tool_call(
+            (1, 64) if quick else (1, 64, 1024), **timing
+        ),
+        "system_prompt": lambda: bench_system_prompt(
+            (10, 100) if quick else (10, 100, 500), **timing
+        ),
+        "throughput": lambda: bench_throughput(
+            concurrency, latency, token_rate, runs_per_worker=1 if quick else 4
+        ),
+        "import": lambda: bench_import(repeat=2 if quick else 5),
+    }
+    selected = list(only) if only else list(suite)
+    unknown = set(selected) - set(suite)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    return {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "options": {
+                "quick": quick,
+                "concurrency": list(concurrency),
+                "latency": latency,
+                "token_rate": token_rate,
+            },
+        },
+        "benchmarks": {name: suite[name]() for name in selected},
+    }
+
+
+def _flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Compare two benchmark results.
+
+    Args:
+        old: Earlier result of run_benchmarks
+        new: Later result of run_benchmarks
+
+    Returns:
+        One row per metric present in both, with old, new and change (a
+        fraction; positive means better, i.e. faster or higher throughput)
+    """
+    before = _flatten(old["benchmarks"])
+    after = _flatten(new["benchmarks"])
+    rows = []
+    for name in sorted(before.keys() & after.keys()):
+        a, b = before[name], after[name]
+        if not a or not b or name.endswith("iterations_per_run"):
+            continue
+        lower_is_better = "seconds" in name.rsplit(".", 1)[-1]
+        change = (a - b) / a if lower_is_better else (b - a) / a
+        rows.append({"metric": name, "old": a, "new": b, "change": change})
+    return rows
+
+
+def _print_results(result: Dict[str, Any]) -> None:
+    for name, value in _flatten(result["benchmarks"]).items():
+        print(f"{name:60} {value:.6g}")
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument(
+        "--only", action="append", help="Run only this benchmark (repeatable)"
+    )
+    parser.add_argument("--quick", action="store_true", help="Short smoke run")
+    parser.add_argument(
+        "--concurrency", default="1,4,16",
+        help="Comma-separated concurrency levels for the throughput benchmark",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.02,
+        help="Fake Ollama time to first token, in seconds",
+    )
+    parser.add_argument(
+        "--token-rate", type=float, default=0.0,
+        help="Fake Ollama tokens per second (0: no delay)",
+    )
+    args = parser.parse_args(argv)
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    try:
+        result = run_benchmarks(args.only, args.quick, levels, args.latency, args.token_rate)
+    except ValueError as e:
+        parser.error(str(e))
+    _print_results(result)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        print()
+        for row in compare(old, result):
+            print(
+                f"{row['metric']:60} {row['old']:12.6g} -> {row['new']:12.6g} "
+                f"{row['change']:+8.1%}"
+            )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,7 +30,9 @@ Configuration:
 
 __version__ = "0.1.4"
 
-from .agent import DEFAULT_SYSTEM_PROMPT, OllamaAgent
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 from .config import Config, config
 from .exceptions import (
     ApprovalDeniedError,
@@ -40,17 +42,91 @@ from .exceptions import (
     ToolNotFoundError,
     ToolRegistrationError,
 )
-from .tools import (
-    TOOLS,
-    get_all_tools,
-    get_approval_type,
-    get_tool,
-    is_command_blocked,
-    list_tools,
-    register_tool,
-    register_tool_func,
-    unregister_tool,
-)
+
+if TYPE_CHECKING:
+    from .agent import DEFAULT_SYSTEM_PROMPT, NATIVE_SYSTEM_PROMPT, OllamaAgent
+    from .batch import BatchResult
+    from .cache import DiskResponseCache, ResponseCache
+    from .endpoints import EndpointPool
+    from .executor import ToolExecutor, get_tool_executor
+    from .http_client import HTTPClient, get_http_client
+    from .metrics import Metrics, get_metrics
+    from .profiling import Profiler
+    from .retrieval import ToolIndex
+    from .scheduler import Scheduler, scheduling
+    from .server import AgentServer
+    from .sessions import SessionManager
+    from .store import ConversationStore
+    from .tracing import Trace, Tracer
+    from .tools import (
+        TOOLS,
+        RegistrySnapshot,
+        ToolRegistry,
+        get_all_tools,
+        get_approval_type,
+        get_tool,
+        is_command_blocked,
+        list_tools,
+        register_tool,
+        register_tool_func,
+        register_tools,
+        registry_version,
+        unregister_tool,
+    )
+
+# Everything else loads on first access, so ``import ollama_agent`` doesn't
+# pay for LangChain, httpx and the built-in tools before they are used
+_LAZY = {
+    "DEFAULT_SYSTEM_PROMPT": "agent",
+    "NATIVE_SYSTEM_PROMPT": "agent",
+    "OllamaAgent": "agent",
+    "BatchResult": "batch",
+    "DiskResponseCache": "cache",
+    "ResponseCache": "cache",
+    "EndpointPool": "endpoints",
+    "ToolExecutor": "executor",
+    "get_tool_executor": "executor",
+    "HTTPClient": "http_client",
+    "get_http_client": "http_client",
+    "Metrics": "metrics",
+    "get_metrics": "metrics",
+    "Profiler": "profiling",
+    "ToolIndex": "retrieval",
+    "Scheduler": "scheduler",
+    "scheduling": "scheduler",
+    "AgentServer": "server",
+    "SessionManager": "sessions",
+    "ConversationStore": "store",
+    "Trace": "tracing",
+    "Tracer": "tracing",
+    "TOOLS": "tools",
+    "RegistrySnapshot": "tools",
+    "ToolRegistry": "tools",
+    "get_all_tools": "tools",
+    "get_approval_type": "tools",
+    "get_tool": "tools",
+    "is_command_blocked": "tools",
+    "list_tools": "tools",
+    "register_tool": "tools",
+    "register_tool_func": "tools",
+    "register_tools": "tools",
+    "registry_version": "tools",
+    "unregister_tool": "tools",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __all__ = [
     # Version
@@ -58,19 +134,51 @@ __all__ = [
     # Main class
     "OllamaAgent",
     "DEFAULT_SYSTEM_PROMPT",
+    "NATIVE_SYSTEM_PROMPT",
+    "BatchResult",
+    # Caching
+    "ResponseCache",
+    "DiskResponseCache",
+    # Sessions
+    "ConversationStore",
+    "SessionManager",
+    "AgentServer",
+    # Scheduling
+    "Scheduler",
+    "scheduling",
+    # Endpoints
+    "EndpointPool",
+    # Metrics
+    "Metrics",
+    "get_metrics",
+    # Tracing
+    "Trace",
+    "Tracer",
+    # Profiling
+    "Profiler",
+    # HTTP
+    "HTTPClient",
+    "get_http_client",
     # Configuration
     "Config",
     "config",
     # Tool registry
     "TOOLS",
+    "ToolRegistry",
+    "RegistrySnapshot",
     "register_tool",
     "register_tool_func",
+    "register_tools",
+    "registry_version",
     "unregister_tool",
     "get_tool",
     "get_all_tools",
     "list_tools",
     "get_approval_type",
     "is_command_blocked",
+    "ToolIndex",
+    "ToolExecutor",
+    "get_tool_executor",
     # Exceptions
     "OllamaAgentError",
     "ToolNotFoundError",
@@ -1,13 +1,75 @@
 """Core agent module for ollama-agent."""
 
-from typing import Any, Callable, Dict, List, Optional, Tuple
-
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langchain_ollama import ChatOllama
-
+import asyncio
+import contextvars
+import copy
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import AbstractContextManager, asynccontextmanager, contextmanager, nullcontext, suppress
+from itertools import islice
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from .batch import BatchResult, run_many
+from .cache import DiskResponseCache, ResponseCache, make_cache_key
 from .config import Config, config as default_config
-from .exceptions import ToolNotFoundError
-from .tools import TOOLS, get_approval_type, register_tool_func, unregister_tool
+from .endpoints import Endpoint, EndpointPool, get_endpoint_pool
+from .exceptions import ConfigurationError, ToolNotFoundError
+from .executor import ToolExecutor, get_tool_executor
+from .history import (
+    SUMMARY_PROMPT,
+    TOOL_UPDATE_NAME,
+    HistoryCompactor,
+    is_summary,
+    is_tool_update,
+)
+from .metrics import Metrics, get_metrics
+from .profiling import Profiler, RunProfile, get_profiler
+from .retrieval import ToolIndex
+from .scheduler import (
+    BACKGROUND_PRIORITY,
+    DEFAULT_TENANT,
+    Scheduler,
+    current_request,
+    get_scheduler,
+)
+from .store import ConversationStore
+from .tracing import Trace, Tracer, get_tracer
+from .tools import (
+    TOOLS,
+    RegistrySnapshot,
+    get_approval_type,
+    register_tool_func,
+    register_tools,
+    registry_version,
+    tool_cache_hit,
+    unregister_tool,
+)
+
+if TYPE_CHECKING:
+    from langchain_ollama import ChatOllama
+
+
+def __getattr__(name: str) -> Any:
+    # langchain_ollama brings in the ollama client and most of LangChain, so
+    # it is imported when the first model is created, not with this module
+    if name == "ChatOllama":
+        from langchain_ollama import ChatOllama
+
+        globals()["ChatOllama"] = ChatOllama
+        return ChatOllama
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _chat_ollama(**kwargs: Any) -> "ChatOllama":
+    """Create a ChatOllama model, importing langchain_ollama on first use."""
+    chat_ollama = globals().get("ChatOllama") or __getattr__("ChatOllama")
+    return chat_ollama(**kwargs)
 
 
 # Default system prompt template - use {tools} placeholder for tool list
@@ -21,6 +83,8 @@ When you need to use a tool, your ENTIRE response must be ONLY these two lines:
 TOOL: <tool_name>
 INPUT: <input_value>
 
+To call several tools at once, repeat the two lines for each call.
+
 EXAMPLES:
 - To get current time:
 TOOL: get_current_time
@@ -38,13 +102,115 @@ INPUT:
 TOOL: weather
 INPUT: New York
 
+- To get weather in two cities:
+TOOL: weather
+INPUT: Paris
+TOOL: weather
+INPUT: London
+
 CRITICAL RULES:
-1. When using a tool, output ONLY the two lines above - nothing else
+1. When using tools, output ONLY the tool call lines - nothing else
 2. Do NOT write explanations before or after the tool call
 3. After receiving tool results, summarize them helpfully
 4. Use tools for: current time, weather, web searches, system info, calculations, file operations
 5. The tool name must match EXACTLY from the available tools list"""
 
+# System prompt for native tool calling - tools are sent as schemas, not text
+NATIVE_SYSTEM_PROMPT = """You are a helpful assistant with access to tools. You MUST use tools to answer questions that require real-time data, such as the current time, weather, web searches, system info, calculations and file operations.
+Call several tools at once when a question needs more than one result. After receiving tool results, summarize them helpfully."""
+
+
+# Line prefixes of the text tool-calling protocol
+_PROTOCOL_PREFIXES = ("TOOL:", "INPUT:")
+
+
+def _is_protocol_line(line: str) -> bool:
+    """Check whether a (possibly partial) line belongs to the tool protocol.
+
+    Args:
+        line: Line text without the trailing newline
+
+    Returns:
+        True if the line starts with, or could still become, a TOOL:/INPUT: line
+    """
+    if not line:
+        return False
+    return any(
+        line.startswith(prefix) or prefix.startswith(line) for prefix in _PROTOCOL_PREFIXES
+    )
+
+
+class _ToolCallScanner:
+    """Incrementally scan streamed model output for complete tool calls.
+
+    Text is fed chunk by chunk. Lines that belong to the TOOL:/INPUT:
+    protocol are held back, everything else is released to the caller as
+    soon as it can no longer turn into a protocol line. Once at least one
+    TOOL:/INPUT: pair is complete, the scanner keeps accepting further pairs
+    and marks the calls as complete as soon as the model starts writing
+    anything else.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.calls_end = 0
+        self.complete = False
+        self._line = ""
+        self._line_released = False
+        self._saw_tool = False
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk of streamed text.
+
+        Args:
+            chunk: Newly generated text
+
+        Returns:
+            The part of the chunk that is safe to show to the caller
+        """
+        start = len(self.text)
+        self.text += chunk
+        visible = []
+        for offset, char in enumerate(chunk):
+            if char == "\n":
+                if self._line_released:
+                    visible.append("\n")
+                elif not self._line.startswith(_PROTOCOL_PREFIXES):
+                    visible.append(self._line + "\n")
+                self._end_line(self._line, start + offset + 1)
+                self._line = ""
+                self._line_released = False
+            elif self._line_released:
+                visible.append(char)
+            else:
+                self._line += char
+                if not _is_protocol_line(self._line):
+                    visible.append(self._line)
+                    self._line_released = True
+                    if self.calls_end and self._line.strip():
+                        # The model moved on after its tool calls
+                        self.complete = True
+        if self.calls_end:
+            # Anything after a tool call is discarded, never shown
+            return ""
+        return "".join(visible)
+
+    def flush(self) -> str:
+        """Finish the stream and return any held-back, non-protocol text."""
+        line, self._line = self._line, ""
+        if self.calls_end:
+            return ""
+        if not self._line_released and not line.startswith(_PROTOCOL_PREFIXES):
+            return line
+        return ""
+
+    def _end_line(self, line: str, end: int) -> None:
+        """Track protocol state once a full line has been received."""
+        if line.startswith("TOOL:"):
+            self._saw_tool = True
+        elif line.startswith("INPUT:") and self._saw_tool:
+            self.calls_end = end
+
 
 def _format_tool_list(tools: Dict[str, Dict[str, Any]]) -> str:
     """Format tools dictionary into a string list.
@@ -60,19 +226,73 @@ def _format_tool_list(tools: Dict[str, Dict[str, Any]]) -> str:
     )
 
 
+def _format_tool_update(before: Dict[str, str], after: Dict[str, str]) -> Optional[str]:
+    """Describe a change to the tool list for a mid-conversation update.
+
+    Args:
+        before: Descriptions of the tools the model was last told about
+        after: Descriptions of the tools available now
+
+    Returns:
+        Message text, or None if nothing changed
+    """
+    added = {name: text for name, text in after.items() if before.get(name) != text}
+    removed = [name for name in before if name not in after]
+    if not added and not removed:
+        return None
+    lines = ["TOOLS UPDATED:"]
+    if added:
+        lines.append("Now available:")
+        lines.extend(f"- {name}: {text}" for name, text in added.items())
+    if removed:
+        lines.append(f"No longer available: {', '.join(removed)}")
+    return "\n".join(lines)
+
+
+def _tool_schema(name: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe a tool as an Ollama function-calling schema.
+
+    Args:
+        name: Tool name
+        info: Tool dictionary with "description"
+
+    Returns:
+        OpenAI-style function schema with a single optional "input" argument
+    """
+    # Kept minimal: the schemas are rendered into the prompt on every turn,
+    # and the tool description already explains the expected input
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": info["description"],
+            "parameters": {"type": "object", "properties": {"input": {"type": "string"}}},
+        },
+    }
+
+
 def _build_system_prompt(
     tools: Dict[str, Dict[str, Any]],
     custom_prompt: Optional[str] = None,
+    native_tools: bool = False,
 ) -> str:
     """Build system prompt with all available tools.
 
     Args:
         tools: Dictionary of tools to include in the prompt
         custom_prompt: Optional custom prompt template with {tools} placeholder
+        native_tools: If True, tools are sent as schemas, so the tool list is
+                      only inserted where a custom prompt asks for it
 
     Returns:
         Formatted system prompt string
     """
+    if native_tools:
+        prompt_template = custom_prompt or NATIVE_SYSTEM_PROMPT
+        if "{tools}" in prompt_template:
+            return prompt_template.format(tools=_format_tool_list(tools))
+        return prompt_template
+
     tool_list = _format_tool_list(tools)
     prompt_template = custom_prompt or DEFAULT_SYSTEM_PROMPT
 
@@ -84,6 +304,29 @@ def _build_system_prompt(
         return f"{prompt_template}\n\nAVAILABLE TOOLS:\n{tool_list}"
 
 
+# System prompts rendered from the global registry, shared by all agents:
+# (registry version, template, native_tools) -> prompt
+_prompt_cache: "OrderedDict[Tuple[int, Optional[str], bool], str]" = OrderedDict()
+_prompt_cache_lock = threading.Lock()
+_PROMPT_CACHE_SIZE = 32
+
+
+class _ToolRun:
+    """A tool call submitted to the worker pool."""
+
+    __slots__ = ("future", "claim", "tool_name", "timeout", "running", "started")
+
+    def __init__(self, tool_name: str, timeout: Optional[float]):
+        self.future: Optional[Future] = None
+        # Taken by whichever records the call: the worker, or the caller on timeout
+        self.claim = threading.Lock()
+        self.tool_name = tool_name
+        self.timeout = timeout
+        # Set once a worker picks the call up, at perf_counter() time started
+        self.running = threading.Event()
+        self.started = 0.0
+
+
 class OllamaAgent:
     """AI agent powered by Ollama with tool-calling capabilities.
 
@@ -120,6 +363,24 @@ class OllamaAgent:
         config: Optional[Config] = None,
         system_prompt: Optional[str] = None,
         num_predict: Optional[int] = None,
+        history_token_budget: Optional[int] = None,
+        keep_alive: Optional[Union[int, str]] = None,
+        warm_up: Optional[bool] = None,
+        seed: Optional[int] = None,
+        response_cache: Optional[ResponseCache] = None,
+        native_tools: Optional[bool] = None,
+        store: Optional[ConversationStore] = None,
+        session_id: Optional[str] = None,
+        scheduler: Optional[Scheduler] = None,
+        tenant: Optional[str] = None,
+        priority: int = 0,
+        endpoints: Optional[Union[List[str], EndpointPool]] = None,
+        metrics: Optional[Metrics] = None,
+        tracer: Optional[Tracer] = None,
+        profiler: Optional[Profiler] = None,
+        tool_top_k: Optional[int] = None,
+        tool_executor: Optional[ToolExecutor] = None,
+        tool_timeout: Optional[float] = None,
     ):
         """Initialize the Ollama agent.
 
@@ -130,13 +391,59 @@ class OllamaAgent:
             max_iterations: Max tool calls per query (default: from config or 10)
             approval_callback: Optional function(tool_name, tool_input) -> bool
                               Returns True if approved, False if denied.
-                              If None, tools run without approval.
+                              If None, tools run without approval. With
+                              arun() the callback may also be a coroutine.
             tools: Optional custom tools dictionary. If None, uses global TOOLS.
             config: Optional Config instance. If None, uses default config.
             system_prompt: Optional custom system prompt template. Use {tools}
                           placeholder to insert the tool list. If None, uses
                           DEFAULT_SYSTEM_PROMPT.
             num_predict: Maximum number of tokens to generate (default: -1 unlimited)
+            history_token_budget: Estimated prompt tokens above which older
+                                 turns are folded into a rolling summary in
+                                 the background (default: from config, 0 = off)
+            keep_alive: How long Ollama keeps the model loaded after a request,
+                       e.g. "30m", seconds, or -1 for forever
+                       (default: from config or Ollama's default)
+            warm_up: If True, call warm() in the background right away
+                    (default: from config or False)
+            seed: Optional sampling seed, makes output reproducible
+            response_cache: Optional cache for model responses. Only used
+                           when sampling is deterministic (temperature 0 or a
+                           fixed seed). Defaults to a DiskResponseCache when
+                           RESPONSE_CACHE_PATH is set.
+            native_tools: If True, send tools through Ollama's structured
+                         tool-calling API instead of the TOOL:/INPUT: text
+                         protocol. Requires a model with tool support.
+                         (default: from config or False)
+            store: Optional ConversationStore for saving and resuming
+                  conversations. Defaults to one at SESSION_STORE_PATH when set.
+            session_id: If given with a store, resume this session and append
+                       every new turn to its log
+            scheduler: Optional Scheduler that queues this agent's model
+                      calls fairly with other agents'. Defaults to the
+                      process-wide one when SCHEDULER_MAX_IN_FLIGHT is set.
+            tenant: Tenant this agent's model calls are accounted to
+                   (default: "default")
+            priority: Scheduling priority, higher runs first (default: 0)
+            endpoints: Several Ollama URLs, or an EndpointPool, to load balance
+                      model calls across instead of using base_url
+                      (default: from OLLAMA_BASE_URLS if set)
+            metrics: Registry recording model, tool and run metrics
+                    (default: the process-wide one unless METRICS_ENABLED=false)
+            tracer: Samples runs and keeps their span traces
+                   (default: the process-wide one if TRACE_DIR is set)
+            profiler: Profiles every Nth run's CPU time and allocations
+                     (default: the process-wide one if PROFILE_DIR is set)
+            tool_top_k: Put only the k tools most relevant to each query in
+                       the system prompt, picked by a local BM25 index over
+                       tool names and descriptions
+                       (default: from config, 0 = all tools)
+            tool_executor: Worker pool running this agent's tool calls
+                          (default: the process-wide pool of MAX_TOOL_WORKERS
+                          threads)
+            tool_timeout: Seconds to wait for a tool call that doesn't set its
+                         own timeout (default: from config, 0 = no limit)
         """
         self._config = config or default_config
 
@@ -146,6 +453,19 @@ class OllamaAgent:
         self._temperature = temperature if temperature is not None else self._config.temperature
         self._max_iterations = max_iterations or self._config.max_iterations
         self._system_prompt = system_prompt
+        self._num_predict = num_predict
+        self._seed = seed
+        self._native_tools = (
+            native_tools if native_tools is not None else self._config.native_tools
+        )
+
+        if isinstance(endpoints, list):
+            endpoints = EndpointPool(endpoints)
+        self.endpoints = endpoints if endpoints is not None else get_endpoint_pool()
+        if self.endpoints is not None and base_url is None:
+            self._base_url = self.endpoints.urls[0]
+        # Per-endpoint models, shared with forks: (url, with_tools) -> model
+        self._endpoint_llms: Dict[Tuple[str, bool], Any] = {}
 
         # Build ChatOllama kwargs
         llm_kwargs = {
@@ -155,23 +475,772 @@ class OllamaAgent:
         }
         if num_predict is not None:
             llm_kwargs["num_predict"] = num_predict
-
-        self.llm = ChatOllama(**llm_kwargs)
+        if seed is not None:
+            llm_kwargs["seed"] = seed
+        keep_alive = keep_alive if keep_alive is not None else self._config.keep_alive
+        if keep_alive is not None:
+            llm_kwargs["keep_alive"] = keep_alive
+
+        self._llm_kwargs = llm_kwargs
+        # Models created on first use and shared with forks: with_tools -> model
+        self._models: Dict[bool, Any] = {}
+
+        if response_cache is None and self._config.response_cache_path:
+            response_cache = DiskResponseCache(
+                self._config.response_cache_path,
+                max_bytes=self._config.response_cache_max_mb * 1024 * 1024,
+            )
+        self.response_cache = response_cache
+
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+        self.tenant = tenant or DEFAULT_TENANT
+        self.priority = priority
+
+        self.metrics = metrics if metrics is not None else get_metrics()
+        self._turn_started = 0.0
+        self._turn_calls = 0
+        # Between _begin_turn and _finish_run
+        self._turn_open = False
+
+        self.tracer = tracer if tracer is not None else get_tracer()
+        self._trace: Optional[Trace] = None
+        # Trace of the most recent traced run
+        self.last_trace: Optional[Trace] = None
+
+        self.profiler = profiler if profiler is not None else get_profiler()
+        self._profile: Optional[RunProfile] = None
+        # Profile of the most recent profiled run
+        self.last_profile: Optional[RunProfile] = None
 
         self.approval_callback = approval_callback
-        self._tools = tools if tools is not None else TOOLS
+        self._registry = tools if tools is not None else TOOLS
+        # Version of TOOLS a run sees from start to finish
+        self._pinned: Optional[RegistrySnapshot] = None
+        # Registry version the system prompt and tool updates reflect
+        self._tools_version = -1
+        # Shared by forks; threads are only started when a tool call needs one
+        self.tool_executor = tool_executor if tool_executor is not None else get_tool_executor()
+        self._tool_timeout = (
+            tool_timeout if tool_timeout is not None else self._config.tool_timeout
+        )
+        if store is None and self._config.session_store_path:
+            store = ConversationStore(self._config.session_store_path)
+        self.store = store
+        self._session_id: Optional[str] = None
+        # Messages up to this index are already in the session log
+        self._persisted = 1
+
+        if tool_top_k is None:
+            tool_top_k = self._config.tool_retrieval_top_k
+        self._tool_top_k = tool_top_k
+        self._tool_index: Optional[ToolIndex] = None
+        # Tools listed in the current system prompt, None for all of them
+        self._prompt_tools: Optional[List[str]] = None
+
+        # Nesting depth of updating_tools() and whether tools changed inside it
+        self._tool_updates = 0
+        self._tools_dirty = False
+
         self._messages: List = []
         self._rebuild_system_prompt()
+        if session_id is not None:
+            self.resume(session_id)
+
+        if history_token_budget is None:
+            history_token_budget = self._config.history_token_budget
+        self._compactor: Optional[HistoryCompactor] = None
+        if history_token_budget > 0:
+            self._compactor = HistoryCompactor(
+                self._summarize_history,
+                history_token_budget,
+                keep_recent=self._config.history_keep_recent,
+            )
+
+        self._warm_state: Optional[bool] = None
+        self._warm_error: Optional[Exception] = None
+        self._warm_thread: Optional[threading.Thread] = None
+        if warm_up if warm_up is not None else self._config.warm_up:
+            self.warm(background=True)
+
+    def _cache_key(self) -> Optional[str]:
+        """Return the response cache key for the current messages.
+
+        Returns:
+            Cache key, or None if there is no cache or sampling is random
+        """
+        if self.response_cache is None:
+            return None
+        if self._temperature != 0 and self._seed is None:
+            return None
+        options = {
+            "temperature": self._temperature,
+            "num_predict": self._num_predict,
+            "seed": self._seed,
+        }
+        if self._native_tools:
+            options["tools"] = {name: info["description"] for name, info in self._tools.items()}
+        return make_cache_key(self._model, options, self._messages)
+
+    def _response_to_cache(self, response: AIMessage) -> str:
+        """Serialize a model response for the response cache."""
+        if not self._native_tools:
+            return response.content
+        return json.dumps({"content": response.content, "tool_calls": response.tool_calls})
+
+    def _response_from_cache(self, cached: str) -> AIMessage:
+        """Rebuild a model response from the response cache."""
+        if not self._native_tools:
+            return AIMessage(content=cached)
+        data = json.loads(cached)
+        return AIMessage(content=data["content"], tool_calls=data["tool_calls"])
+
+    def _slot_args(self, background: bool) -> Tuple[str, int]:
+        """Tenant and priority for a model call, honoring scheduling()."""
+        tenant, priority = current_request()
+        if background:
+            priority = BACKGROUND_PRIORITY
+        elif priority is None:
+            priority = self.priority
+        return tenant or self.tenant, priority
+
+    def _slot(self, background: bool = False) -> AbstractContextManager:
+        """Hold a scheduler slot around a model call (no-op without a scheduler).
+
+        Args:
+            background: Schedule below all interactive requests
+        """
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(*self._slot_args(background))
+
+    @asynccontextmanager
+    async def _aslot(self) -> AsyncIterator[None]:
+        """Async version of _slot."""
+        if self.scheduler is None:
+            yield
+            return
+        async with self.scheduler.aslot(*self._slot_args(False)):
+            yield
+
+    def _endpoint_llm(self, endpoint: Endpoint, with_tools: bool = True) -> Any:
+        """Return the chat model talking to one endpoint of the pool."""
+        key = (endpoint.url, with_tools and self._native_tools)
+        llm = self._endpoint_llms.get(key)
+        if llm is None:
+            if key[1]:
+                llm = self._endpoint_llm(endpoint, False).bind_tools(self._tool_schemas())
+            else:
+                llm = _chat_ollama(**{**self._llm_kwargs, "base_url": endpoint.url})
+            self._endpoint_llms[key] = llm
+        return llm
+
+    def _call_model(self, call: Callable[[Any], Any], with_tools: bool = True) -> Any:
+        """Run a blocking model call, routed through the endpoint pool if any.
+
+        Args:
+            call: Function making the call on a chat model
+            with_tools: Use the model with tools bound (native mode)
+        """
+        if self.endpoints is None:
+            return call(self._chat_llm if with_tools else self.llm)
+        return self.endpoints.call(lambda ep: call(self._endpoint_llm(ep, with_tools)))
+
+    async def _acall_model(self, call: Callable[[Any], Any]) -> Any:
+        """Async version of _call_model, always with tools bound."""
+        if self.endpoints is None:
+            return await call(self._chat_llm)
+        return await self.endpoints.acall(lambda ep: call(self._endpoint_llm(ep)))
+
+    def _stream_model(self, with_tools: bool = True) -> Iterator[Any]:
+        """Stream the model's chunks for the current messages.
+
+        Args:
+            with_tools: Use the model with tools bound (native mode)
+        """
+        if self.endpoints is None:
+            llm = self._chat_llm if with_tools else self.llm
+            return llm.stream(self._messages)
+        return self.endpoints.stream(
+            lambda ep: self._endpoint_llm(ep, with_tools).stream(self._messages)
+        )
+
+    def _observe_llm(
+        self,
+        started: float,
+        metadata: Optional[Dict[str, Any]] = None,
+        ttft: Optional[float] = None,
+        cached: bool = False,
+        error: bool = False,
+    ) -> None:
+        """Count a model call towards the turn and record its metrics and span."""
+        self._turn_calls += 1
+        if self.metrics is not None:
+            self.metrics.record_llm(
+                self._model, time.perf_counter() - started, metadata, ttft, cached, error
+            )
+        if self._trace is not None:
+            counts = {
+                key: value for key, value in (metadata or {}).items()
+                if key in ("prompt_eval_count", "eval_count") and isinstance(value, int)
+            }
+            self._trace.add(
+                "llm", "llm", started, model=self._model, cached=cached or None,
+                error=error or None, ttft_ms=round(ttft * 1000, 3) if ttft else None, **counts
+            )
+
+    def _span(self, name: str, category: str, **args: Any) -> AbstractContextManager:
+        """Record a span in the current run's trace (no-op when not traced)."""
+        if self._trace is None:
+            return nullcontext(args)
+        return self._trace.span(name, category, **args)
+
+    def _finish_run(self, outcome: str) -> None:
+        """Record the metrics, trace and profile of the turn started by _begin_turn."""
+        self._turn_open = False
+        if self.metrics is not None:
+            self.metrics.record_run(
+                self._model, time.perf_counter() - self._turn_started, self._turn_calls, outcome
+            )
+        self._pinned = None
+        profile, self._profile = self._profile, None
+        if profile is not None:
+            info = {
+                "model": self._model,
+                "iterations": self._turn_calls,
+                "outcome": outcome,
+                "session_id": self._session_id,
+            }
+            if self.profiler is not None:
+                self.profiler.finish(profile, self._messages, **info)
+            else:
+                profile.finish(self._messages, **info)
+            self.last_profile = profile
+        trace, self._trace = self._trace, None
+        if trace is not None:
+            trace.add(
+                "run", "run", self._turn_started, model=self._model,
+                iterations=self._turn_calls, outcome=outcome, session_id=self._session_id,
+            )
+            self.last_trace = trace
+            if self.tracer is not None:
+                self.tracer.record(trace)
+
+    def _invoke_llm(self) -> AIMessage:
+        """Call the model on the current messages, consulting the cache.
+
+        Returns:
+            The model's response message
+        """
+        key = self._cache_key()
+        if key is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                self._observe_llm(time.perf_counter(), cached=True)
+                return self._response_from_cache(cached)
+
+        with self._slot():
+            started = time.perf_counter()
+            try:
+                response = self._call_model(lambda llm: llm.invoke(self._messages))
+            except Exception:
+                self._observe_llm(started, error=True)
+                raise
+        self._observe_llm(started, response.response_metadata)
+
+        if key is not None:
+            self.response_cache.set(key, self._response_to_cache(response))
+        return response
+
+    async def _ainvoke_llm(self) -> AIMessage:
+        """Async version of _invoke_llm."""
+        key = self._cache_key()
+        if key is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                self._observe_llm(time.perf_counter(), cached=True)
+                return self._response_from_cache(cached)
+
+        async with self._aslot():
+            started = time.perf_counter()
+            try:
+                response = await self._acall_model(lambda llm: llm.ainvoke(self._messages))
+            except Exception:
+                self._observe_llm(started, error=True)
+                raise
+        self._observe_llm(started, response.response_metadata)
+
+        if key is not None:
+            self.response_cache.set(key, self._response_to_cache(response))
+        return response
+
+    def _extract_tool_calls(self, response: AIMessage) -> List[Tuple[str, str]]:
+        """Get the tool calls requested by a model response.
+
+        Args:
+            response: The model's response message
+
+        Returns:
+            List of (tool_name, tool_input) tuples
+        """
+        with self._span("parse", "parse") as span:
+            if not self._native_tools:
+                calls = self._parse_tool_calls(response.content)
+            else:
+                calls = []
+                for call in response.tool_calls or []:
+                    args = call.get("args") or {}
+                    tool_input = args.get("input")
+                    if tool_input is None and len(args) == 1:
+                        # Models sometimes rename the single argument
+                        tool_input = next(iter(args.values()))
+                    calls.append((call["name"], "" if tool_input is None else str(tool_input)))
+            span["calls"] = len(calls)
+        return calls
+
+    def _record_tool_turn(
+        self,
+        response: AIMessage,
+        tool_calls: List[Tuple[str, str]],
+        outcomes: List[Tuple[str, bool]],
+    ) -> None:
+        """Record a tool-calling response and its results in the conversation.
+
+        Args:
+            response: The model's response message
+            tool_calls: List of (tool_name, tool_input) tuples
+            outcomes: List of (result_string, was_executed_bool) per call
+        """
+        if not self._native_tools:
+            self._append_tool_results(response.content, tool_calls, outcomes)
+            return
+
+        self._messages.append(AIMessage(content=response.content, tool_calls=response.tool_calls))
+        for call, (result, _) in zip(response.tool_calls, outcomes):
+            self._messages.append(
+                ToolMessage(content=str(result), tool_call_id=call.get("id") or call["name"])
+            )
+
+    def _stream_llm(self, cached: Optional[str] = None) -> Iterator[str]:
+        """Stream the model's response text for the current messages.
+
+        Closing this generator early cancels the underlying generation.
+
+        Args:
+            cached: Cached response to replay as a single chunk instead
+
+        Yields:
+            Chunks of response text
+        """
+        if cached is not None:
+            self._observe_llm(time.perf_counter(), cached=True)
+            yield cached
+            return
+
+        with self._slot():
+            started = time.perf_counter()
+            ttft = metadata = None
+            error = False
+            stream = self._stream_model(with_tools=False)
+            try:
+                for chunk in stream:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    if chunk.response_metadata.get("done"):
+                        metadata = chunk.response_metadata
+                    yield chunk.content or ""
+            except Exception:
+                error = True
+                raise
+            finally:
+                stream.close()
+                # A generation cancelled after its tool calls has no metadata
+                self._observe_llm(started, metadata, ttft, error=error)
+
+    def warm(self, background: bool = False) -> Optional[bool]:
+        """Load the model into Ollama and prefill the system prompt.
+
+        Sends the system prompt alone with a one-token generation limit, so
+        Ollama loads the model (honouring ``keep_alive``) and caches the
+        prompt's KV prefix. Later requests that start with the same system
+        prompt reuse that prefix instead of evaluating it again.
+
+        Args:
+            background: If True, warm up in a daemon thread and return at once
+
+        Returns:
+            True if the warm-up succeeded, False if it failed, or None when
+            running in the background (see is_warm / wait_until_warm)
+
+        Example:
+            >>> agent = OllamaAgent(keep_alive="30m")
+            >>> agent.warm()
+            True
+        """
+        if background:
+            self._warm_thread = threading.Thread(
+                target=self._warm, name="ollama-agent-warm", daemon=True
+            )
+            self._warm_thread.start()
+            return None
+        return self._warm()
+
+    def _warm(self) -> bool:
+        """Run the warm-up request and record its outcome."""
+        try:
+            if self.endpoints is None:
+                llms = [self.llm]
+            else:
+                # Every node needs the model loaded
+                llms = [self._endpoint_llm(ep, False) for ep in self.endpoints.endpoints]
+            for llm in llms:
+                # Same client and load options, but stop after the first token
+                warm_llm = llm.model_copy(update={"num_predict": 1})
+                if self._native_tools:
+                    # Tool schemas are rendered into the prompt, warm them too
+                    warm_llm = warm_llm.bind_tools(self._tool_schemas())
+                with self._slot(background=True):
+                    warm_llm.invoke([self._messages[0]])
+        except Exception as e:
+            self._warm_error = e
+            self._warm_state = False
+            return False
+        self._warm_error = None
+        self._warm_state = True
+        return True
+
+    def wait_until_warm(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a background warm-up to finish.
+
+        Args:
+            timeout: Max seconds to wait (default: no limit)
+
+        Returns:
+            True if the model is warm
+        """
+        if self._warm_thread is not None:
+            self._warm_thread.join(timeout)
+        return self.is_warm
+
+    @property
+    def llm(self) -> Any:
+        """The chat model, created on the first call."""
+        llm = self._models.get(False)
+        if llm is None:
+            llm = self._models.setdefault(False, _chat_ollama(**self._llm_kwargs))
+        return llm
+
+    @llm.setter
+    def llm(self, llm: Any) -> None:
+        self._models = {False: llm}
+
+    @property
+    def _chat_llm(self) -> Any:
+        """The chat model used for agent turns, with tools bound in native mode."""
+        llm = self._models.get(True)
+        if llm is None:
+            llm = self.llm.bind_tools(self._tool_schemas()) if self._native_tools else self.llm
+            llm = self._models.setdefault(True, llm)
+        return llm
+
+    @_chat_llm.setter
+    def _chat_llm(self, llm: Any) -> None:
+        self._models = {**self._models, True: llm}
+
+    @property
+    def is_warm(self) -> bool:
+        """Whether a warm-up has completed successfully."""
+        return self._warm_state is True
+
+    @property
+    def warm_error(self) -> Optional[Exception]:
+        """The exception raised by the last failed warm-up, if any."""
+        return self._warm_error
+
+    def _full_system_prompt(self) -> str:
+        """Return the system prompt listing every tool.
+
+        Prompts for the global registry are rendered once per registry
+        version and reused by reset() and by every new agent.
+        """
+        if self._registry is not TOOLS:
+            return _build_system_prompt(self._registry, self._system_prompt, self._native_tools)
+        snapshot = self._pinned if self._pinned is not None else TOOLS.snapshot()
+        key = (snapshot.version, self._system_prompt, self._native_tools)
+        with _prompt_cache_lock:
+            prompt = _prompt_cache.get(key)
+        if prompt is None:
+            prompt = _build_system_prompt(snapshot.tools, self._system_prompt, self._native_tools)
+            with _prompt_cache_lock:
+                # Another agent may have rendered it meanwhile; keep the first
+                prompt = _prompt_cache.setdefault(key, prompt)
+                if len(_prompt_cache) > _PROMPT_CACHE_SIZE:
+                    _prompt_cache.popitem(last=False)
+        return prompt
 
     def _rebuild_system_prompt(self) -> None:
-        """Rebuild the system prompt with current tools."""
-        prompt = _build_system_prompt(self._tools, self._system_prompt)
-        self._messages = [SystemMessage(content=prompt)]
+        """Start a new conversation with a system prompt for the current tools."""
+        if self._session_id is not None and len(self._messages) > 1:
+            self.store.clear(self._session_id)
+        self._messages = []
+        self._persisted = 1
+        self._prompt_tools = None
+        self._index_tools()
+        self._set_system_prompt()
+
+    def _update_tools(self) -> None:
+        """Apply a change to the tool set without losing the conversation.
+
+        Before the first turn the system prompt is simply rendered again.
+        After it, the system prompt stays as it is, so Ollama can keep
+        reusing the prompt prefix it has cached. The added and removed tools
+        are announced in a tool update message appended to the history.
+        """
+        if self._pinned is not None:
+            # The agent changed its own tools mid-run; the run sees the change
+            self._pinned = TOOLS.snapshot()
+        self._index_tools()
+        if len(self._messages) == 1:
+            self._set_system_prompt()
+            return
+        self._unbind_tools()
+        self._tools_version = self._current_version()
+        listed = {name: info["description"] for name, info in self._prompt_tool_dict().items()}
+        update = _format_tool_update(self._listed_tools, listed)
+        if update is not None:
+            self._messages.append(SystemMessage(content=update, name=TOOL_UPDATE_NAME))
+            self._listed_tools = listed
+            self._prompt_outdated = True
+
+    def _set_system_prompt(self) -> None:
+        """Render the system prompt for the tools it should list, in place."""
+        # Read before rendering, so a concurrent change is caught next turn
+        self._tools_version = self._current_version()
+        if self._prompt_tools is None:
+            prompt = self._full_system_prompt()
+        else:
+            prompt = _build_system_prompt(
+                self._prompt_tool_dict(), self._system_prompt, self._native_tools
+            )
+        self._messages[:1] = [SystemMessage(content=prompt)]
+        # Tools the model has been told about, by the prompt and any updates
+        self._listed_tools = {
+            name: info["description"] for name, info in self._prompt_tool_dict().items()
+        }
+        self._prompt_outdated = False
+        self._unbind_tools()
+
+    @property
+    def _tools(self) -> Mapping[str, Dict[str, Any]]:
+        """The tools this agent sees, pinned to one version of TOOLS during a run."""
+        pinned = self._pinned
+        return pinned.tools if pinned is not None else self._registry
+
+    def _current_version(self) -> int:
+        """Version of the tools this agent sees (0 for a custom tools dict)."""
+        if self._pinned is not None:
+            return self._pinned.version
+        return registry_version() if self._registry is TOOLS else 0
+
+    def _index_tools(self) -> None:
+        """Index the tools for retrieval, if enabled and worth it."""
+        # Built here so forks share it; rebuilt by _select_tools if TOOLS changes
+        if self._tool_top_k and len(self._tools) > self._tool_top_k:
+            self._tool_index = ToolIndex(self._tools)
+
+    def _unbind_tools(self) -> None:
+        """Drop the models with tools bound after the tool list changed."""
+        self._models = {k: v for k, v in self._models.items() if not k}
+        if self._native_tools:
+            self._endpoint_llms = {k: v for k, v in self._endpoint_llms.items() if not k[1]}
+
+    def _prompt_tool_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return the tools listed in the current system prompt."""
+        if self._prompt_tools is None:
+            return self._tools
+        return {name: self._tools[name] for name in self._prompt_tools if name in self._tools}
+
+    def _show_tools(self, names: Optional[List[str]]) -> None:
+        """List only these tools (None: all of them) in the system prompt.
+
+        In native mode the model's tool bindings follow the same subset.
+        """
+        if names == self._prompt_tools:
+            return
+        self._prompt_tools = names
+        self._set_system_prompt()
+
+    def _select_tools(self, query: str) -> None:
+        """Narrow the system prompt to the tools most relevant to a query."""
+        if not self._tool_top_k or len(self._tools) <= self._tool_top_k:
+            self._show_tools(None)
+            return
+        with self._span("tool_retrieval", "retrieval") as span:
+            index = self._tool_index
+            if index is None or not index.matches(self._tools):
+                index = self._tool_index = ToolIndex(self._tools)
+            names = index.search(query, self._tool_top_k)
+            span["tools"] = len(names)
+        self._show_tools(names)
+
+    def _unknown_tool(self, tool_name: str) -> str:
+        """Result for a call to a tool that doesn't exist.
+
+        If tool retrieval left tools out of the prompt, the rest of the turn
+        falls back to the full list in case the right one was among them.
+        """
+        if self._prompt_tools is None:
+            return f"Unknown tool: {tool_name}"
+        self._show_tools(None)
+        return f"Unknown tool: {tool_name}. The system prompt now lists all available tools."
+
+    def _tool_schemas(self) -> List[Dict[str, Any]]:
+        """Return function-calling schemas for the tools in the system prompt."""
+        return [_tool_schema(name, info) for name, info in self._prompt_tool_dict().items()]
+
+    def _fork(self) -> "OllamaAgent":
+        """Create an agent with a fresh conversation sharing this agent's setup.
+
+        The model client, tools, config and system prompt are shared; only
+        the message history is new.
+
+        Returns:
+            A new OllamaAgent instance
+        """
+        forked = copy.copy(self)
+        forked._messages = [self._messages[0]]
+        if self._prompt_outdated:
+            # Tools changed after the first turn reached this agent only as
+            # tool updates, which the fork doesn't keep
+            forked._set_system_prompt()
+        forked._session_id = None
+        forked._persisted = 1
+        if self._compactor is not None:
+            forked._compactor = self._compactor.fork()
+        return forked
+
+    def _summarize_history(self, messages: List) -> str:
+        """Summarize older messages with the agent's model.
+
+        Args:
+            messages: Messages to fold into the rolling summary
+
+        Returns:
+            Summary text
+        """
+        lines = []
+        for msg in messages:
+            if is_tool_update(msg):
+                continue
+            if is_summary(msg):
+                lines.append(f"Earlier summary: {msg.content}")
+            elif isinstance(msg, AIMessage):
+                lines.append(f"Assistant: {msg.content}")
+            elif isinstance(msg, ToolMessage):
+                lines.append(f"Tool result: {msg.content}")
+            else:
+                lines.append(f"User: {msg.content}")
+        with self._slot(background=True):
+            prompt = [SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content="\n\n".join(lines))]
+            response = self._call_model(lambda llm: llm.invoke(prompt), with_tools=False)
+        return response.content
+
+    def resume(self, session_id: str) -> None:
+        """Switch to a stored session, replacing the current conversation.
+
+        Only the live part of the session is loaded (from its last summary
+        on). New turns are appended to the session log as they finish.
+
+        Args:
+            session_id: Session to resume; a new session starts empty
+
+        Raises:
+            ConfigurationError: If the agent has no store
+        """
+        if self.store is None:
+            raise ConfigurationError("resume() needs a ConversationStore (store=...)")
+        loaded = self.store.load(session_id)
+        self._session_id = session_id
+        self._messages = [self._messages[0]] + loaded
+        self._persisted = len(self._messages)
+
+    @property
+    def session_id(self) -> Optional[str]:
+        """Id of the stored session this agent writes to, if any."""
+        return self._session_id
+
+    def _persist(self) -> None:
+        """Append messages not yet in the session log."""
+        if self._session_id is None:
+            return
+        # Tool updates describe this process's tools; a resumed session gets
+        # a fresh system prompt instead
+        pending = [m for m in self._messages[self._persisted:] if not is_tool_update(m)]
+        if pending:
+            self.store.append(self._session_id, pending)
+        self._persisted = len(self._messages)
+
+    def _compact_history(self, step: Callable[[List], Any]) -> None:
+        """Run a compactor step and log a summary marker if it compacted."""
+        before = self._compactor.compactions
+        step(self._messages)
+        if self._compactor.compactions != before and self._prompt_outdated:
+            # Tool updates may have been folded into the summary; the prefix
+            # is invalidated anyway, so list the current tools in the prompt
+            self._set_system_prompt()
+        if self._compactor.compactions != before and self._session_id is not None:
+            # Count only what _persist wrote: tool updates are not in the log
+            kept = sum(1 for m in self._messages[2:] if not is_tool_update(m))
+            self.store.append_summary(self._session_id, self._messages[1], kept)
+            self._persisted = len(self._messages)
+
+    def _begin_turn(self, query: str, trace: bool = False, profile: bool = False) -> None:
+        """Start a user turn, applying any finished history compaction first.
+
+        Args:
+            query: User query
+            trace: Trace the turn even if the tracer doesn't sample it
+            profile: Profile the turn even if it isn't the profiler's Nth
+        """
+        # Catch up on messages left by a turn that ended in an error
+        self._persist()
+        if self._compactor is not None:
+            self._compact_history(self._compactor.apply)
+        if self._registry is TOOLS:
+            self._pinned = TOOLS.snapshot()
+            if self._pinned.version != self._tools_version:
+                # Tools were registered or removed elsewhere since the last turn
+                self._update_tools()
+        self._messages.append(HumanMessage(content=query))
+        self._turn_started = time.perf_counter()
+        self._turn_calls = 0
+        self._turn_open = True
+        if trace:
+            self._trace = Trace()
+        else:
+            self._trace = self.tracer.sample() if self.tracer is not None else None
+        if self.profiler is not None:
+            self._profile = self.profiler.start(force=profile)
+        else:
+            self._profile = RunProfile() if profile else None
+        self._select_tools(query)
+
+    def _end_turn(self, response_text: Optional[str] = None) -> None:
+        """Finish a user turn and compact the history off the critical path.
+
+        Args:
+            response_text: Final answer to record, if any
+        """
+        if response_text is not None:
+            self._messages.append(AIMessage(content=response_text))
+        self._finish_run("ok" if response_text is not None else "max_iterations")
+        self._persist()
+        if self._compactor is not None:
+            self._compact_history(self._compactor.schedule)
 
     @property
     def tools(self) -> Dict[str, Dict[str, Any]]:
         """Get the current tools dictionary."""
-        return self._tools.copy()
+        return dict(self._tools)
 
     @property
     def model(self) -> str:
@@ -184,6 +1253,7 @@ class OllamaAgent:
         func: Callable,
         description: str,
         requires_approval: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> None:
         """Add a custom tool to this agent instance.
 
@@ -192,18 +1262,75 @@ class OllamaAgent:
             func: The function to call
             description: Description for the LLM
             requires_approval: Optional approval type ("commands" or "files")
+            timeout: Seconds to wait for a call (default: the agent's
+                     tool_timeout, 0 = no limit)
 
         Raises:
             ToolRegistrationError: If tool already exists
         """
-        if self._tools is TOOLS:
+        if self._registry is TOOLS:
             # Using global tools, need to register globally
-            register_tool_func(name, func, description, requires_approval)
+            register_tool_func(name, func, description, requires_approval, timeout=timeout)
         else:
             # Using custom tools dict
-            self._tools[name] = {"func": func, "description": description}
+            tool = {"func": func, "description": description}
+            if timeout is not None:
+                tool["timeout"] = timeout
+            self._registry[name] = tool
 
-        self._rebuild_system_prompt()
+        self._tools_changed()
+
+    def add_tools(self, tools: Dict[str, Dict[str, Any]]) -> None:
+        """Add several tools as a single tool update.
+
+        Args:
+            tools: Tools dictionary, name -> {"func", "description"} with an
+                  optional "requires_approval" ("commands" or "files") and
+                  "timeout"
+
+        Raises:
+            ToolRegistrationError: If a tool already exists; the tools before
+                                   it are still added
+        """
+        try:
+            if self._registry is TOOLS:
+                # One registry change instead of a copy per tool
+                register_tools(tools)
+            else:
+                entries = {}
+                for name, info in tools.items():
+                    tool = {"func": info["func"], "description": info["description"]}
+                    if info.get("timeout") is not None:
+                        tool["timeout"] = info["timeout"]
+                    entries[name] = tool
+                self._registry.update(entries)
+        finally:
+            self._tools_changed()
+
+    @contextmanager
+    def updating_tools(self) -> Iterator[None]:
+        """Apply a block of tool changes as one update when the block ends.
+
+        Example:
+            >>> with agent.updating_tools():
+            ...     agent.remove_tool("run_command")
+            ...     agent.add_tool("deploy", deploy, "Deploy a service by name")
+        """
+        self._tool_updates += 1
+        try:
+            yield
+        finally:
+            self._tool_updates -= 1
+            if not self._tool_updates and self._tools_dirty:
+                self._tools_dirty = False
+                self._update_tools()
+
+    def _tools_changed(self) -> None:
+        """Rebuild the system prompt after a tool change, unless deferred."""
+        if self._tool_updates:
+            self._tools_dirty = True
+        else:
+            self._update_tools()
 
     def remove_tool(self, name: str) -> None:
         """Remove a tool from this agent instance.
@@ -214,24 +1341,29 @@ class OllamaAgent:
         Raises:
             ToolNotFoundError: If tool doesn't exist
         """
-        if name not in self._tools:
+        if name not in self._registry:
             raise ToolNotFoundError(name)
 
-        if self._tools is TOOLS:
+        if self._registry is TOOLS:
             unregister_tool(name)
         else:
-            del self._tools[name]
+            del self._registry[name]
 
-        self._rebuild_system_prompt()
+        self._tools_changed()
 
-    def _parse_tool_call(self, response: str) -> Optional[Tuple[str, str]]:
-        """Parse tool call from response.
+    def _parse_tool_calls(self, response: str) -> List[Tuple[str, str]]:
+        """Parse all tool calls from a response.
+
+        Each TOOL: line starts a new call, and the INPUT: line that follows
+        it provides that call's input.
 
         Args:
             response: LLM response text
 
         Returns:
-            Tuple of (tool_name, tool_input) or None if no tool call
+            List of (tool_name, tool_input) tuples for known tools, in order.
+            While tool retrieval hides part of the registry, unknown names
+            are kept too so that _check_tool can fall back to all tools.
         """
         # If response contains JSON object, don't treat as tool call
         # This handles cases where model outputs both tool call and JSON
@@ -246,21 +1378,33 @@ class OllamaAgent:
                     depth -= 1
                     if depth == 0:
                         # Found complete JSON, don't parse as tool call
-                        return None
-
-        lines = response.strip().split("\n")
-        tool_name = None
-        tool_input = ""
+                        return []
 
-        for line in lines:
+        calls: List[List[str]] = []
+        for line in response.strip().split("\n"):
             if line.startswith("TOOL:"):
-                tool_name = line.replace("TOOL:", "").strip()
-            elif line.startswith("INPUT:"):
-                tool_input = line.replace("INPUT:", "").strip()
+                calls.append([line.replace("TOOL:", "").strip(), ""])
+            elif line.startswith("INPUT:") and calls:
+                calls[-1][1] = line.replace("INPUT:", "").strip()
 
-        if tool_name and tool_name in self._tools:
-            return (tool_name, tool_input)
-        return None
+        return [
+            (tool_name, tool_input)
+            for tool_name, tool_input in calls
+            if tool_name and (tool_name in self._tools or self._prompt_tools is not None)
+        ]
+
+    def _parse_tool_call(self, response: str) -> Optional[Tuple[str, str]]:
+        """Parse tool call from response.
+
+        Args:
+            response: LLM response text
+
+        Returns:
+            Tuple of (tool_name, tool_input) for the last tool call,
+            or None if no tool call
+        """
+        calls = self._parse_tool_calls(response)
+        return calls[-1] if calls else None
 
     def _needs_approval(self, tool_name: str) -> bool:
         """Check if a tool needs user approval.
@@ -271,7 +1415,10 @@ class OllamaAgent:
         Returns:
             True if approval is needed
         """
-        approval_type = get_approval_type(tool_name)
+        if self._pinned is not None:
+            approval_type = self._pinned.approvals.get(tool_name)
+        else:
+            approval_type = get_approval_type(tool_name)
         if not approval_type:
             return False
 
@@ -281,6 +1428,230 @@ class OllamaAgent:
             return self._config.require_approval_files
         return False
 
+    def _check_tool(self, tool_name: str, tool_input: str) -> Optional[str]:
+        """Check that a tool exists and is approved before running it.
+
+        Args:
+            tool_name: Name of the tool to execute
+            tool_input: Input to pass to the tool
+
+        Returns:
+            Result string explaining why the tool can't run, or None if it can
+        """
+        if tool_name not in self._tools:
+            return self._unknown_tool(tool_name)
+
+        if self._needs_approval(tool_name) and self.approval_callback:
+            with self._span("approval", "approval", tool=tool_name) as span:
+                span["approved"] = bool(self.approval_callback(tool_name, tool_input))
+            if not span["approved"]:
+                return "Tool execution denied by user."
+        return None
+
+    async def _acheck_tool(self, tool_name: str, tool_input: str) -> Optional[str]:
+        """Async version of _check_tool; the approval callback may be a coroutine."""
+        if tool_name not in self._tools:
+            return self._unknown_tool(tool_name)
+
+        if self._needs_approval(tool_name) and self.approval_callback:
+            with self._span("approval", "approval", tool=tool_name) as span:
+                approved = self.approval_callback(tool_name, tool_input)
+                if inspect.isawaitable(approved):
+                    approved = await approved
+                span["approved"] = bool(approved)
+            if not approved:
+                return "Tool execution denied by user."
+        return None
+
+    def _observe_tool(
+        self, tool_name: str, started: float, ok: bool, timed_out: bool = False
+    ) -> None:
+        """Record a tool call's metrics and span."""
+        cached = tool_cache_hit.get()
+        if self.metrics is not None:
+            self.metrics.record_tool(
+                tool_name, time.perf_counter() - started, ok, cached, timed_out
+            )
+        if self._trace is not None:
+            self._trace.add(
+                tool_name, "tool", started, ok=ok, cached=cached or None,
+                timed_out=timed_out or None,
+            )
+
+    def _timeout_for(self, tool_name: str) -> Optional[float]:
+        """Seconds to wait for a tool, or None for no limit."""
+        timeout = self._tools[tool_name].get("timeout")
+        if timeout is None:
+            timeout = self._tool_timeout
+        return timeout or None
+
+    @staticmethod
+    def _timed_out(tool_name: str, timeout: float) -> str:
+        return (
+            f"Tool timed out: {tool_name} did not finish within {timeout:g} seconds "
+            "and was cancelled."
+        )
+
+    @staticmethod
+    def _not_started(tool_name: str, timeout: float) -> str:
+        return (
+            f"Tool not run: {tool_name} waited {timeout:g} seconds for a free worker "
+            "and was cancelled. The tool pool is busy; try again later."
+        )
+
+    def _invoke_tool(self, tool_name: str, tool_input: str) -> Tuple[str, bool]:
+        """Run a tool, in the worker pool if it has a timeout."""
+        if self._timeout_for(tool_name) is None:
+            return self._call_tool(tool_name, tool_input)
+        return self._wait_tool(self._submit_tool(tool_name, tool_input))
+
+    def _submit_tool(self, tool_name: str, tool_input: str) -> _ToolRun:
+        """Start a tool call on the worker pool."""
+        run = _ToolRun(tool_name, self._timeout_for(tool_name))
+        context = contextvars.copy_context()
+        run.future = self.tool_executor.submit(
+            context.run, self._call_tool, tool_name, tool_input, run
+        )
+        return run
+
+    def _wait_tool(self, run: _ToolRun) -> Tuple[str, bool]:
+        """Wait for a submitted tool call until its timeout runs out.
+
+        The timeout runs from when a worker picks the call up, so calls
+        queued behind a busy pool aren't mistaken for hung ones. A call
+        still queued after the timeout is cancelled. A call that times out
+        while running is abandoned: its result, if it ever comes, is
+        dropped and the model gets a timed-out result instead.
+        """
+        if run.timeout is None:
+            return run.future.result()
+        queued_at = time.perf_counter()
+        if not run.running.wait(run.timeout) and run.future.cancel():
+            self.tool_executor.abandon(run.future)
+            token = tool_cache_hit.set(False)
+            self._observe_tool(run.tool_name, queued_at, False, timed_out=True)
+            tool_cache_hit.reset(token)
+            return self._not_started(run.tool_name, run.timeout), False
+        # Picked up by now, if only just
+        run.running.wait()
+        remaining = max(0.0, run.started + run.timeout - time.perf_counter())
+        try:
+            return run.future.result(remaining)
+        except FutureTimeoutError:
+            if not run.claim.acquire(blocking=False):
+                # It finished just now
+                return run.future.result()
+        self.tool_executor.abandon(run.future)
+        token = tool_cache_hit.set(False)
+        self._observe_tool(run.tool_name, run.started, False, timed_out=True)
+        tool_cache_hit.reset(token)
+        return self._timed_out(run.tool_name, run.timeout), False
+
+    def _call_tool(
+        self, tool_name: str, tool_input: str, run: Optional[_ToolRun] = None
+    ) -> Tuple[str, bool]:
+        """Call a tool's function, turning exceptions into error results.
+
+        Args:
+            tool_name: Name of the tool to execute
+            tool_input: Input to pass to the tool
+            run: The pool submission, if the call runs on a worker
+        """
+        started = time.perf_counter()
+        if run is not None:
+            run.started = started
+            run.running.set()
+        token = tool_cache_hit.set(False)
+        profiling = self._profile.thread() if self._profile is not None else nullcontext()
+        try:
+            with profiling:
+                func = self._tools[tool_name]["func"]
+                if tool_input:
+                    result = func(tool_input)
+                else:
+                    result = func()
+                if inspect.iscoroutine(result):
+                    result = asyncio.run(result)
+            outcome = (result, True)
+        except Exception as e:
+            outcome = (f"Tool error: {e}", False)
+        if run is None or run.claim.acquire(blocking=False):
+            self._observe_tool(tool_name, started, outcome[1])
+        tool_cache_hit.reset(token)
+        return outcome
+
+    async def _ainvoke_tool(self, tool_name: str, tool_input: str) -> Tuple[str, bool]:
+        """Await a tool, running sync functions in the worker pool.
+
+        Coroutine tools that time out are cancelled; sync ones are
+        abandoned in their worker thread. As in _wait_tool, the timeout of
+        a sync tool runs from when a worker picks the call up.
+        """
+        started = time.perf_counter()
+        token = tool_cache_hit.set(False)
+        tool_info = self._tools[tool_name]
+        func = tool_info.get("afunc") or tool_info["func"]
+        args = (tool_input,) if tool_input else ()
+        timeout = self._timeout_for(tool_name)
+
+        future: Optional[Future] = None
+        if not inspect.iscoroutinefunction(func):
+            loop = asyncio.get_running_loop()
+            running = asyncio.Event()
+
+            def work() -> Any:
+                with suppress(RuntimeError):
+                    loop.call_soon_threadsafe(running.set)
+                return func(*args)
+
+            # Run in a context we can read the cache hit flag back from
+            context = contextvars.copy_context()
+            future = self.tool_executor.submit(context.run, work)
+            if timeout is not None:
+                try:
+                    await asyncio.wait_for(running.wait(), timeout)
+                except asyncio.TimeoutError:
+                    if future.cancel():
+                        self.tool_executor.abandon(future)
+                        self._observe_tool(tool_name, started, False, timed_out=True)
+                        tool_cache_hit.reset(token)
+                        return self._not_started(tool_name, timeout), False
+                except asyncio.CancelledError:
+                    self.tool_executor.abandon(future)
+                    raise
+                started = time.perf_counter()
+
+        async def call() -> Tuple[Any, bool, bool]:
+            # Runs as its own task under wait_for, so it hands the cache hit
+            # flag back, and only a timeout of wait_for itself escapes
+            try:
+                if future is None:
+                    result = await func(*args)
+                else:
+                    try:
+                        result = await asyncio.wrap_future(future)
+                    except asyncio.CancelledError:
+                        self.tool_executor.abandon(future)
+                        raise
+                    if context[tool_cache_hit]:
+                        tool_cache_hit.set(True)
+                    if inspect.iscoroutine(result):
+                        result = await result
+                return result, True, tool_cache_hit.get()
+            except Exception as e:
+                return f"Tool error: {e}", False, tool_cache_hit.get()
+
+        try:
+            result, ok, cached = await asyncio.wait_for(call(), timeout)
+        except asyncio.TimeoutError:
+            self._observe_tool(tool_name, started, False, timed_out=True)
+            tool_cache_hit.reset(token)
+            return self._timed_out(tool_name, timeout), False
+        tool_cache_hit.set(cached)
+        self._observe_tool(tool_name, started, ok)
+        tool_cache_hit.reset(token)
+        return result, ok
+
     def _execute_tool(
         self, tool_name: str, tool_input: str
     ) -> Tuple[str, bool]:
@@ -293,35 +1664,147 @@ class OllamaAgent:
         Returns:
             Tuple of (result_string, was_executed_bool)
         """
-        tool_info = self._tools.get(tool_name)
-        if not tool_info:
-            return f"Unknown tool: {tool_name}", False
+        error = self._check_tool(tool_name, tool_input)
+        if error:
+            return error, False
+        return self._invoke_tool(tool_name, tool_input)
 
-        # Check approval
-        if self._needs_approval(tool_name) and self.approval_callback:
-            if not self.approval_callback(tool_name, tool_input):
-                return "Tool execution denied by user.", False
+    async def _aexecute_tool(
+        self, tool_name: str, tool_input: str
+    ) -> Tuple[str, bool]:
+        """Execute a tool without blocking the event loop.
 
-        try:
-            func = tool_info["func"]
-            if tool_input:
-                result = func(tool_input)
-            else:
-                result = func()
-            return result, True
-        except Exception as e:
-            return f"Tool error: {e}", False
+        Coroutine tools (and the native async variants of the built-in
+        network tools) are awaited directly, regular functions run in a
+        worker thread. The approval callback may be sync or async.
+
+        Args:
+            tool_name: Name of the tool to execute
+            tool_input: Input to pass to the tool
+
+        Returns:
+            Tuple of (result_string, was_executed_bool)
+        """
+        error = await self._acheck_tool(tool_name, tool_input)
+        if error:
+            return error, False
+        return await self._ainvoke_tool(tool_name, tool_input)
+
+    def _execute_tools(
+        self, tool_calls: List[Tuple[str, str]], verbose: bool = False
+    ) -> List[Tuple[str, bool]]:
+        """Execute one or more tool calls, running them concurrently.
+
+        Approvals are requested one at a time on the calling thread so
+        interactive callbacks never overlap; the approved calls then run
+        together in the agent's worker pool.
+
+        Args:
+            tool_calls: List of (tool_name, tool_input) tuples
+            verbose: If True, print tool execution info
+
+        Returns:
+            List of (result_string, was_executed_bool), in call order
+        """
+        outcomes: List[Optional[Tuple[str, bool]]] = []
+        for tool_name, tool_input in tool_calls:
+            if verbose:
+                print(f"\n[Tool: {tool_name}]")
+                if tool_input:
+                    print(f"[Input: {tool_input}]")
+            error = self._check_tool(tool_name, tool_input)
+            outcomes.append((error, False) if error else None)
+
+        runnable = [i for i, outcome in enumerate(outcomes) if outcome is None]
+        if len(runnable) == 1:
+            outcomes[runnable[0]] = self._invoke_tool(*tool_calls[runnable[0]])
+        elif runnable:
+            runs = {i: self._submit_tool(*tool_calls[i]) for i in runnable}
+            for i, run in runs.items():
+                outcomes[i] = self._wait_tool(run)
+
+        if verbose:
+            for (tool_name, _), (_, executed) in zip(tool_calls, outcomes):
+                print(f"[{tool_name}: {'Done' if executed else 'Skipped'}]\n")
+        return outcomes
+
+    async def _aexecute_tools(
+        self, tool_calls: List[Tuple[str, str]], verbose: bool = False
+    ) -> List[Tuple[str, bool]]:
+        """Async version of _execute_tools using asyncio.gather."""
+        outcomes: List[Optional[Tuple[str, bool]]] = []
+        for tool_name, tool_input in tool_calls:
+            if verbose:
+                print(f"\n[Tool: {tool_name}]")
+                if tool_input:
+                    print(f"[Input: {tool_input}]")
+            error = await self._acheck_tool(tool_name, tool_input)
+            outcomes.append((error, False) if error else None)
+
+        runnable = [i for i, outcome in enumerate(outcomes) if outcome is None]
+        results = await asyncio.gather(
+            *(self._ainvoke_tool(*tool_calls[i]) for i in runnable)
+        )
+        for i, result in zip(runnable, results):
+            outcomes[i] = result
+
+        if verbose:
+            for (tool_name, _), (_, executed) in zip(tool_calls, outcomes):
+                print(f"[{tool_name}: {'Done' if executed else 'Skipped'}]\n")
+        return outcomes
+
+    def _append_tool_results(
+        self,
+        response_text: str,
+        tool_calls: List[Tuple[str, str]],
+        outcomes: List[Tuple[str, bool]],
+    ) -> None:
+        """Record a tool-calling turn and all of its results in one message.
+
+        Args:
+            response_text: Model response containing the tool calls
+            tool_calls: List of (tool_name, tool_input) tuples
+            outcomes: List of (result_string, was_executed_bool) per call
+        """
+        if len(outcomes) == 1:
+            content = (
+                f"TOOL RESULT:\n{outcomes[0][0]}\n\n"
+                "Continue with your task based on this result."
+            )
+        else:
+            sections = [
+                f"[{i}] {tool_name}" + (f" ({tool_input})" if tool_input else "") + f":\n{result}"
+                for i, ((tool_name, tool_input), (result, _)) in enumerate(
+                    zip(tool_calls, outcomes), 1
+                )
+            ]
+            content = (
+                "TOOL RESULT:\n"
+                + "\n\n".join(sections)
+                + "\n\nContinue with your task based on these results."
+            )
+        self._messages.append(AIMessage(content=response_text))
+        self._messages.append(HumanMessage(content=content))
 
     def run(
         self,
         query: str,
         verbose: bool = False,
+        trace: bool = False,
+        profile: bool = False,
     ) -> str:
         """Run the agent with a query and return the response.
 
+        Several tool calls in one model response are executed concurrently
+        and their results are sent back together.
+
         Args:
             query: User query/prompt
             verbose: If True, print tool execution info
+            trace: If True, trace this run regardless of sampling; the
+                  trace is kept in ``last_trace``
+            profile: If True, profile this run's CPU time and memory; the
+                    profile is kept in ``last_profile``
 
         Returns:
             Final response string from the agent
@@ -331,62 +1814,307 @@ class OllamaAgent:
             >>> response = agent.run("What's 2 + 2?")
             >>> print(response)
         """
-        self._messages.append(HumanMessage(content=query))
+        self._begin_turn(query, trace, profile)
 
-        for _ in range(self._max_iterations):
-            try:
-                response = self.llm.invoke(self._messages)
-                response_text = response.content
+        try:
+            for _ in range(self._max_iterations):
+                try:
+                    response = self._invoke_llm()
+                    response_text = response.content
+
+                    tool_calls = self._extract_tool_calls(response)
+
+                    if tool_calls:
+                        outcomes = self._execute_tools(tool_calls, verbose)
+                        self._record_tool_turn(response, tool_calls, outcomes)
+                    else:
+                        self._end_turn(response_text)
+                        return response_text
+
+                except Exception as e:
+                    self._finish_run("error")
+                    return f"Error: {e}"
+
+            self._end_turn()
+            return "Max iterations reached."
+        finally:
+            # Interrupted before the turn ended, e.g. a cancelled task
+            if self._turn_open:
+                self._finish_run("cancelled")
+
+    async def arun(
+        self,
+        query: str,
+        verbose: bool = False,
+        trace: bool = False,
+        profile: bool = False,
+    ) -> str:
+        """Run the agent with a query on the running event loop.
+
+        Uses ``ChatOllama.ainvoke`` for model calls and awaits async tools, so
+        a single event loop can drive many conversations concurrently.
+
+        Args:
+            query: User query/prompt
+            verbose: If True, print tool execution info
+            trace: If True, trace this run regardless of sampling; the
+                  trace is kept in ``last_trace``
+            profile: If True, profile this run's CPU time and memory; the
+                    profile is kept in ``last_profile``
+
+        Returns:
+            Final response string from the agent
+
+        Example:
+            >>> agent = OllamaAgent()
+            >>> response = asyncio.run(agent.arun("What's 2 + 2?"))
+        """
+        self._begin_turn(query, trace, profile)
+
+        try:
+            for _ in range(self._max_iterations):
+                try:
+                    response = await self._ainvoke_llm()
+                    response_text = response.content
+
+                    tool_calls = self._extract_tool_calls(response)
+
+                    if tool_calls:
+                        outcomes = await self._aexecute_tools(tool_calls, verbose)
+                        self._record_tool_turn(response, tool_calls, outcomes)
+                    else:
+                        self._end_turn(response_text)
+                        return response_text
+
+                except Exception as e:
+                    self._finish_run("error")
+                    return f"Error: {e}"
+
+            self._end_turn()
+            return "Max iterations reached."
+        finally:
+            # Interrupted before the turn ended, e.g. a cancelled task
+            if self._turn_open:
+                self._finish_run("cancelled")
+
+    def run_stream(
+        self,
+        query: str,
+        verbose: bool = False,
+        trace: bool = False,
+        profile: bool = False,
+    ) -> Iterator[str]:
+        """Run the agent with a query, yielding response text as it is generated.
+
+        Tool calls are detected while the model is still generating. As soon
+        as the model moves on from its TOOL:/INPUT: lines the generation is
+        cancelled, the tools are executed and the next model turn is
+        streamed. Protocol lines themselves are not yielded.
 
-                tool_call = self._parse_tool_call(response_text)
+        Args:
+            query: User query/prompt
+            verbose: If True, print tool execution info
+            trace: If True, trace this run regardless of sampling; the
+                  trace is kept in ``last_trace``
+            profile: If True, profile this run's CPU time and memory; the
+                    profile is kept in ``last_profile``
 
-                if tool_call:
-                    tool_name, tool_input = tool_call
+        Yields:
+            Chunks of response text
 
-                    if verbose:
-                        print(f"\n[Tool: {tool_name}]")
-                        if tool_input:
-                            print(f"[Input: {tool_input}]")
+        Example:
+            >>> agent = OllamaAgent()
+            >>> for chunk in agent.run_stream("What's the weather in Paris?"):
+            ...     print(chunk, end="", flush=True)
+        """
+        self._begin_turn(query, trace, profile)
+        loop = self._run_stream_native if self._native_tools else self._run_stream_text
+        try:
+            yield from loop(verbose)
+        finally:
+            # Closed before the turn ended, e.g. the client disconnected
+            if self._turn_open:
+                self._finish_run("cancelled")
+
+    def _run_stream_text(self, verbose: bool = False) -> Iterator[str]:
+        """Streaming agent loop for the TOOL:/INPUT: text protocol."""
+        for _ in range(self._max_iterations):
+            scanner = _ToolCallScanner()
+            tool_calls: List[Tuple[str, str]] = []
+            try:
+                cache_key = self._cache_key()
+                cached = None
+                if cache_key is not None:
+                    cached = self.response_cache.get(cache_key)
+                stream = self._stream_llm(cached)
+                try:
+                    for chunk in stream:
+                        visible = scanner.feed(chunk)
+                        if visible:
+                            yield visible
+                        if scanner.complete:
+                            tool_calls = self._parse_tool_calls(scanner.text[:scanner.calls_end])
+                            if tool_calls:
+                                # Stop decoding tokens we would throw away
+                                break
+                finally:
+                    stream.close()
+
+                if tool_calls:
+                    response_text = scanner.text[:scanner.calls_end]
+                else:
+                    response_text = scanner.text
+                    tail = scanner.flush()
+                    if tail:
+                        yield tail
+                    tool_calls = self._parse_tool_calls(response_text)
+
+                if cache_key is not None and cached is None:
+                    self.response_cache.set(cache_key, response_text)
+
+                if tool_calls:
+                    outcomes = self._execute_tools(tool_calls, verbose)
+                    self._append_tool_results(response_text, tool_calls, outcomes)
+                else:
+                    self._end_turn(response_text)
+                    return
 
-                    result, executed = self._execute_tool(tool_name, tool_input)
+            except Exception as e:
+                self._finish_run("error")
+                yield f"Error: {e}"
+                return
+
+        self._end_turn()
+        yield "Max iterations reached."
 
-                    if verbose:
-                        print(f"[{'Done' if executed else 'Skipped'}]\n")
+    def _run_stream_native(self, verbose: bool = False) -> Iterator[str]:
+        """Streaming agent loop for native tool calling.
 
-                    self._messages.append(AIMessage(content=response_text))
-                    self._messages.append(
-                        HumanMessage(
-                            content=f"TOOL RESULT:\n{result}\n\nContinue with your task based on this result."
-                        )
+        Tool calls arrive as structured data at the end of a model turn, so
+        text is yielded as it comes and tools run once the turn is done.
+        """
+        for _ in range(self._max_iterations):
+            try:
+                cache_key = self._cache_key()
+                cached = None
+                if cache_key is not None:
+                    cached = self.response_cache.get(cache_key)
+
+                if cached is not None:
+                    self._observe_llm(time.perf_counter(), cached=True)
+                    response = self._response_from_cache(cached)
+                    if response.content:
+                        yield response.content
+                else:
+                    merged = None
+                    with self._slot():
+                        started = time.perf_counter()
+                        ttft = metadata = None
+                        try:
+                            for chunk in self._stream_model():
+                                if ttft is None:
+                                    ttft = time.perf_counter() - started
+                                if chunk.response_metadata.get("done"):
+                                    metadata = chunk.response_metadata
+                                merged = chunk if merged is None else merged + chunk
+                                if chunk.content:
+                                    yield chunk.content
+                        except Exception:
+                            self._observe_llm(started, metadata, ttft, error=True)
+                            raise
+                        self._observe_llm(started, metadata, ttft)
+                    response = AIMessage(
+                        content=merged.content if merged is not None else "",
+                        tool_calls=merged.tool_calls if merged is not None else [],
                     )
+                    if cache_key is not None:
+                        self.response_cache.set(cache_key, self._response_to_cache(response))
+
+                tool_calls = self._extract_tool_calls(response)
+                if tool_calls:
+                    outcomes = self._execute_tools(tool_calls, verbose)
+                    self._record_tool_turn(response, tool_calls, outcomes)
                 else:
-                    self._messages.append(AIMessage(content=response_text))
-                    return response_text
+                    self._end_turn(response.content)
+                    return
 
             except Exception as e:
-                return f"Error: {e}"
+                self._finish_run("error")
+                yield f"Error: {e}"
+                return
+
+        self._end_turn()
+        yield "Max iterations reached."
 
-        return "Max iterations reached."
+    def run_many(
+        self,
+        queries: Iterable[str],
+        concurrency: Optional[int] = None,
+        verbose: bool = False,
+    ) -> Iterator[BatchResult]:
+        """Run many independent queries concurrently.
+
+        Each query runs in its own fresh conversation; this agent's history
+        is left untouched. Results are yielded as soon as they complete, and
+        memory use stays constant no matter how long the input is.
+
+        Args:
+            queries: Iterable of query strings (may be a lazy generator)
+            concurrency: Max queries in flight (default: from config or 4)
+            verbose: If True, print tool execution info
+
+        Yields:
+            BatchResult with index, query, response and latency
+
+        Example:
+            >>> agent = OllamaAgent()
+            >>> for result in agent.run_many(["2 + 2?", "3 * 3?"], concurrency=2):
+            ...     print(result.index, result.latency, result.response)
+        """
+        if concurrency is None:
+            concurrency = self._config.batch_concurrency
+        return run_many(self, queries, concurrency, verbose=verbose)
 
     def reset(self) -> None:
         """Reset conversation history, keeping the system prompt."""
         self._rebuild_system_prompt()
 
-    def get_history(self) -> List[Dict[str, str]]:
-        """Get conversation history as a list of message dicts.
+    def iter_history(
+        self, offset: int = 0, limit: Optional[int] = None
+    ) -> Iterator[Dict[str, str]]:
+        """Iterate over the conversation history without copying it.
 
-        Returns:
-            List of {"role": str, "content": str} dicts
+        Args:
+            offset: Number of messages to skip (the system prompt is message 0)
+            limit: Max messages to yield (default: all)
+
+        Yields:
+            {"role": str, "content": str} dicts
         """
-        history = []
-        for msg in self._messages:
+        stop = None if limit is None else offset + limit
+        for msg in islice(self._messages, offset, stop):
             if isinstance(msg, SystemMessage):
                 role = "system"
             elif isinstance(msg, HumanMessage):
                 role = "user"
             elif isinstance(msg, AIMessage):
                 role = "assistant"
+            elif isinstance(msg, ToolMessage):
+                role = "tool"
             else:
                 role = "unknown"
-            history.append({"role": role, "content": msg.content})
-        return history
+            yield {"role": role, "content": msg.content}
+
+    def get_history(
+        self, offset: int = 0, limit: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """Get conversation history, or one page of it, as message dicts.
+
+        Args:
+            offset: Number of messages to skip (the system prompt is message 0)
+            limit: Max messages to return (default: all)
+
+        Returns:
+            List of {"role": str, "content": str} dicts
+        """
+        return list(self.iter_history(offset, limit))
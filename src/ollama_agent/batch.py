@@ -0,0 +1,76 @@
+"""Bounded-concurrency batch execution for ollama-agent."""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator
+
+
+@dataclass
+class BatchResult:
+    """Result of a single query from a batch run.
+
+    Attributes:
+        index: Position of the query in the input iterable
+        query: The query that was run
+        response: Final response string from the agent
+        latency: Wall time spent on this query, in seconds
+    """
+
+    index: int
+    query: str
+    response: str
+    latency: float
+
+
+def run_many(
+    agent: Any,
+    queries: Iterable[str],
+    concurrency: int,
+    verbose: bool = False,
+) -> Iterator[BatchResult]:
+    """Run independent queries with a bounded number in flight.
+
+    Queries are pulled lazily from the iterable, so at most ``concurrency``
+    queries and results are held in memory at any time regardless of the
+    input length. Each query runs in a fresh conversation forked from
+    ``agent``, sharing its model client, tools and system prompt.
+
+    Args:
+        agent: The OllamaAgent to fork a conversation from per query
+        queries: Iterable of query strings
+        concurrency: Maximum number of queries in flight
+        verbose: If True, print tool execution info
+
+    Yields:
+        BatchResult for each query, in completion order
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    def _run_one(index: int, query: str) -> BatchResult:
+        start = time.perf_counter()
+        response = agent._fork().run(query, verbose=verbose)
+        return BatchResult(index, query, response, time.perf_counter() - start)
+
+    pending_queries = enumerate(queries)
+    in_flight: Dict[Future, int] = {}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            for index, query in islice(pending_queries, concurrency):
+                in_flight[executor.submit(_run_one, index, query)] = index
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del in_flight[future]
+                    yield future.result()
+
+                for index, query in islice(pending_queries, len(done)):
+                    in_flight[executor.submit(_run_one, index, query)] = index
+        finally:
+            # Consumer stopped early: drop queued work, let running queries finish
+            for future in in_flight:
+                future.cancel()
@@ -0,0 +1,270 @@
+"""Response and tool result caches for ollama-agent."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+
+def make_cache_key(model: str, options: Dict[str, Any], messages: List[Any]) -> str:
+    """Hash a model call into a cache key.
+
+    Args:
+        model: Ollama model name
+        options: Sampling options that affect the output
+        messages: LangChain messages sent to the model
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    payload = {
+        "model": model,
+        "options": options,
+        "messages": [
+            {
+                "type": msg.type,
+                "name": getattr(msg, "name", None),
+                "content": msg.content,
+                "tool_calls": getattr(msg, "tool_calls", None),
+                "tool_call_id": getattr(msg, "tool_call_id", None),
+            }
+            for msg in messages
+        ],
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Interface for LLM response caches.
+
+    Subclasses implement ``_get`` and ``_set``; hit and miss counting is
+    handled here.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response.
+
+        Args:
+            key: Key from make_cache_key
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        value = self._get(key)
+        with self._counter_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a response.
+
+        Args:
+            key: Key from make_cache_key
+            value: Response text
+        """
+        self._set(key, value)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters for this process."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+
+class DiskResponseCache(ResponseCache):
+    """SQLite-backed response cache with size-based LRU eviction.
+
+    The database runs in WAL mode with a busy timeout, so many threads and
+    processes can share one cache file. Each thread uses its own connection.
+
+    Example:
+        >>> cache = DiskResponseCache("~/.cache/ollama-agent/responses.db")
+        >>> agent = OllamaAgent(temperature=0, response_cache=cache)
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = 256 * 1024 * 1024):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite database file (created if missing)
+            max_bytes: Total response size above which least recently used
+                      entries are evicted
+        """
+        super().__init__()
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str) -> Optional[str]:
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def _set(self, key: str, value: str) -> None:
+        conn = self._connect()
+        size = len(value.encode())
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used entries until under max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self._connect().execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters plus the current entry count and size."""
+        entries, size = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return {**super().stats(), "entries": entries, "bytes": size}
+
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache whose entries expire after a TTL.
+
+    Entries older than ``ttl`` but younger than ``ttl + stale_ttl`` are
+    reported as stale, so callers can serve them while refreshing in the
+    background (stale-while-revalidate).
+
+    Example:
+        >>> cache = TTLCache(ttl=60, max_size=128, stale_ttl=300)
+        >>> cache.set("paris", "sunny")
+        >>> cache.get("paris")
+        ('sunny', False)
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int = 256,
+        stale_ttl: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds an entry is fresh
+            max_size: Max entries before the least recently used is dropped
+            stale_ttl: Extra seconds an expired entry may still be served
+            clock: Time source, in seconds
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Tuple[Any, bool]]:
+        """Look up an entry.
+
+        Args:
+            key: Hashable key
+
+        Returns:
+            Tuple of (value, is_stale), or None if missing or fully expired
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                age = self._clock() - item[0]
+                if age <= self.ttl + self.stale_ttl:
+                    self._data.move_to_end(key)
+                    stale = age > self.ttl
+                    if stale:
+                        self.stale_hits += 1
+                    else:
+                        self.hits += 1
+                    return item[1], stale
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Any, value: Any) -> None:
+        """Store an entry, evicting the least recently used one if full."""
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, stale hit and miss counters and the entry count."""
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "entries": len(self._data),
+        }
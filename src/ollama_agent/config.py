@@ -2,7 +2,7 @@
 
 import os
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional, Union
 
 from dotenv import load_dotenv
 
@@ -16,6 +16,16 @@ def _parse_bool(value: str | None, default: bool = False) -> bool:
     return value.lower() in ("true", "1", "yes")
 
 
+def _parse_keep_alive(value: str | None) -> Optional[Union[int, str]]:
+    """Parse an Ollama keep_alive value (seconds or a duration like "10m")."""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
 @dataclass
 class Config:
     """Configuration for the Ollama agent.
@@ -26,9 +36,52 @@ class Config:
     Environment variables:
         OLLAMA_MODEL: Model name (default: llama3.2)
         OLLAMA_BASE_URL: Ollama API URL (default: http://localhost:11434)
+        OLLAMA_BASE_URLS: Comma-separated Ollama URLs to load balance across;
+            overrides OLLAMA_BASE_URL (default: unset)
+        OLLAMA_HEDGE_PERCENTILE: With OLLAMA_BASE_URLS, latency percentile (0-1)
+            after which a request is duplicated to another node (default: 0, off)
+        OLLAMA_KEEP_ALIVE: How long Ollama keeps the model loaded, e.g. "30m"
+            or seconds, -1 for forever (default: Ollama's own default)
+        WARM_UP: Warm up the model in the background on agent creation (default: false)
+        RESPONSE_CACHE_PATH: SQLite file for the deterministic response cache (default: off)
+        RESPONSE_CACHE_MAX_MB: Response cache size before LRU eviction (default: 256)
+        SESSION_STORE_PATH: Directory for persisted conversation logs (default: off)
+        SESSION_MAX_ACTIVE: Max sessions a SessionManager keeps in memory (default: 10000)
+        SESSION_IDLE_TIMEOUT: Seconds before an unused session is evicted, 0 = never
+            (default: 1800)
+        SESSION_MAX_MEMORY_MB: Approximate memory cap for in-memory sessions (default: 512)
+        SCHEDULER_MAX_IN_FLIGHT: Model calls in flight per process when > 0; extra
+            calls queue by priority and tenant fairness (default: 0, off)
+        METRICS_ENABLED: Record model, tool and run metrics in a process-wide
+            registry (default: true)
+        TRACE_DIR: Directory for Chrome trace-event files of sampled runs (default: off)
+        TRACE_SAMPLE_RATE: Fraction of runs traced when TRACE_DIR is set (default: 1.0)
+        PROFILE_DIR: Directory for CPU and memory profiles of agent runs (default: off)
+        PROFILE_EVERY: With PROFILE_DIR, profile one run in this many (default: 1)
+        PROFILE_MAX_MB: Size cap of PROFILE_DIR, oldest profiles deleted first (default: 100)
+        SERVER_HOST: Interface for ollama-agent-serve (default: 127.0.0.1)
+        SERVER_PORT: Port for ollama-agent-serve (default: 8000)
+        SERVER_MAX_CONCURRENCY: Generations the server runs at once (default: 4)
+        SERVER_MAX_QUEUE: Requests waiting for a slot before 429 (default: 64)
+        SERVER_QUEUE_TIMEOUT: Seconds a request waits for a slot before 503 (default: 30)
         TEMPERATURE: Model temperature 0-1 (default: 0.7)
         MAX_ITERATIONS: Max tool calls per query (default: 10)
+        NATIVE_TOOLS: Use Ollama's structured tool-calling API (default: false)
         MAX_SEARCH_RESULTS: Max web search results (default: 5)
+        HTTP_TIMEOUT: Timeout in seconds for tool HTTP requests (default: 10)
+        HTTP_MAX_CONNECTIONS: Max pooled tool HTTP connections (default: 100)
+        HTTP_MAX_CONNECTIONS_PER_HOST: Max concurrent tool requests per host (default: 10)
+        BATCH_CONCURRENCY: Max queries in flight for run_many (default: 4)
+        MAX_TOOL_WORKERS: Threads of the process-wide tool pool shared by all
+            agents, i.e. tool calls running at once across them (default: 8)
+        TOOL_TIMEOUT: Seconds a running tool call gets before it is given up on,
+            unless the tool sets its own timeout (default: 60, 0 = no limit)
+        TOOL_CACHE_SIZE: Max cached results per cached tool, 0 disables caching
+            of the built-in network tools (default: 256)
+        TOOL_RETRIEVAL_TOP_K: List only the k tools most relevant to each query
+            in the system prompt (default: 0, all tools)
+        HISTORY_TOKEN_BUDGET: Prompt tokens before history is summarized (default: 0, off)
+        HISTORY_KEEP_RECENT: Recent messages always kept verbatim (default: 6)
         REQUIRE_APPROVAL_COMMANDS: Require approval for shell commands (default: true)
         REQUIRE_APPROVAL_FILES: Require approval for file writes (default: false)
     """
@@ -36,11 +89,60 @@ class Config:
     # Ollama settings
     ollama_model: str = os.getenv("OLLAMA_MODEL", "llama3.2")
     ollama_base_url: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    ollama_base_urls: List[str] = field(
+        default_factory=lambda: [
+            url.strip() for url in os.getenv("OLLAMA_BASE_URLS", "").split(",") if url.strip()
+        ]
+    )
+    ollama_hedge_percentile: float = float(os.getenv("OLLAMA_HEDGE_PERCENTILE", "0"))
     temperature: float = float(os.getenv("TEMPERATURE", "0.7"))
     max_iterations: int = int(os.getenv("MAX_ITERATIONS", "10"))
+    native_tools: bool = _parse_bool(os.getenv("NATIVE_TOOLS"), False)
+    keep_alive: Optional[Union[int, str]] = _parse_keep_alive(os.getenv("OLLAMA_KEEP_ALIVE"))
+    warm_up: bool = _parse_bool(os.getenv("WARM_UP"), False)
+
+    # Cache settings
+    response_cache_path: Optional[str] = os.getenv("RESPONSE_CACHE_PATH") or None
+    response_cache_max_mb: int = int(os.getenv("RESPONSE_CACHE_MAX_MB", "256"))
+    session_store_path: Optional[str] = os.getenv("SESSION_STORE_PATH") or None
+    batch_concurrency: int = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+    # Session settings
+    session_max_active: int = int(os.getenv("SESSION_MAX_ACTIVE", "10000"))
+    session_idle_timeout: float = float(os.getenv("SESSION_IDLE_TIMEOUT", "1800"))
+    session_max_memory_mb: int = int(os.getenv("SESSION_MAX_MEMORY_MB", "512"))
+
+    # Scheduler settings
+    scheduler_max_in_flight: int = int(os.getenv("SCHEDULER_MAX_IN_FLIGHT", "0"))
+
+    # Metrics, tracing and profiling settings
+    metrics_enabled: bool = _parse_bool(os.getenv("METRICS_ENABLED"), True)
+    trace_dir: Optional[str] = os.getenv("TRACE_DIR") or None
+    trace_sample_rate: float = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+    profile_dir: Optional[str] = os.getenv("PROFILE_DIR") or None
+    profile_every: int = int(os.getenv("PROFILE_EVERY", "1"))
+    profile_max_mb: float = float(os.getenv("PROFILE_MAX_MB", "100"))
+
+    # Server settings
+    server_host: str = os.getenv("SERVER_HOST", "127.0.0.1")
+    server_port: int = int(os.getenv("SERVER_PORT", "8000"))
+    server_max_concurrency: int = int(os.getenv("SERVER_MAX_CONCURRENCY", "4"))
+    server_max_queue: int = int(os.getenv("SERVER_MAX_QUEUE", "64"))
+    server_queue_timeout: float = float(os.getenv("SERVER_QUEUE_TIMEOUT", "30"))
+
+    # History settings
+    history_token_budget: int = int(os.getenv("HISTORY_TOKEN_BUDGET", "0"))
+    history_keep_recent: int = int(os.getenv("HISTORY_KEEP_RECENT", "6"))
 
     # Tool settings
     max_search_results: int = int(os.getenv("MAX_SEARCH_RESULTS", "5"))
+    http_timeout: float = float(os.getenv("HTTP_TIMEOUT", "10"))
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    http_max_connections_per_host: int = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+    max_tool_workers: int = int(os.getenv("MAX_TOOL_WORKERS", "8"))
+    tool_timeout: float = float(os.getenv("TOOL_TIMEOUT", "60"))
+    tool_cache_size: int = int(os.getenv("TOOL_CACHE_SIZE", "256"))
+    tool_retrieval_top_k: int = int(os.getenv("TOOL_RETRIEVAL_TOP_K", "0"))
 
     # Approval settings
     require_approval_commands: bool = _parse_bool(
@@ -0,0 +1,494 @@
+"""Load balancing across several Ollama endpoints."""
+
+import asyncio
+import itertools
+import sys
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from .config import config as default_config
+from .exceptions import ConfigurationError
+
+if TYPE_CHECKING:
+    import httpx
+
+T = TypeVar("T")
+
+_STREAM_END = object()
+
+
+def _is_endpoint_failure(error: BaseException) -> bool:
+    """Check whether an error means the endpoint itself is unusable.
+
+    Connection problems, timeouts and 5xx responses are; errors about the
+    request (unknown model, bad options) would fail on every node and are not.
+    """
+    if isinstance(error, ConnectionError):
+        return True
+    # No httpx error can exist before something has loaded httpx
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+def _quantile(samples: List[float], q: float) -> float:
+    """Return the q-quantile of a list of samples (nearest rank)."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Endpoint:
+    """One Ollama server in a pool.
+
+    Attributes:
+        url: Base URL of the server
+        healthy: False after a failure, until a probe or request succeeds
+        outstanding: Requests currently running on it
+        requests: Requests completed successfully
+        failures: Requests and probes that failed
+    """
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.healthy = True
+        self.down_since = 0.0
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.latencies: Deque[float] = deque(maxlen=256)
+
+    def __repr__(self) -> str:
+        state = "up" if self.healthy else "down"
+        return f"Endpoint({self.url!r}, {state}, outstanding={self.outstanding})"
+
+
+class EndpointPool:
+    """Route model calls across several Ollama servers.
+
+    - Each call goes to the available endpoint with the fewest outstanding
+      requests.
+    - An endpoint that fails with a connection error, timeout or 5xx is
+      marked down and the call is retried on the next one.
+    - A down endpoint gets traffic again after a successful health probe, or
+      once ``retry_after`` seconds have passed.
+    - With ``hedge_percentile`` set, a call that runs longer than that
+      percentile of recent latencies is duplicated to a second endpoint, and
+      the first answer wins. This trades some extra load for a shorter tail.
+      Streams are not hedged.
+
+    Background probing starts with the first call and stops when the pool
+    is closed or garbage collected.
+
+    Example:
+        >>> pool = EndpointPool(
+        ...     ["http://gpu-1:11434", "http://gpu-2:11434"], hedge_percentile=0.95
+        ... )
+        >>> agent = OllamaAgent(endpoints=pool)
+        >>> pool.stats()
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        probe_interval: float = 10.0,
+        probe_timeout: float = 2.0,
+        retry_after: float = 30.0,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        transport: Optional["httpx.BaseTransport"] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the pool.
+
+        Args:
+            urls: Base URLs of the Ollama servers
+            probe_interval: Seconds between background health probes, 0 to
+                           disable them (probe() can still be called)
+            probe_timeout: Timeout of one health probe, in seconds
+            retry_after: Seconds after which a down endpoint is tried again
+                        even without a successful probe
+            hedge_percentile: Latency percentile (0-1) after which a call is
+                             hedged to a second endpoint (default: no hedging)
+            hedge_min_samples: Completed calls needed before hedging starts
+            transport: Optional httpx transport for probes (testing)
+            clock: Time source, injectable for testing
+
+        Raises:
+            ConfigurationError: If no URLs are given or hedge_percentile is
+                                not between 0 and 1
+        """
+        if not urls:
+            raise ConfigurationError("EndpointPool needs at least one URL")
+        if hedge_percentile is not None and not 0 < hedge_percentile < 1:
+            raise ConfigurationError("hedge_percentile must be between 0 and 1")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.retry_after = retry_after
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._transport = transport
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=512)
+        self._rotation = itertools.count()
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._probe_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def urls(self) -> List[str]:
+        """Base URLs of all endpoints."""
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def _available(self, endpoint: Endpoint, now: float) -> bool:
+        return endpoint.healthy or now - endpoint.down_since >= self.retry_after
+
+    def _pick(self, exclude: List[Endpoint]) -> Optional[Endpoint]:
+        """Choose the least loaded endpoint not in exclude."""
+        with self._lock:
+            if self._probe_thread is None and self.probe_interval > 0:
+                self._start_probing()
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                return None
+            now = self._clock()
+            available = [e for e in candidates if self._available(e, now)]
+            # With everything down, still try the rest rather than fail outright
+            pool = available or candidates
+            # Rotate the start so ties are spread evenly
+            offset = next(self._rotation) % len(pool)
+            rotated = pool[offset:] + pool[:offset]
+            endpoint = min(rotated, key=lambda e: e.outstanding)
+            endpoint.outstanding += 1
+            return endpoint
+
+    def _done(self, endpoint: Endpoint, started: float, error: Optional[BaseException]) -> None:
+        """Record the outcome of a call and free its slot on the endpoint."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            if error is None:
+                latency = self._clock() - started
+                endpoint.requests += 1
+                endpoint.latencies.append(latency)
+                self._latencies.append(latency)
+                endpoint.healthy = True
+            elif _is_endpoint_failure(error):
+                endpoint.failures += 1
+                endpoint.healthy = False
+                endpoint.down_since = self._clock()
+
+    def _hedge_after(self) -> Optional[float]:
+        """Seconds after which to hedge, or None while hedging is off."""
+        if self.hedge_percentile is None or len(self.endpoints) < 2:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            return _quantile(list(self._latencies), self.hedge_percentile)
+
+    def _run(self, endpoint: Endpoint, fn: Callable[[Endpoint], T]) -> T:
+        """Run a call on an already picked endpoint."""
+        started = self._clock()
+        try:
+            result = fn(endpoint)
+        except BaseException as e:
+            self._done(endpoint, started, e)
+            raise
+        self._done(endpoint, started, None)
+        return result
+
+    def call(self, fn: Callable[[Endpoint], T]) -> T:
+        """Run a blocking call on the best endpoint, with failover and hedging.
+
+        Args:
+            fn: Function making the request against the given endpoint
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            Exception: The error of the last attempt if all endpoints failed,
+                       or the first error that is not an endpoint failure
+        """
+        tried: List[Endpoint] = []
+        last_error: Optional[BaseException] = None
+        while True:
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                raise last_error
+            tried.append(endpoint)
+            try:
+                hedge_after = self._hedge_after()
+                if hedge_after is None:
+                    return self._run(endpoint, fn)
+                return self._call_hedged(endpoint, fn, hedge_after, tried)
+            except Exception as e:
+                if not _is_endpoint_failure(e):
+                    raise
+                last_error = e
+
+    def _call_hedged(
+        self, primary: Endpoint, fn: Callable[[Endpoint], T], hedge_after: float,
+        tried: List[Endpoint],
+    ) -> T:
+        """Run a call and duplicate it to a second endpoint if it is slow."""
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=4 * len(self.endpoints), thread_name_prefix="ollama-agent-hedge"
+                )
+        first = self._hedge_pool.submit(self._run, primary, fn)
+        done, _ = wait([first], timeout=hedge_after)
+        if done:
+            return first.result()
+
+        secondary = self._pick(tried)
+        if secondary is None:
+            return first.result()
+        tried.append(secondary)
+        with self._lock:
+            self.hedges += 1
+        second = self._hedge_pool.submit(self._run, secondary, fn)
+
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    # The losing request finishes in the background
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def acall(self, fn: Callable[[Endpoint], Awaitable[T]]) -> T:
+        """Async version of call(). A losing hedged request is cancelled.
+
+        Args:
+            fn: Coroutine function making the request against the given endpoint
+
+        Returns:
+            The result of the first successful attempt
+        """
+        tried: List[Endpoint] = []
+        last_error: Optional[BaseException] = None
+        while True:
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                raise last_error
+            tried.append(endpoint)
+            try:
+                return await self._acall_hedged(endpoint, fn, tried)
+            except Exception as e:
+                if not _is_endpoint_failure(e):
+                    raise
+                last_error = e
+
+    async def _arun(self, endpoint: Endpoint, fn: Callable[[Endpoint], Awaitable[T]]) -> T:
+        """Async version of _run."""
+        started = self._clock()
+        try:
+            result = await fn(endpoint)
+        except BaseException as e:
+            self._done(endpoint, started, e)
+            raise
+        self._done(endpoint, started, None)
+        return result
+
+    async def _acall_hedged(
+        self, primary: Endpoint, fn: Callable[[Endpoint], Awaitable[T]], tried: List[Endpoint]
+    ) -> T:
+        """Run an async call, hedging it if hedging is on and it is slow."""
+        hedge_after = self._hedge_after()
+        if hedge_after is None:
+            return await self._arun(primary, fn)
+
+        first = asyncio.ensure_future(self._arun(primary, fn))
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done:
+            return first.result()
+
+        secondary = self._pick(tried)
+        if secondary is None:
+            return await first
+        tried.append(secondary)
+        with self._lock:
+            self.hedges += 1
+        second = asyncio.ensure_future(self._arun(secondary, fn))
+
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stream(self, fn: Callable[[Endpoint], Iterator[T]]) -> Iterator[T]:
+        """Stream from the best endpoint, failing over until the first item.
+
+        Once the first item has been yielded the endpoint is committed to;
+        later errors propagate. The endpoint counts as busy until the
+        stream is exhausted or closed.
+
+        Args:
+            fn: Function opening the stream against the given endpoint
+
+        Yields:
+            Items of the stream
+        """
+        tried: List[Endpoint] = []
+        last_error: Optional[BaseException] = None
+        while True:
+            endpoint = self._pick(tried)
+            if endpoint is None:
+                raise last_error
+            tried.append(endpoint)
+            started = self._clock()
+            items = None
+            try:
+                items = fn(endpoint)
+                first = next(items, _STREAM_END)
+            except Exception as e:
+                self._done(endpoint, started, e)
+                if items is not None and hasattr(items, "close"):
+                    items.close()
+                if not _is_endpoint_failure(e):
+                    raise
+                last_error = e
+                continue
+
+            error: Optional[BaseException] = None
+            try:
+                if first is not _STREAM_END:
+                    yield first
+                    yield from items
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                if hasattr(items, "close"):
+                    items.close()
+                self._done(endpoint, started, error if isinstance(error, Exception) else None)
+            return
+
+    def probe(self) -> None:
+        """Check every endpoint once and update its health."""
+        import httpx
+
+        with httpx.Client(timeout=self.probe_timeout, transport=self._transport) as client:
+            for endpoint in self.endpoints:
+                try:
+                    client.get(f"{endpoint.url}/api/version").raise_for_status()
+                    ok = True
+                except httpx.HTTPError:
+                    ok = False
+                with self._lock:
+                    if ok:
+                        endpoint.healthy = True
+                    elif endpoint.healthy:
+                        endpoint.failures += 1
+                        endpoint.healthy = False
+                        endpoint.down_since = self._clock()
+
+    def _start_probing(self) -> None:
+        """Start the probe thread; caller holds the lock."""
+        # The thread holds the pool weakly, so an unused pool can be collected
+        self._probe_thread = threading.Thread(
+            target=self._probe_loop,
+            args=(weakref.ref(self), self._stop, self.probe_interval),
+            name="ollama-agent-probe",
+            daemon=True,
+        )
+        self._probe_thread.start()
+
+    @staticmethod
+    def _probe_loop(
+        pool_ref: "weakref.ref[EndpointPool]", stop: threading.Event, interval: float
+    ) -> None:
+        while not stop.wait(interval):
+            pool = pool_ref()
+            if pool is None:
+                return
+            pool.probe()
+            del pool
+
+    def close(self) -> None:
+        """Stop background probing and hedging threads."""
+        self._stop.set()
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-endpoint and hedging counters.
+
+        Returns:
+            Dict with "endpoints" (url -> healthy, outstanding, requests,
+            failures, p50 and p95 latency) plus "hedges" and "hedge_wins"
+        """
+        with self._lock:
+            endpoints = {}
+            for e in self.endpoints:
+                samples = list(e.latencies)
+                endpoints[e.url] = {
+                    "healthy": e.healthy,
+                    "outstanding": e.outstanding,
+                    "requests": e.requests,
+                    "failures": e.failures,
+                    "p50": _quantile(samples, 0.5) if samples else None,
+                    "p95": _quantile(samples, 0.95) if samples else None,
+                }
+            return {"endpoints": endpoints, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
+
+
+_pool: Optional[EndpointPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_endpoint_pool() -> Optional[EndpointPool]:
+    """Return the process-wide pool for OLLAMA_BASE_URLS, or None if unset.
+
+    Returns:
+        Shared EndpointPool instance, or None
+    """
+    global _pool
+    if _pool is None and default_config.ollama_base_urls:
+        with _pool_lock:
+            if _pool is None:
+                _pool = EndpointPool(
+                    default_config.ollama_base_urls,
+                    hedge_percentile=default_config.ollama_hedge_percentile or None,
+                )
+    return _pool
@@ -0,0 +1,248 @@
+"""Worker pool that runs tool calls with timeouts."""
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from .config import config as default_config
+from .metrics import Metrics, get_metrics
+
+# Sentinel for a worker that waited idle_timeout without a call
+_IDLE = object()
+
+
+class _Task:
+    __slots__ = ("future", "fn", "args", "submitted", "abandoned")
+
+    def __init__(self, fn: Callable[..., Any], args: tuple):
+        self.future: Future = Future()
+        self.fn = fn
+        self.args = args
+        self.submitted = time.perf_counter()
+        self.abandoned = False
+
+
+class ToolExecutor:
+    """Thread pool for tool calls that can give up on a hung call.
+
+    Python threads can't be killed, so a call that times out keeps running.
+    A call still queued is cancelled. A call already running is abandoned:
+    its thread stops counting against ``max_workers`` and a new worker may
+    start in its place, so one hung tool doesn't shrink the pool. The
+    abandoned thread exits once the call returns. At most ``max_stuck``
+    threads are replaced at a time; after that, hung calls keep their
+    worker and the pool saturates, which the metrics show.
+
+    Workers are daemon threads, so a hung tool doesn't block interpreter
+    exit, and a worker left without calls for ``idle_timeout`` seconds
+    exits, so an unused pool holds no threads. With a Metrics registry the pool reports workers, busy workers,
+    queued calls, stuck threads and the queue wait of every call.
+
+    Example:
+        >>> executor = ToolExecutor(max_workers=4)
+        >>> future = executor.submit(slow_tool, "input")
+        >>> try:
+        ...     result = future.result(timeout=5)
+        ... except TimeoutError:
+        ...     executor.abandon(future)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        metrics: Optional[Metrics] = None,
+        max_stuck: Optional[int] = None,
+        thread_name_prefix: str = "ollama-agent-tool",
+        idle_timeout: Optional[float] = 60.0,
+    ):
+        """Initialize the pool; threads start on demand.
+
+        Args:
+            max_workers: Calls that run at the same time
+            metrics: Registry to report pool usage to
+            max_stuck: Abandoned threads replaced at a time (default: max_workers)
+            thread_name_prefix: Name prefix of the worker threads
+            idle_timeout: Seconds an idle worker waits for a call before it
+                          exits (None: workers live until shutdown)
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.max_stuck = max_workers if max_stuck is None else max_stuck
+        self.metrics = metrics
+        self.idle_timeout = idle_timeout
+        self._prefix = thread_name_prefix
+        self._names = itertools.count()
+        self._lock = threading.Lock()
+        self._queue: "queue.SimpleQueue[Optional[_Task]]" = queue.SimpleQueue()
+        # Running tasks by future, for abandon()
+        self._running: Dict[Future, _Task] = {}
+        self._workers = 0
+        # Workers waiting on the queue
+        self._idle = 0
+        self._busy = 0
+        self._queued = 0
+        self._stuck = 0
+        self._completed = 0
+        self._timeouts = 0
+        self._shutdown = False
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Run fn(*args) on a worker thread.
+
+        Returns:
+            Future for the result
+
+        Raises:
+            RuntimeError: If the executor was shut down
+        """
+        task = _Task(fn, args)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit after shutdown")
+            self._queued += 1
+            spawn = self._spawn_worker()
+        self._queue.put(task)
+        self._record(workers=spawn, queued=1)
+        return task.future
+
+    def _spawn_worker(self) -> int:
+        """Start a worker if queued calls outnumber idle ones; caller holds the lock.
+
+        Returns:
+            Number of workers started (0 or 1)
+        """
+        if self._queued <= self._idle or self._workers >= self.max_workers:
+            return 0
+        self._workers += 1
+        threading.Thread(
+            target=self._work, name=f"{self._prefix}_{next(self._names)}", daemon=True
+        ).start()
+        return 1
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                self._idle += 1
+            try:
+                task = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                task = _IDLE
+            with self._lock:
+                self._idle -= 1
+                if task is _IDLE:
+                    # Stay if queued calls were counting on this worker
+                    if self._queued > self._idle:
+                        continue
+                    task = None
+                if task is None:
+                    self._workers -= 1
+                else:
+                    self._queued -= 1
+                    running = task.future.set_running_or_notify_cancel()
+                    if running:
+                        self._busy += 1
+                        self._running[task.future] = task
+            if task is None:
+                self._record(workers=-1)
+                return
+            if not running:
+                # Cancelled while queued
+                self._record(queued=-1)
+                continue
+            self._record(queued=-1, busy=1, wait=time.perf_counter() - task.submitted)
+
+            try:
+                result = task.fn(*task.args)
+            except BaseException as e:
+                task.future.set_exception(e)
+            else:
+                task.future.set_result(result)
+            del task.fn, task.args
+
+            with self._lock:
+                self._busy -= 1
+                self._completed += 1
+                del self._running[task.future]
+                if task.abandoned:
+                    self._stuck -= 1
+            if task.abandoned:
+                self._record(busy=-1, stuck=-1)
+                return
+            self._record(busy=-1)
+
+    def abandon(self, future: Future) -> None:
+        """Give up on a call that timed out.
+
+        A queued call is cancelled. A running one keeps its thread, which
+        is replaced by a new worker unless max_stuck threads already are.
+        """
+        if future.cancel():
+            with self._lock:
+                self._timeouts += 1
+            return
+        with self._lock:
+            task = self._running.get(future)
+            self._timeouts += 1
+            if task is None or task.abandoned or self._stuck >= self.max_stuck:
+                return
+            task.abandoned = True
+            self._stuck += 1
+            self._workers -= 1
+            # Start a replacement if calls are waiting for a worker
+            spawn = self._spawn_worker()
+        self._record(workers=spawn - 1, stuck=1)
+
+    def _record(self, wait: Optional[float] = None, **changes: int) -> None:
+        if self.metrics is not None:
+            self.metrics.record_pool(wait=wait, **changes)
+
+    def stats(self) -> Dict[str, int]:
+        """Return pool counters.
+
+        Returns:
+            Dict with workers (threads not stuck), busy (calls running,
+            including stuck ones), queued, stuck (abandoned threads still
+            running), completed and timeouts
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "workers": self._workers,
+                "busy": self._busy,
+                "queued": self._queued,
+                "stuck": self._stuck,
+                "completed": self._completed,
+                "timeouts": self._timeouts,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the idle workers once queued calls are done; doesn't wait."""
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            workers = self._workers
+        for _ in range(workers):
+            self._queue.put(None)
+
+
+_executor: Optional[ToolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_tool_executor() -> ToolExecutor:
+    """Return the process-wide tool pool of MAX_TOOL_WORKERS threads.
+
+    Returns:
+        Shared ToolExecutor instance
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ToolExecutor(default_config.max_tool_workers, metrics=get_metrics())
+    return _executor
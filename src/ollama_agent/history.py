@@ -0,0 +1,186 @@
+"""Token-budgeted conversation history with background compaction."""
+
+import threading
+from typing import Callable, List, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+# Name attached to the rolling summary message so it can be found again
+SUMMARY_NAME = "conversation_summary"
+
+# Name attached to messages announcing tool changes mid-conversation
+TOOL_UPDATE_NAME = "tool_update"
+
+SUMMARY_PROMPT = """Summarize the conversation below for your own future reference.
+Keep every fact, decision, tool result and open question that later turns may
+depend on. Be concise and write plain prose, no tool calls."""
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """Roughly estimate the prompt tokens of a list of messages.
+
+    Uses the common ~4 characters per token heuristic plus a small per
+    message overhead for the chat template.
+
+    Args:
+        messages: Messages to measure
+
+    Returns:
+        Estimated token count
+    """
+    return sum(len(str(msg.content)) // 4 + 4 for msg in messages)
+
+
+def is_summary(message: BaseMessage) -> bool:
+    """Check whether a message is the rolling conversation summary."""
+    return isinstance(message, SystemMessage) and message.name == SUMMARY_NAME
+
+
+def is_tool_update(message: BaseMessage) -> bool:
+    """Check whether a message announces a change to the available tools."""
+    return isinstance(message, SystemMessage) and message.name == TOOL_UPDATE_NAME
+
+
+def _is_user_turn(message: BaseMessage) -> bool:
+    """Check whether a message starts a new user turn (not a tool result)."""
+    return isinstance(message, HumanMessage) and not str(message.content).startswith(
+        "TOOL RESULT:"
+    )
+
+
+class HistoryCompactor:
+    """Fold older turns into a rolling summary once a token budget is exceeded.
+
+    The system prompt (first message) and the most recent turns are always
+    kept verbatim. Everything in between, including any previous summary, is
+    replaced by a single summary message. Summaries are produced in a
+    background thread after a turn finishes and spliced in at the start of
+    the next turn, so compaction never delays a response.
+
+    Example:
+        >>> compactor = HistoryCompactor(summarize, token_budget=4000)
+        >>> compactor.apply(messages)     # before a turn
+        >>> compactor.schedule(messages)  # after a turn
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[List[BaseMessage]], str],
+        token_budget: int,
+        keep_recent: int = 6,
+        background: bool = True,
+    ):
+        """Initialize the compactor.
+
+        Args:
+            summarize: Function turning a list of messages into summary text
+            token_budget: Estimated prompt tokens above which to compact
+            keep_recent: Minimum number of recent messages kept verbatim
+            background: If False, compaction runs inline in schedule()
+        """
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.background = background
+        self.compactions = 0
+        self.last_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._ready: Optional[tuple] = None
+
+    def fork(self) -> "HistoryCompactor":
+        """Create a compactor with the same settings and no pending work."""
+        return HistoryCompactor(
+            self.summarize, self.token_budget, self.keep_recent, self.background
+        )
+
+    def _split(self, messages: List[BaseMessage]) -> int:
+        """Find where the verbatim tail starts, on a user-turn boundary.
+
+        Returns:
+            Index of the first kept message, or 0 if nothing can be compacted
+        """
+        first = 2 if len(messages) > 1 and is_summary(messages[1]) else 1
+        for cut in range(len(messages) - self.keep_recent, first, -1):
+            if _is_user_turn(messages[cut]):
+                return cut
+        return 0
+
+    def schedule(self, messages: List[BaseMessage]) -> None:
+        """Start compacting if the history is over budget.
+
+        Only one compaction runs at a time. The messages to fold are
+        snapshotted here; the result is applied by the next apply() call.
+
+        Args:
+            messages: The live conversation message list
+        """
+        if estimate_tokens(messages) <= self.token_budget:
+            return
+        with self._lock:
+            if self._ready is not None or (self._thread and self._thread.is_alive()):
+                return
+            cut = self._split(messages)
+            if not cut:
+                return
+            older = messages[1:cut]
+            if not self.background:
+                self._compact(older)
+                self._splice(messages)
+                return
+            self._thread = threading.Thread(
+                target=self._compact, args=(older,), name="ollama-agent-compact", daemon=True
+            )
+            self._thread.start()
+
+    def _compact(self, older: List[BaseMessage]) -> None:
+        """Summarize a snapshot of older messages (runs in the worker thread)."""
+        try:
+            summary = self.summarize(older)
+        except Exception as e:
+            self.last_error = e
+            return
+        self._ready = (older, summary)
+
+    def apply(self, messages: List[BaseMessage]) -> bool:
+        """Splice a finished summary into the message list, in place.
+
+        The summary is discarded if the conversation changed underneath it
+        (for example after reset()).
+
+        Args:
+            messages: The live conversation message list
+
+        Returns:
+            True if the history was compacted
+        """
+        if self._ready is None:
+            return False
+        with self._lock:
+            return self._splice(messages)
+
+    def _splice(self, messages: List[BaseMessage]) -> bool:
+        """Replace the summarized messages; caller must hold the lock."""
+        if self._ready is None:
+            return False
+        older, summary = self._ready
+        self._ready = None
+        end = 1 + len(older)
+        current = messages[1:end]
+        if len(current) != len(older) or any(a is not b for a, b in zip(current, older)):
+            return False
+
+        messages[1:end] = [
+            SystemMessage(
+                content=f"Summary of the earlier conversation:\n{summary}",
+                name=SUMMARY_NAME,
+            )
+        ]
+        self.compactions += 1
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until a running background compaction finishes."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,195 @@
+"""Shared keep-alive HTTP connection pool for tools."""
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import config
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class HTTPClient:
+    """Pooled HTTP client with keep-alive and per-host connection limits.
+
+    One instance is meant to be shared by every tool in the process, so
+    repeated requests to the same host reuse open (TLS) connections. The
+    synchronous side is a single ``httpx.Client``; the async side keeps one
+    ``httpx.AsyncClient`` per event loop, since async clients can't cross
+    loops. A loop's client is closed when the loop shuts down its async
+    generators, which ``asyncio.run`` does before closing the loop. Per-host
+    limits apply across all callers of each side.
+
+    Example:
+        >>> from ollama_agent import get_http_client
+        >>> resp = get_http_client().get("https://example.com/api")
+        >>> resp.raise_for_status()
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_connections: int = 100,
+        max_connections_per_host: int = 10,
+        keepalive_expiry: float = 30.0,
+        transport: Optional["httpx.BaseTransport"] = None,
+        async_transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        """Initialize the client. Connections are opened lazily.
+
+        Args:
+            timeout: Default request timeout in seconds
+            max_connections: Max open connections across all hosts
+            max_connections_per_host: Max concurrent requests to one host
+            keepalive_expiry: Seconds an idle connection is kept open
+            transport: Optional httpx transport for the sync client (testing)
+            async_transport: Optional httpx transport for async clients (testing)
+        """
+        self.timeout = timeout
+        self.max_connections_per_host = max_connections_per_host
+        # httpx is imported with the first client, so keep the limits as options
+        self._limits = dict(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._transport = transport
+        self._async_transport = async_transport
+        self._client: Optional["httpx.Client"] = None
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        # Per loop: client, host semaphores and the generator that closes them
+        self._async_clients: Dict[
+            asyncio.AbstractEventLoop,
+            Tuple["httpx.AsyncClient", Dict[str, asyncio.Semaphore], AsyncGenerator],
+        ] = {}
+        self._lock = threading.Lock()
+
+    def _sync_client(self) -> "httpx.Client":
+        """Return the shared sync client, creating it on first use."""
+        with self._lock:
+            if self._client is None:
+                import httpx
+
+                self._client = httpx.Client(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(**self._limits),
+                    follow_redirects=True,
+                    transport=self._transport,
+                )
+            return self._client
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Return the semaphore limiting concurrent requests to a URL's host."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_connections_per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    async def _async_state(self) -> Tuple["httpx.AsyncClient", Dict[str, asyncio.Semaphore]]:
+        """Return the async client and host semaphores for the running loop."""
+        loop = asyncio.get_running_loop()
+        state = self._async_clients.get(loop)
+        if state is None:
+            import httpx
+
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(**self._limits),
+                follow_redirects=True,
+                transport=self._async_transport,
+            )
+            closer = self._close_at_shutdown(loop, client)
+            await closer.__anext__()
+            state = (client, {}, closer)
+            with self._lock:
+                # Loops closed without shutting down their async generators
+                for closed in [other for other in self._async_clients if other.is_closed()]:
+                    del self._async_clients[closed]
+                self._async_clients[loop] = state
+        return state[0], state[1]
+
+    async def _close_at_shutdown(
+        self, loop: asyncio.AbstractEventLoop, client: "httpx.AsyncClient"
+    ) -> AsyncGenerator[None, None]:
+        """Suspend until the loop finalizes its async generators, then close client."""
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._async_clients.pop(loop, None)
+            await client.aclose()
+
+    def request(self, method: str, url: str, **kwargs: Any) -> "httpx.Response":
+        """Send a request over the shared pool.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            **kwargs: Passed to ``httpx.Client.request`` (headers, params, timeout, ...)
+
+        Returns:
+            The response, with its body read
+        """
+        with self._host_slot(url):
+            return self._sync_client().request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> "httpx.Response":
+        """Send a GET request over the shared pool."""
+        return self.request("GET", url, **kwargs)
+
+    async def arequest(self, method: str, url: str, **kwargs: Any) -> "httpx.Response":
+        """Send a request over the running loop's shared async pool.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            **kwargs: Passed to ``httpx.AsyncClient.request``
+
+        Returns:
+            The response, with its body read
+        """
+        client, host_slots = await self._async_state()
+        host = urlsplit(url).netloc
+        slot = host_slots.get(host)
+        if slot is None:
+            slot = host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+        async with slot:
+            return await client.request(method, url, **kwargs)
+
+    async def aget(self, url: str, **kwargs: Any) -> "httpx.Response":
+        """Send a GET request over the running loop's shared async pool."""
+        return await self.arequest("GET", url, **kwargs)
+
+    def close(self) -> None:
+        """Close the sync client. Async clients close at their loop's shutdown."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+_http_client: Optional[HTTPClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """Return the process-wide HTTP client, configured from Config.
+
+    Returns:
+        Shared HTTPClient instance
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HTTPClient(
+                    timeout=config.http_timeout,
+                    max_connections=config.http_max_connections,
+                    max_connections_per_host=config.http_max_connections_per_host,
+                )
+    return _http_client
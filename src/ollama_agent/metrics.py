@@ -0,0 +1,446 @@
+"""Performance metrics for model calls, tool calls and agent runs."""
+
+import bisect
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import config as default_config
+
+# Metric name -> (type, help, histogram buckets, stats() group, stats() field)
+_METRICS: Dict[str, Tuple[str, str, Sequence[float], str, str]] = {
+    "llm_calls_total": (
+        "counter", "Model calls, including response cache hits", (), "llm", "calls",
+    ),
+    "llm_cache_hits_total": (
+        "counter", "Model calls answered from the response cache", (), "llm", "cache_hits",
+    ),
+    "llm_errors_total": ("counter", "Model calls that raised", (), "llm", "errors"),
+    "prompt_tokens_total": (
+        "counter", "Prompt tokens evaluated by Ollama", (), "llm", "prompt_tokens",
+    ),
+    "eval_tokens_total": ("counter", "Tokens generated by Ollama", (), "llm", "eval_tokens"),
+    "llm_seconds": (
+        "histogram", "Wall time of a model call",
+        (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120), "llm", "latency",
+    ),
+    "llm_ttft_seconds": (
+        "histogram", "Time to first token (load plus prefill when not streaming)",
+        (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30), "llm", "ttft",
+    ),
+    "llm_prefill_seconds": (
+        "histogram", "Prompt evaluation time reported by Ollama",
+        (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30), "llm", "prefill",
+    ),
+    "llm_decode_seconds": (
+        "histogram", "Generation time reported by Ollama",
+        (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120), "llm", "decode",
+    ),
+    "llm_tokens_per_second": (
+        "histogram", "Generation speed reported by Ollama",
+        (1, 2.5, 5, 10, 20, 40, 80, 160, 320), "llm", "tokens_per_second",
+    ),
+    "tool_calls_total": ("counter", "Tool calls by status", (), "tools", "calls"),
+    "tool_cache_hits_total": (
+        "counter", "Tool calls answered from the tool result cache", (), "tools", "cache_hits",
+    ),
+    "tool_seconds": (
+        "histogram", "Wall time of a tool call",
+        (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30), "tools", "latency",
+    ),
+    "tool_workers": (
+        "gauge", "Tool worker threads, not counting stuck ones", (), "tool_pool", "workers",
+    ),
+    "tool_workers_busy": ("gauge", "Tool calls running", (), "tool_pool", "busy"),
+    "tool_queue_depth": ("gauge", "Tool calls waiting for a worker", (), "tool_pool", "queued"),
+    "tool_workers_stuck": (
+        "gauge", "Threads still running a tool call that timed out", (), "tool_pool", "stuck",
+    ),
+    "tool_queue_seconds": (
+        "histogram", "Time a tool call waited for a worker",
+        (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10), "tool_pool",
+        "queue_wait",
+    ),
+    "runs_total": ("counter", "Agent runs by outcome", (), "runs", "runs"),
+    "run_seconds": (
+        "histogram", "Wall time of an agent run",
+        (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300), "runs", "latency",
+    ),
+    "run_iterations": (
+        "histogram", "Model calls per agent run",
+        (1, 2, 3, 4, 5, 7, 10, 15, 20), "runs", "iterations",
+    ),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# A hook receives the event name ("llm", "tool", "tool_pool" or "run") and its data
+Hook = Callable[[str, Dict[str, Any]], None]
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds.
+
+    Attributes:
+        buckets: Upper bounds, ascending; +Inf is implied
+        counts: Observations per bucket, the last one being +Inf
+        count: Number of observations
+        sum: Sum of observations
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile as the upper bound of the bucket holding it."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _count(metadata: Dict[str, Any], key: str) -> Optional[int]:
+    """Read an Ollama token count."""
+    value = metadata.get(key)
+    return value if isinstance(value, int) else None
+
+
+def _ns(metadata: Dict[str, Any], key: str) -> Optional[float]:
+    """Read an Ollama duration (nanoseconds) as seconds."""
+    value = metadata.get(key)
+    return value / 1e9 if isinstance(value, (int, float)) else None
+
+
+class Metrics:
+    """Counters, histograms and hooks for agent performance.
+
+    Agents record every model call (latency, time to first token, prefill
+    and decode time, token counts and tokens/sec from Ollama's response
+    metadata), every tool call (latency, outcome, cache hits), the tool
+    worker pools (workers, busy, queued, stuck threads, queue wait) and every
+    run (wall time, iterations). Read them with stats(), scrape them with
+    prometheus(), or subscribe to each event with add_hook().
+
+    Example:
+        >>> metrics = Metrics()
+        >>> agent = OllamaAgent(metrics=metrics)
+        >>> agent.run("What's 2+2?")
+        >>> metrics.stats()["llm"]["llama3.2"]["ttft"]["p50"]
+        >>> print(metrics.prometheus())
+    """
+
+    def __init__(self, namespace: str = "ollama_agent"):
+        """Initialize an empty registry.
+
+        Args:
+            namespace: Prefix of the exported metric names
+        """
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._hooks: List[Hook] = []
+
+    def add_hook(self, hook: Hook) -> None:
+        """Call hook(event, data) after every recorded event.
+
+        Events are "llm", "tool", "tool_pool" and "run"; data holds the same fields that
+        feed the metrics. Hooks run on the calling thread, so keep them
+        cheap. Exceptions raised by a hook are ignored.
+        """
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook: Hook) -> None:
+        """Stop calling a hook added with add_hook()."""
+        with self._lock:
+            self._hooks = [h for h in self._hooks if h is not hook]
+
+    def _emit(self, event: str, data: Dict[str, Any]) -> None:
+        for hook in self._hooks:
+            try:
+                hook(event, data)
+            except Exception:
+                pass
+
+    def _inc(self, name: str, labels: Labels, value: float = 1) -> None:
+        """Add to a counter; caller holds the lock."""
+        series = self._counters.setdefault(name, {})
+        series[labels] = series.get(labels, 0) + value
+
+    def _add(self, name: str, labels: Labels, value: float) -> None:
+        """Move a gauge up or down; caller holds the lock."""
+        series = self._gauges.setdefault(name, {})
+        series[labels] = series.get(labels, 0) + value
+
+    def _observe(self, name: str, labels: Labels, value: Optional[float]) -> None:
+        """Record a histogram observation; caller holds the lock."""
+        if value is None:
+            return
+        series = self._histograms.setdefault(name, {})
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram(_METRICS[name][2])
+        histogram.observe(value)
+
+    def record_llm(
+        self,
+        model: str,
+        seconds: float,
+        metadata: Optional[Dict[str, Any]] = None,
+        ttft: Optional[float] = None,
+        cached: bool = False,
+        error: bool = False,
+    ) -> None:
+        """Record one model call.
+
+        Args:
+            model: Model name
+            seconds: Wall time of the call
+            metadata: Ollama's response metadata (durations in nanoseconds,
+                     prompt_eval_count, eval_count)
+            ttft: Measured time to first token of a streamed call; estimated
+                 from load and prefill time when not given
+            cached: The answer came from the response cache
+            error: The call raised
+        """
+        metadata = metadata or {}
+        prefill = _ns(metadata, "prompt_eval_duration")
+        decode = _ns(metadata, "eval_duration")
+        prompt_tokens = _count(metadata, "prompt_eval_count")
+        eval_tokens = _count(metadata, "eval_count")
+        if ttft is None and prefill is not None:
+            ttft = (_ns(metadata, "load_duration") or 0.0) + prefill
+        tokens_per_second = eval_tokens / decode if eval_tokens and decode else None
+        data = {
+            "model": model,
+            "seconds": seconds,
+            "ttft": ttft,
+            "prefill": prefill,
+            "decode": decode,
+            "prompt_tokens": prompt_tokens,
+            "eval_tokens": eval_tokens,
+            "tokens_per_second": tokens_per_second,
+            "cached": cached,
+            "error": error,
+        }
+
+        labels = (("model", model),)
+        with self._lock:
+            self._inc("llm_calls_total", labels)
+            if cached:
+                self._inc("llm_cache_hits_total", labels)
+            if error:
+                self._inc("llm_errors_total", labels)
+            if not cached:
+                self._observe("llm_seconds", labels, seconds)
+                self._observe("llm_ttft_seconds", labels, ttft)
+                self._observe("llm_prefill_seconds", labels, prefill)
+                self._observe("llm_decode_seconds", labels, decode)
+                self._observe("llm_tokens_per_second", labels, tokens_per_second)
+                if prompt_tokens:
+                    self._inc("prompt_tokens_total", labels, prompt_tokens)
+                if eval_tokens:
+                    self._inc("eval_tokens_total", labels, eval_tokens)
+        self._emit("llm", data)
+
+    def record_tool(
+        self,
+        tool: str,
+        seconds: float,
+        ok: bool,
+        cached: bool = False,
+        timed_out: bool = False,
+    ) -> None:
+        """Record one tool call.
+
+        Args:
+            tool: Tool name
+            seconds: Wall time of the call
+            ok: The tool ran without raising
+            cached: The result came from the tool result cache
+            timed_out: The agent stopped waiting for the tool
+        """
+        labels = (("tool", tool),)
+        status = "timeout" if timed_out else "ok" if ok else "error"
+        with self._lock:
+            self._inc("tool_calls_total", labels + (("status", status),))
+            if cached:
+                self._inc("tool_cache_hits_total", labels)
+            self._observe("tool_seconds", labels, seconds)
+        self._emit(
+            "tool",
+            {"tool": tool, "seconds": seconds, "ok": ok, "cached": cached, "timed_out": timed_out},
+        )
+
+    def record_pool(
+        self,
+        workers: int = 0,
+        busy: int = 0,
+        queued: int = 0,
+        stuck: int = 0,
+        wait: Optional[float] = None,
+    ) -> None:
+        """Record a change in a tool worker pool.
+
+        Counts are changes rather than totals, so several pools reporting
+        to one registry add up.
+
+        Args:
+            workers: Change in worker threads
+            busy: Change in calls running
+            queued: Change in calls waiting for a worker
+            stuck: Change in threads running a call that timed out
+            wait: Queue wait of a call that just started
+        """
+        changes = {"workers": workers, "busy": busy, "queued": queued, "stuck": stuck}
+        with self._lock:
+            self._add("tool_workers", (), workers)
+            self._add("tool_workers_busy", (), busy)
+            self._add("tool_queue_depth", (), queued)
+            self._add("tool_workers_stuck", (), stuck)
+            self._observe("tool_queue_seconds", (), wait)
+        self._emit("tool_pool", {**changes, "wait": wait})
+
+    def record_run(self, model: str, seconds: float, iterations: int, outcome: str) -> None:
+        """Record one agent run.
+
+        Args:
+            model: Model name
+            seconds: Wall time of the run
+            iterations: Model calls made
+            outcome: "ok", "error", "max_iterations" or "cancelled"
+        """
+        labels = (("model", model),)
+        with self._lock:
+            self._inc("runs_total", labels + (("outcome", outcome),))
+            self._observe("run_seconds", labels, seconds)
+            self._observe("run_iterations", labels, iterations)
+        self._emit(
+            "run",
+            {"model": model, "seconds": seconds, "iterations": iterations, "outcome": outcome},
+        )
+
+    def reset(self) -> None:
+        """Drop all recorded values; hooks are kept."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._gauges.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a summary of the recorded metrics.
+
+        Returns:
+            Dict with "llm" (per model), "tools" (per tool), "tool_pool"
+            (worker pool gauges and queue wait, summed over pools) and
+            "runs" (per model). Counters split by status or outcome also get
+            one field per value (e.g. "error", "max_iterations"). Histograms
+            are summarized as count, avg, p50 and p95; percentiles are bucket
+            upper bounds.
+        """
+        groups: Dict[str, Dict[str, Any]] = {"llm": {}, "tools": {}, "tool_pool": {}, "runs": {}}
+
+        def entry_for(group: str, labels: Labels) -> Dict[str, Any]:
+            # Unlabelled metrics go straight into their group
+            return groups[group].setdefault(labels[0][1], {}) if labels else groups[group]
+
+        with self._lock:
+            for name, series in self._counters.items():
+                _, _, _, group, field = _METRICS[name]
+                for labels, value in series.items():
+                    entry = entry_for(group, labels)
+                    entry[field] = entry.get(field, 0) + value
+                    for _, extra in labels[1:]:
+                        entry[extra] = entry.get(extra, 0) + value
+            for name, series in self._gauges.items():
+                _, _, _, group, field = _METRICS[name]
+                for labels, value in series.items():
+                    entry_for(group, labels)[field] = value
+            for name, series in self._histograms.items():
+                _, _, _, group, field = _METRICS[name]
+                for labels, histogram in series.items():
+                    entry_for(group, labels)[field] = {
+                        "count": histogram.count,
+                        "avg": histogram.sum / histogram.count,
+                        "p50": histogram.quantile(0.5),
+                        "p95": histogram.quantile(0.95),
+                    }
+        return groups
+
+    def prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, help_text, *_) in _METRICS.items():
+                counters = self._counters.get(name) or self._gauges.get(name)
+                histograms = self._histograms.get(name)
+                if not counters and not histograms:
+                    continue
+                full = f"{self.namespace}_{name}"
+                lines.append(f"# HELP {full} {help_text}")
+                lines.append(f"# TYPE {full} {kind}")
+                for labels, value in sorted((counters or {}).items()):
+                    lines.append(f"{full}{_format_labels(labels)} {_format_number(value)}")
+                for labels, histogram in sorted((histograms or {}).items()):
+                    cumulative = 0
+                    bounds = list(histogram.buckets) + [float("inf")]
+                    for bound, n in zip(bounds, histogram.counts):
+                        cumulative += n
+                        le = f'le="{_format_number(bound)}"'
+                        lines.append(f"{full}_bucket{_format_labels(labels, le)} {cumulative}")
+                    lines.append(f"{full}_sum{_format_labels(labels)} {_format_number(histogram.sum)}")
+                    lines.append(f"{full}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Optional[Metrics]:
+    """Return the process-wide metrics registry, or None if METRICS_ENABLED is false.
+
+    Returns:
+        Shared Metrics instance, or None
+    """
+    global _metrics
+    if _metrics is None and default_config.metrics_enabled:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+    return _metrics
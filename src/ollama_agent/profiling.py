@@ -0,0 +1,302 @@
+"""Opt-in CPU and memory profiling of agent runs."""
+
+import cProfile
+import itertools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .config import config as default_config
+
+# From 3.12 cProfile hooks every thread at once and only one profiler may be
+# active; before that each thread has to be profiled on its own
+_PROFILES_ALL_THREADS = sys.version_info >= (3, 12)
+
+# tracemalloc is process-wide; count the runs using it so the last one stops it
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+# Functions and allocation sites listed per report
+DEFAULT_TOP = 25
+
+_IGNORED_FRAMES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+def _start_tracemalloc(frames: int) -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _tracemalloc_users = 1
+        elif _tracemalloc_users:
+            _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users:
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0:
+                tracemalloc.stop()
+
+
+def deep_size(obj: Any) -> int:
+    """Estimate the memory held by an object and everything it references.
+
+    Follows containers and object attributes (including pydantic models such
+    as LangChain messages); shared objects are counted once.
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        else:
+            attrs = getattr(item, "__dict__", None)
+            if attrs is not None:
+                stack.append(attrs)
+    return total
+
+
+class RunProfile:
+    """CPU and memory profile of one agent run, in progress or finished.
+
+    Attributes:
+        report: Summary dict once finished (see Profiler)
+        stats: Merged cProfile stats once finished, if CPU profiling was on
+        path: Report file written for this run, if any
+    """
+
+    def __init__(self, cpu: bool = True, memory: bool = True, frames: int = 1):
+        self.started = time.perf_counter()
+        self.report: Optional[Dict[str, Any]] = None
+        self.stats: Optional[pstats.Stats] = None
+        self.path: Optional[Path] = None
+        self._thread = threading.get_ident()
+        self._lock = threading.Lock()
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._cpu: Optional[cProfile.Profile] = None
+        self._memory = memory
+        self._start_snapshot: Optional[tracemalloc.Snapshot] = None
+        if memory:
+            _start_tracemalloc(frames)
+            self._start_snapshot = tracemalloc.take_snapshot()
+        if cpu:
+            self._cpu = cProfile.Profile()
+            try:
+                self._cpu.enable()
+            except ValueError:
+                # Another profiler is active (3.12+ allows one per process)
+                self._cpu = None
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        """Profile work this run hands to another thread, e.g. a tool call."""
+        if self._cpu is None or _PROFILES_ALL_THREADS or threading.get_ident() == self._thread:
+            yield
+            return
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._thread_profiles.append(profile)
+
+    def finish(self, messages: List[Any], top: int = DEFAULT_TOP, **info: Any) -> Dict[str, Any]:
+        """Stop profiling and build the report.
+
+        Args:
+            messages: The agent's conversation, measured for its footprint
+            top: Number of functions and allocation sites to report
+            **info: Extra fields for the report (model, outcome, ...)
+        """
+        report: Dict[str, Any] = {
+            **info,
+            "seconds": time.perf_counter() - self.started,
+            "messages": {"count": len(messages), "bytes": deep_size(messages)},
+        }
+        if self._cpu is not None:
+            self._cpu.disable()
+            stats = pstats.Stats(self._cpu)
+            with self._lock:
+                for profile in self._thread_profiles:
+                    stats.add(profile)
+            report["cpu"] = self._top_functions(stats, top)
+            self.stats = stats
+        if self._memory:
+            snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES)
+            current, peak = tracemalloc.get_traced_memory()
+            start = self._start_snapshot.filter_traces(_IGNORED_FRAMES)
+            report["memory"] = {
+                "traced_bytes": current,
+                "peak_bytes": peak,
+                "top": [
+                    {
+                        "site": str(diff.traceback[0]) if diff.traceback else "?",
+                        "size_diff": diff.size_diff,
+                        "size": diff.size,
+                        "count_diff": diff.count_diff,
+                    }
+                    for diff in snapshot.compare_to(start, "lineno")[:top]
+                ],
+            }
+            self._start_snapshot = None
+            _stop_tracemalloc()
+        self.report = report
+        return report
+
+    @staticmethod
+    def _top_functions(stats: pstats.Stats, top: int) -> List[Dict[str, Any]]:
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "self_seconds": self_time,
+                "cumulative_seconds": cumulative,
+            }
+            for (filename, line, name), (_, calls, self_time, cumulative, _) in rows[:top]
+        ]
+
+
+class Profiler:
+    """Profile every Nth agent run and dump the results to a directory.
+
+    Each profiled run writes ``<name>.json`` (top functions by cumulative
+    time, top allocation sites since the run started, traced and peak
+    memory, and the size of the agent's message list) and, with CPU
+    profiling on, ``<name>.prof`` for pstats or snakeviz. The oldest files
+    are deleted once the directory exceeds ``max_mb``.
+
+    CPU profiles of async runs include whatever else ran on the event loop
+    meanwhile. Memory profiling uses tracemalloc, which slows the whole
+    process down while a run is profiled.
+
+    Example:
+        >>> profiler = Profiler("profiles", every=100)
+        >>> agent = OllamaAgent(profiler=profiler)
+        >>> agent.run("...", profile=True)
+        >>> agent.last_profile.report["memory"]["top"][:3]
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        every: int = 1,
+        cpu: bool = True,
+        memory: bool = True,
+        top: int = DEFAULT_TOP,
+        frames: int = 1,
+        max_mb: float = 100,
+    ):
+        """Initialize the profiler.
+
+        Args:
+            directory: Where to write reports (default: keep them in memory only)
+            every: Profile one run in this many
+            cpu: Collect cProfile stats
+            memory: Collect tracemalloc snapshots
+            top: Functions and allocation sites per report
+            frames: Stack frames tracemalloc keeps per allocation
+            max_mb: Size cap of the directory, oldest files deleted first
+        """
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.directory = Path(directory).expanduser() if directory else None
+        self.every = every
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.frames = frames
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._runs = itertools.count()
+        self._seq = itertools.count()
+
+    def start(self, force: bool = False) -> Optional[RunProfile]:
+        """Start profiling a run if it is the Nth one (or forced)."""
+        if next(self._runs) % self.every and not force:
+            return None
+        return RunProfile(self.cpu, self.memory, self.frames)
+
+    def finish(self, profile: RunProfile, messages: List[Any], **info: Any) -> Dict[str, Any]:
+        """Finish a run's profile and write it out.
+
+        Args:
+            profile: Profile returned by start()
+            messages: The agent's conversation
+            **info: Extra fields for the report
+
+        Returns:
+            The report
+        """
+        report = profile.finish(messages, self.top, **info)
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            name = f"run-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self._seq)}"
+            profile.path = self.directory / f"{name}.json"
+            profile.path.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+            if "cpu" in report:
+                profile.stats.dump_stats(str(self.directory / f"{name}.prof"))
+            self._enforce_limit()
+        return report
+
+    def _enforce_limit(self) -> None:
+        """Delete the oldest files until the directory fits in max_bytes."""
+        files = []
+        for path in self.directory.iterdir():
+            if path.suffix in (".json", ".prof") and path.is_file():
+                stat = path.stat()
+                files.append((stat.st_mtime, path.name, path, stat.st_size))
+        total = sum(size for *_, size in files)
+        for _, _, path, size in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+_profiler: Optional[Profiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Optional[Profiler]:
+    """Return the process-wide profiler for PROFILE_DIR, or None if unset.
+
+    Returns:
+        Shared Profiler instance, or None
+    """
+    global _profiler
+    if _profiler is None and default_config.profile_dir:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = Profiler(
+                    default_config.profile_dir,
+                    every=default_config.profile_every,
+                    max_mb=default_config.profile_max_mb,
+                )
+    return _profiler
@@ -0,0 +1,90 @@
+"""Local BM25 index for picking the tools relevant to a query."""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+_CAMEL = re.compile(r"([a-z0-9])([A-Z])")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms.
+
+    snake_case and camelCase names are split into words, and a plural "s"
+    is dropped so "forecasts" matches "forecast".
+    """
+    terms = _WORD.findall(_CAMEL.sub(r"\1 \2", text).lower())
+    return [t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t for t in terms]
+
+
+class ToolIndex:
+    """BM25 index over tool names and descriptions.
+
+    Example:
+        >>> index = ToolIndex(tools)
+        >>> index.search("what's the weather in Paris", k=5)
+        ['weather', 'weather_detailed', ...]
+    """
+
+    def __init__(self, tools: Dict[str, Dict[str, Any]], k1: float = 1.2, b: float = 0.75):
+        """Index a tool registry.
+
+        Args:
+            tools: Tools dictionary (name -> {"description": ..., ...})
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.names = list(tools)
+        self._k1 = k1
+        self._b = b
+        # Tool names count twice, they are the most specific text a tool has
+        docs = [
+            tokenize(f"{name} {name} {info.get('description', '')}")
+            for name, info in tools.items()
+        ]
+        self._lengths = [len(doc) for doc in docs]
+        self._avg_length = sum(self._lengths) / len(docs) if docs else 0.0
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        for i, doc in enumerate(docs):
+            for term, count in Counter(doc).items():
+                self._postings.setdefault(term, []).append((i, count))
+        n = len(docs)
+        self._idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def matches(self, tools: Dict[str, Dict[str, Any]]) -> bool:
+        """Whether this index was built from a registry with the same tools."""
+        return len(tools) == len(self.names) and tools.keys() == set(self.names)
+
+    def scores(self, query: str) -> Dict[str, float]:
+        """BM25 score of every tool sharing a term with the query."""
+        totals: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i, count in self._postings[term]:
+                norm = self._k1 * (1 - self._b + self._b * self._lengths[i] / self._avg_length)
+                totals[i] = totals.get(i, 0.0) + idf * count * (self._k1 + 1) / (count + norm)
+        return {self.names[i]: score for i, score in totals.items()}
+
+    def search(self, query: str, k: int) -> List[str]:
+        """Return the k tools most relevant to a query, best first.
+
+        Tools matching no query term fill the remaining places in
+        registration order, so vague queries still see the first tools
+        (the built-ins, for the global registry).
+        """
+        scores = self.scores(query)
+        ranked = heapq.nlargest(k, scores, key=scores.__getitem__)
+        if len(ranked) < k:
+            ranked += [name for name in self.names if name not in scores][: k - len(ranked)]
+        return ranked
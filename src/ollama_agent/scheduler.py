@@ -0,0 +1,274 @@
+"""Priority- and fairness-aware scheduling of model calls."""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .config import config as default_config
+
+DEFAULT_TENANT = "default"
+
+# Priority used for background work such as history summaries and warm-ups
+BACKGROUND_PRIORITY = -10
+
+_request: ContextVar[Tuple[Optional[str], Optional[int]]] = ContextVar(
+    "ollama_agent_request", default=(None, None)
+)
+
+
+@contextmanager
+def scheduling(tenant: Optional[str] = None, priority: Optional[int] = None) -> Iterator[None]:
+    """Set the tenant and priority of model calls made inside the block.
+
+    Overrides the agent's own ``tenant`` and ``priority`` for the current
+    thread or task, which lets a shared agent serve requests for many tenants.
+
+    Args:
+        tenant: Tenant the calls are accounted to
+        priority: Higher runs first
+
+    Example:
+        >>> with scheduling(tenant="acme", priority=10):
+        ...     agent.run("Summarize today's tickets")
+    """
+    token = _request.set((tenant, priority))
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+
+def current_request() -> Tuple[Optional[str], Optional[int]]:
+    """Return the (tenant, priority) set by scheduling(), or (None, None)."""
+    return _request.get()
+
+
+class Ticket:
+    """A request's place in the scheduler, and how long it waited.
+
+    Attributes:
+        tenant: Tenant the request is accounted to
+        priority: Priority it was queued with
+        wait: Seconds spent queued before it was granted a slot
+    """
+
+    __slots__ = ("tenant", "priority", "wait", "_enqueued", "_state", "_notify")
+
+    def __init__(self, tenant: str, priority: int, enqueued: float):
+        self.tenant = tenant
+        self.priority = priority
+        self.wait = 0.0
+        self._enqueued = enqueued
+        self._state = "queued"  # queued -> granted | cancelled
+        self._notify: Optional[Callable[[], None]] = None
+
+
+class Scheduler:
+    """Share a limited number of in-flight model calls between tenants.
+
+    Ollama only runs a few generations in parallel (``OLLAMA_NUM_PARALLEL``);
+    more requests just queue inside it in arrival order. The scheduler keeps
+    that queue on the client side instead, where it can be reordered:
+
+    - Higher ``priority`` is always served first.
+    - Within a priority, tenants share slots in proportion to their weight
+      (start-time fair queuing), so one tenant's batch can't starve others.
+    - Each request records how long it waited for a slot.
+
+    Example:
+        >>> scheduler = Scheduler(max_in_flight=2, weights={"interactive": 4})
+        >>> agent = OllamaAgent(scheduler=scheduler, tenant="batch")
+        >>> with scheduler.slot("interactive", priority=10) as ticket:
+        ...     ...
+        >>> scheduler.stats()["tenants"]["batch"]["avg_wait"]
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        weights: Optional[Dict[str, float]] = None,
+        default_weight: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            max_in_flight: Max model calls running at once; match the
+                          server's parallelism
+            weights: Optional per-tenant share weights
+            default_weight: Weight of tenants not in ``weights``
+            clock: Time source, injectable for testing
+
+        Raises:
+            ValueError: If max_in_flight is less than 1
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.max_in_flight = max_in_flight
+        self.weights: Dict[str, float] = dict(weights or {})
+        self.default_weight = default_weight
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[int, float, int, Ticket]] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._queued = 0
+        # Virtual time: start tag of the last granted request
+        self._vtime = 0.0
+        self._finish: Dict[str, float] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def set_weight(self, tenant: str, weight: float) -> None:
+        """Set a tenant's share weight."""
+        with self._lock:
+            self.weights[tenant] = weight
+
+    def _enqueue(self, tenant: str, priority: int) -> Ticket:
+        """Create a ticket and grant it at once or queue it."""
+        ticket = Ticket(tenant, priority, self._clock())
+        with self._lock:
+            weight = self.weights.get(tenant, self.default_weight)
+            start = max(self._vtime, self._finish.get(tenant, 0.0))
+            self._finish[tenant] = start + 1.0 / weight
+            if self._in_flight < self.max_in_flight and not self._queue:
+                self._vtime = start
+                self._grant(ticket)
+            else:
+                heapq.heappush(self._queue, (-priority, start, next(self._seq), ticket))
+                self._queued += 1
+        return ticket
+
+    def _grant(self, ticket: Ticket) -> None:
+        """Give a ticket a slot and record its wait; caller holds the lock."""
+        ticket._state = "granted"
+        ticket.wait = self._clock() - ticket._enqueued
+        self._in_flight += 1
+        stats = self._stats.setdefault(
+            ticket.tenant, {"requests": 0, "total_wait": 0.0, "max_wait": 0.0}
+        )
+        stats["requests"] += 1
+        stats["total_wait"] += ticket.wait
+        stats["max_wait"] = max(stats["max_wait"], ticket.wait)
+        if ticket._notify is not None:
+            ticket._notify()
+
+    def _dispatch(self) -> None:
+        """Grant queued tickets while slots are free; caller holds the lock."""
+        while self._queue and self._in_flight < self.max_in_flight:
+            _, start, _, ticket = heapq.heappop(self._queue)
+            if ticket._state != "queued":
+                continue
+            self._queued -= 1
+            self._vtime = start
+            self._grant(ticket)
+
+    def _release(self, ticket: Ticket) -> None:
+        """Give back a granted slot, or withdraw a queued ticket."""
+        with self._lock:
+            if ticket._state == "granted":
+                self._in_flight -= 1
+            elif ticket._state == "queued":
+                self._queued -= 1
+            ticket._state = "cancelled"
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, tenant: str = DEFAULT_TENANT, priority: int = 0) -> Iterator[Ticket]:
+        """Hold an in-flight slot for the duration of the block.
+
+        Blocks the calling thread until the request is scheduled.
+
+        Args:
+            tenant: Tenant the call is accounted to
+            priority: Higher runs first
+
+        Yields:
+            The granted Ticket, with ``wait`` set
+        """
+        ticket = self._enqueue(tenant, priority)
+        try:
+            if ticket._state == "queued":
+                granted = threading.Event()
+                with self._lock:
+                    ticket._notify = granted.set
+                    if ticket._state == "granted":
+                        granted.set()
+                granted.wait()
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    @asynccontextmanager
+    async def aslot(self, tenant: str = DEFAULT_TENANT, priority: int = 0) -> AsyncIterator[Ticket]:
+        """Async version of slot(); waits without blocking the event loop."""
+        ticket = self._enqueue(tenant, priority)
+        try:
+            if ticket._state == "queued":
+                loop = asyncio.get_running_loop()
+                granted = loop.create_future()
+
+                def notify() -> None:
+                    loop.call_soon_threadsafe(
+                        lambda: granted.done() or granted.set_result(None)
+                    )
+
+                with self._lock:
+                    ticket._notify = notify
+                    if ticket._state == "granted":
+                        granted.set_result(None)
+                await granted
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of granted slots."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return self._queued
+
+    def stats(self) -> Dict[str, object]:
+        """Return scheduler counters.
+
+        Returns:
+            Dict with in_flight, queued and per-tenant requests, avg_wait
+            and max_wait (seconds)
+        """
+        with self._lock:
+            tenants = {
+                tenant: {
+                    "requests": int(s["requests"]),
+                    "avg_wait": s["total_wait"] / s["requests"] if s["requests"] else 0.0,
+                    "max_wait": s["max_wait"],
+                }
+                for tenant, s in self._stats.items()
+            }
+            return {"in_flight": self._in_flight, "queued": self._queued, "tenants": tenants}
+
+
+_scheduler: Optional[Scheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Optional[Scheduler]:
+    """Return the process-wide scheduler, or None if SCHEDULER_MAX_IN_FLIGHT is 0.
+
+    Returns:
+        Shared Scheduler instance, or None
+    """
+    global _scheduler
+    if _scheduler is None and default_config.scheduler_max_in_flight > 0:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = Scheduler(default_config.scheduler_max_in_flight)
+    return _scheduler
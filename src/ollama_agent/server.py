@@ -0,0 +1,598 @@
+"""Asyncio HTTP serving mode for ollama-agent.
+
+Endpoints:
+    GET    /health                 Liveness plus queue and session stats
+    GET    /metrics                Agent metrics in Prometheus text format
+    POST   /chat                   {"message", "session_id"?, "stream"?,
+                                    "tenant"?, "priority"?}
+    GET    /sessions/{id}          Stored transcript (?offset=&limit=)
+    DELETE /sessions/{id}          Forget a session and delete its log
+
+Streaming chat responses are newline-delimited JSON: one {"chunk": ...}
+object per piece of text, then {"done": true}.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Set
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .agent import OllamaAgent
+from .config import config as default_config
+from .scheduler import Scheduler, scheduling
+from .sessions import SessionManager
+from .store import ConversationStore, validate_session_id
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+_MAX_BODY = 1024 * 1024
+_MAX_HEADERS = 100
+
+
+class _HTTPError(Exception):
+    """An error answered with an HTTP status and JSON message."""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+@dataclass
+class _Request:
+    """A parsed HTTP request."""
+
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes = b""
+    keep_alive: bool = True
+    params: Dict[str, str] = field(default_factory=dict)
+
+    def json(self) -> Dict[str, Any]:
+        """Decode the body as a JSON object."""
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise _HTTPError(400, "Body must be valid JSON")
+        if not isinstance(data, dict):
+            raise _HTTPError(400, "Body must be a JSON object")
+        return data
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[_Request]:
+    """Read one HTTP/1.1 request, or None when the client closed the connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise _HTTPError(400, "Malformed request line")
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= _MAX_HEADERS:
+            raise _HTTPError(431, "Too many headers")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise _HTTPError(400, "Invalid Content-Length")
+    if length < 0:
+        raise _HTTPError(400, "Invalid Content-Length")
+    if length > _MAX_BODY:
+        raise _HTTPError(413, "Request body too large")
+    try:
+        body = await reader.readexactly(length) if length else b""
+    except asyncio.IncompleteReadError:
+        raise _HTTPError(400, "Request body shorter than Content-Length")
+
+    url = urlsplit(target)
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return _Request(
+        method=method.upper(),
+        path=unquote(url.path),
+        query={k: v[-1] for k, v in parse_qs(url.query).items()},
+        headers=headers,
+        body=body,
+        keep_alive=keep_alive,
+    )
+
+
+def _head(status: int, headers: Dict[str, str], keep_alive: bool) -> bytes:
+    """Build a response status line and headers."""
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+class AgentServer:
+    """HTTP front end for an agent with bounded admission and backpressure.
+
+    At most ``max_concurrency`` generations run against Ollama at once, each
+    on its own worker thread. Up to ``max_queue`` more requests wait for a
+    slot. Beyond that, requests are rejected right away with 429. A request
+    that waits longer than ``queue_timeout`` gets 503, as does any request
+    while the server is shutting down. Clients should retry these later.
+
+    Example:
+        >>> server = AgentServer(SessionManager(OllamaAgent()), port=8000)
+        >>> asyncio.run(server.serve_forever())
+    """
+
+    def __init__(
+        self,
+        manager: Optional[SessionManager] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        """Initialize the server. Call start() or serve_forever() to listen.
+
+        Args:
+            manager: SessionManager serving the sessions (default: a new one)
+            host: Interface to bind (default: from config or 127.0.0.1)
+            port: Port to bind, 0 picks a free one (default: from config or 8000)
+            max_concurrency: Max generations running at once (default: from config or 4)
+            max_queue: Max requests waiting for a slot (default: from config or 64)
+            queue_timeout: Max seconds a request waits for a slot
+                          (default: from config or 30)
+        """
+        self.manager = manager if manager is not None else SessionManager()
+        self.host = host if host is not None else default_config.server_host
+        self.port = port if port is not None else default_config.server_port
+        self.max_concurrency = max_concurrency or default_config.server_max_concurrency
+        self.max_queue = max_queue if max_queue is not None else default_config.server_max_queue
+        self.queue_timeout = (
+            queue_timeout if queue_timeout is not None else default_config.server_queue_timeout
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="ollama-agent-serve"
+        )
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._draining = False
+        # Connection handler tasks, and the writers of those waiting for a request
+        self._handlers: Set[asyncio.Task] = set()
+        self._idle: Set[asyncio.StreamWriter] = set()
+        self.active = 0
+        self.queued = 0
+        self.served = 0
+        self.rejected = 0
+
+    @property
+    def url(self) -> str:
+        """Base URL the server listens on."""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """Start listening. With port 0 the chosen port is stored in self.port."""
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Start (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.stop()
+
+    async def stop(self, grace: float = 10.0) -> None:
+        """Stop accepting requests and let running ones finish.
+
+        Queued requests get 503. Idle keep-alive connections are closed right
+        away; requests still running after ``grace`` seconds are cancelled.
+
+        Args:
+            grace: Seconds to wait for running requests
+        """
+        self._draining = True
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._idle):
+            writer.close()
+        if self._handlers:
+            _, pending = await asyncio.wait(set(self._handlers), timeout=grace)
+            for task in pending:
+                task.cancel()
+        if self._server is not None:
+            with suppress(Exception):
+                await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AgentServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+    @asynccontextmanager
+    async def _admit(self) -> AsyncIterator[None]:
+        """Hold a generation slot, queueing for one within the limits."""
+        if self._draining:
+            raise _HTTPError(503, "Server is shutting down", {"Retry-After": "5"})
+        if not self._slots.locked():
+            # A free slot is taken without yielding to the loop
+            await self._slots.acquire()
+        elif self.queued >= self.max_queue:
+            self.rejected += 1
+            raise _HTTPError(429, "Too many requests queued", {"Retry-After": "1"})
+        else:
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise _HTTPError(
+                    503, "Timed out waiting for a free slot", {"Retry-After": "5"}
+                )
+            finally:
+                self.queued -= 1
+        if self._draining:
+            self._slots.release()
+            raise _HTTPError(503, "Server is shutting down", {"Retry-After": "5"})
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.served += 1
+            self._slots.release()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until it closes."""
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while not self._draining:
+                self._idle.add(writer)
+                try:
+                    request = await _read_request(reader)
+                except _HTTPError as e:
+                    await self._send_error(writer, e, keep_alive=False)
+                    break
+                finally:
+                    self._idle.discard(writer)
+                if request is None:
+                    break
+                try:
+                    await self._dispatch(request, writer)
+                except _HTTPError as e:
+                    await self._send_error(writer, e, request.keep_alive)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception:
+                    logger.exception("Error handling %s %s", request.method, request.path)
+                    error = _HTTPError(500, "Internal server error")
+                    await self._send_error(writer, error, keep_alive=False)
+                    break
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    async def _dispatch(self, request: _Request, writer: asyncio.StreamWriter) -> None:
+        """Route a request to its handler."""
+        parts = [p for p in request.path.split("/") if p]
+        if parts == ["health"]:
+            allowed, handler = ("GET",), self._health
+        elif parts == ["metrics"]:
+            allowed, handler = ("GET",), self._metrics
+        elif parts == ["chat"]:
+            allowed, handler = ("POST",), self._chat
+        elif len(parts) == 2 and parts[0] == "sessions":
+            request.params["session_id"] = parts[1]
+            allowed = ("GET", "DELETE")
+            handler = self._get_session if request.method == "GET" else self._delete_session
+        else:
+            raise _HTTPError(404, f"No route for {request.path}")
+        if request.method not in allowed:
+            raise _HTTPError(405, f"Use {' or '.join(allowed)}", {"Allow": ", ".join(allowed)})
+        await handler(request, writer)
+
+    async def _send_json(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Dict[str, Any],
+        keep_alive: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Write a complete JSON response."""
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        head = {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(body)),
+            **(headers or {}),
+        }
+        writer.write(_head(status, head, keep_alive) + body)
+        await writer.drain()
+
+    async def _send_error(
+        self, writer: asyncio.StreamWriter, error: _HTTPError, keep_alive: bool
+    ) -> None:
+        """Write an error response."""
+        await self._send_json(
+            writer, error.status, {"error": error.message}, keep_alive, error.headers
+        )
+
+    async def _health(self, request: _Request, writer: asyncio.StreamWriter) -> None:
+        scheduler = self.manager.agent.scheduler
+        endpoints = self.manager.agent.endpoints
+        await self._send_json(
+            writer,
+            200,
+            {
+                "status": "draining" if self._draining else "ok",
+                "active": self.active,
+                "queued": self.queued,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "served": self.served,
+                "rejected": self.rejected,
+                "sessions": self.manager.stats(),
+                "scheduler": scheduler.stats() if scheduler is not None else None,
+                "endpoints": endpoints.stats() if endpoints is not None else None,
+                "tool_pool": self.manager.agent.tool_executor.stats(),
+            },
+            request.keep_alive,
+        )
+
+    async def _metrics(self, request: _Request, writer: asyncio.StreamWriter) -> None:
+        metrics = self.manager.agent.metrics
+        body = (metrics.prometheus() if metrics is not None else "").encode()
+        head = {
+            "Content-Type": "text/plain; version=0.0.4; charset=utf-8",
+            "Content-Length": str(len(body)),
+        }
+        writer.write(_head(200, head, request.keep_alive) + body)
+        await writer.drain()
+
+    def _generation(
+        self, session_id: Optional[str], message: str, tenant: Optional[str], priority: Optional[int]
+    ) -> str:
+        """Run a turn, in a session or a one-off conversation."""
+        with scheduling(tenant, priority):
+            if session_id is None:
+                return self.manager.agent._fork().run(message)
+            return self.manager.run(session_id, message)
+
+    def _generation_stream(
+        self, session_id: Optional[str], message: str, tenant: Optional[str], priority: Optional[int]
+    ) -> Iterator[str]:
+        """Streaming version of _generation."""
+        with scheduling(tenant, priority):
+            if session_id is None:
+                yield from self.manager.agent._fork().run_stream(message)
+            else:
+                yield from self.manager.run_stream(session_id, message)
+
+    async def _chat(self, request: _Request, writer: asyncio.StreamWriter) -> None:
+        body = request.json()
+        message = body.get("message")
+        if not isinstance(message, str) or not message:
+            raise _HTTPError(400, "'message' must be a non-empty string")
+        session_id = body.get("session_id")
+        if session_id is not None:
+            try:
+                validate_session_id(session_id)
+            except ValueError as e:
+                raise _HTTPError(400, str(e))
+        tenant = body.get("tenant")
+        priority = body.get("priority")
+        if tenant is not None and not isinstance(tenant, str):
+            raise _HTTPError(400, "'tenant' must be a string")
+        if priority is not None and not isinstance(priority, int):
+            raise _HTTPError(400, "'priority' must be an integer")
+
+        loop = asyncio.get_running_loop()
+        async with self._admit():
+            if not body.get("stream", False):
+                response = await loop.run_in_executor(
+                    self._executor, self._generation, session_id, message, tenant, priority
+                )
+                await self._send_json(
+                    writer,
+                    200,
+                    {"response": response, "session_id": session_id},
+                    request.keep_alive,
+                )
+                return
+            await self._stream(
+                writer,
+                lambda: self._generation_stream(session_id, message, tenant, priority),
+                {"done": True, "session_id": session_id},
+                request.keep_alive,
+            )
+
+    async def _stream(
+        self,
+        writer: asyncio.StreamWriter,
+        make_chunks: Callable[[], Iterator[str]],
+        final: Dict[str, Any],
+        keep_alive: bool,
+    ) -> None:
+        """Run a chunk generator on a worker thread and stream it as NDJSON.
+
+        If the client goes away, the generator is closed at its next chunk,
+        which also stops the model generation.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        done = object()
+
+        def put(item: Any) -> None:
+            with suppress(RuntimeError):
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        def produce() -> None:
+            try:
+                chunks = make_chunks()
+                try:
+                    for chunk in chunks:
+                        if cancelled.is_set():
+                            break
+                        put(chunk)
+                finally:
+                    chunks.close()
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        worker = loop.run_in_executor(self._executor, produce)
+        try:
+            head = {"Content-Type": "application/x-ndjson", "Transfer-Encoding": "chunked"}
+            writer.write(_head(200, head, keep_alive))
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    line = {"error": str(item)}
+                else:
+                    line = {"chunk": item}
+                await self._write_chunk(writer, line)
+            await self._write_chunk(writer, final)
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            cancelled.set()
+            # Keep the slot until the worker thread is actually free
+            await worker
+
+    async def _write_chunk(self, writer: asyncio.StreamWriter, payload: Dict[str, Any]) -> None:
+        """Write one NDJSON line as an HTTP chunk."""
+        data = json.dumps(payload, ensure_ascii=False).encode() + b"\n"
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+    async def _get_session(self, request: _Request, writer: asyncio.StreamWriter) -> None:
+        session_id = request.params["session_id"]
+        try:
+            offset = int(request.query.get("offset", 0))
+            limit = int(request.query["limit"]) if "limit" in request.query else None
+            validate_session_id(session_id)
+        except ValueError as e:
+            raise _HTTPError(400, str(e))
+        store = self.manager.store
+        if not await asyncio.to_thread(store.exists, session_id):
+            raise _HTTPError(404, f"Session '{session_id}' not found")
+        messages = await asyncio.to_thread(
+            lambda: list(store.iter_history(session_id, offset, limit))
+        )
+        await self._send_json(
+            writer,
+            200,
+            {"session_id": session_id, "offset": offset, "messages": messages},
+            request.keep_alive,
+        )
+
+    async def _delete_session(self, request: _Request, writer: asyncio.StreamWriter) -> None:
+        session_id = request.params["session_id"]
+        try:
+            validate_session_id(session_id)
+        except ValueError as e:
+            raise _HTTPError(400, str(e))
+        await asyncio.to_thread(self.manager.drop, session_id, True)
+        await self._send_json(writer, 200, {"deleted": session_id}, request.keep_alive)
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Command-line entry point: ``ollama-agent-serve``."""
+    parser = argparse.ArgumentParser(
+        prog="ollama-agent-serve", description="Serve an Ollama agent over HTTP."
+    )
+    parser.add_argument("--host", default=default_config.server_host)
+    parser.add_argument("--port", type=int, default=default_config.server_port)
+    parser.add_argument("--model", default=None, help="Ollama model (default: OLLAMA_MODEL)")
+    parser.add_argument("--base-url", default=None, help="Ollama URL (default: OLLAMA_BASE_URL)")
+    parser.add_argument(
+        "--max-concurrency", type=int, default=default_config.server_max_concurrency,
+        help="Generations running against Ollama at once",
+    )
+    parser.add_argument(
+        "--max-queue", type=int, default=default_config.server_max_queue,
+        help="Requests allowed to wait for a slot before 429",
+    )
+    parser.add_argument(
+        "--queue-timeout", type=float, default=default_config.server_queue_timeout,
+        help="Seconds a request may wait for a slot before 503",
+    )
+    parser.add_argument(
+        "--max-in-flight", type=int, default=default_config.scheduler_max_in_flight,
+        help="Model calls sent to Ollama at once, queued by priority and tenant (0: no limit)",
+    )
+    parser.add_argument(
+        "--store", default=default_config.session_store_path,
+        help="Directory for session logs (default: SESSION_STORE_PATH or a temp dir)",
+    )
+    args = parser.parse_args(argv)
+
+    store = ConversationStore(args.store) if args.store else None
+    scheduler = Scheduler(args.max_in_flight) if args.max_in_flight > 0 else None
+    agent = OllamaAgent(
+        model=args.model, base_url=args.base_url, store=store, scheduler=scheduler
+    )
+    server = AgentServer(
+        SessionManager(agent),
+        host=args.host,
+        port=args.port,
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        queue_timeout=args.queue_timeout,
+    )
+
+    async def serve() -> None:
+        await server.start()
+        print(f"Serving {agent.model} on {server.url}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Multi-tenant session manager sharing one model client."""
+
+import asyncio
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from .agent import OllamaAgent
+from .config import config as default_config
+from .store import ConversationStore, validate_session_id
+
+# Rough per-object costs used for the memory estimate, in bytes
+_SESSION_OVERHEAD = 2048
+_MESSAGE_OVERHEAD = 256
+
+# Threads arun uses to wait for a busy session. Not the event loop's default
+# executor: async tools run there (web_search uses asyncio.to_thread), and
+# waiters filling it would starve the very turn they wait for.
+_lock_waiters: Optional[ThreadPoolExecutor] = None
+_lock_waiters_lock = threading.Lock()
+
+
+def _get_lock_waiters() -> ThreadPoolExecutor:
+    """Return the process-wide pool arun waits for session locks on."""
+    global _lock_waiters
+    if _lock_waiters is None:
+        with _lock_waiters_lock:
+            if _lock_waiters is None:
+                _lock_waiters = ThreadPoolExecutor(thread_name_prefix="ollama-agent-session")
+    return _lock_waiters
+
+
+def _session_size(agent: OllamaAgent) -> int:
+    """Estimate the memory held by a session's conversation state."""
+    messages = agent._messages[1:]
+    return _SESSION_OVERHEAD + sum(
+        len(str(msg.content)) + _MESSAGE_OVERHEAD for msg in messages
+    )
+
+
+class _Session:
+    """In-memory state of one session."""
+
+    __slots__ = ("agent", "lock", "loaded", "busy", "size", "measured", "last_used")
+
+    def __init__(self, agent: OllamaAgent, now: float):
+        self.agent = agent
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.busy = 0
+        self.size = 0
+        # Size measured at the end of the last turn, under the lock
+        self.measured = 0
+        self.last_used = now
+
+
+class SessionManager:
+    """Hand out per-session conversations backed by one shared agent.
+
+    Every session is a fork of a single template agent: the model client,
+    tools, tool pool and system prompt are shared, and only the message
+    list is per session. Sessions are kept in LRU order and evicted when
+    idle too long, when there are too many, or when their estimated memory
+    use exceeds the cap. Every finished turn is appended to the store, so
+    an evicted session is simply reloaded from disk on its next request.
+
+    Turns on the same session run one at a time; different sessions run
+    concurrently.
+
+    Example:
+        >>> manager = SessionManager(OllamaAgent(), store=ConversationStore("sessions"))
+        >>> manager.run("alice", "Hi, I'm Alice")
+        >>> with manager.session("alice") as agent:
+        ...     print(agent.get_history())
+    """
+
+    def __init__(
+        self,
+        agent: Optional[OllamaAgent] = None,
+        store: Optional[ConversationStore] = None,
+        max_sessions: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        max_memory_mb: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the manager.
+
+        Args:
+            agent: Template agent whose model client and tools are shared
+                  (default: a new OllamaAgent())
+            store: Where sessions spill to. Defaults to the agent's store,
+                  then SESSION_STORE_PATH, then a temporary directory.
+            max_sessions: Max sessions kept in memory (default: from config or 10000)
+            idle_timeout: Seconds before an unused session is evicted, 0 = never
+                         (default: from config or 1800)
+            max_memory_mb: Approximate memory cap for in-memory sessions
+                          (default: from config or 512)
+            clock: Time source, injectable for testing
+        """
+        self.agent = agent if agent is not None else OllamaAgent()
+        if store is None:
+            store = self.agent.store
+        if store is None and default_config.session_store_path:
+            store = ConversationStore(default_config.session_store_path)
+        if store is None:
+            store = ConversationStore(tempfile.mkdtemp(prefix="ollama-agent-sessions-"))
+        self.store = store
+
+        self.max_sessions = (
+            max_sessions if max_sessions is not None else default_config.session_max_active
+        )
+        self.idle_timeout = (
+            idle_timeout if idle_timeout is not None else default_config.session_idle_timeout
+        )
+        if max_memory_mb is None:
+            max_memory_mb = default_config.session_max_memory_mb
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self._clock = clock
+
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def _acquire(self, session_id: str) -> _Session:
+        """Get or create a session entry and mark it busy."""
+        validate_session_id(session_id)
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                forked = self.agent._fork()
+                forked.store = self.store
+                entry = _Session(forked, self._clock())
+                self._sessions[session_id] = entry
+            else:
+                self.hits += 1
+                self._sessions.move_to_end(session_id)
+            entry.busy += 1
+            entry.last_used = self._clock()
+            self._evict_locked()
+        return entry
+
+    def _enter(self, session_id: str, entry: _Session) -> None:
+        """Load a session's messages on first use; caller holds entry.lock."""
+        if not entry.loaded:
+            entry.agent.resume(session_id)
+            entry.loaded = True
+            self.loads += 1
+
+    def _lock_and_enter(self, session_id: str, entry: _Session) -> None:
+        """Take entry.lock and load the session, releasing the lock on failure."""
+        entry.lock.acquire()
+        try:
+            self._enter(session_id, entry)
+        except BaseException:
+            entry.lock.release()
+            raise
+
+    def _release(self, entry: _Session) -> None:
+        """Update the memory estimate and usage counters, and evict."""
+        with self._lock:
+            if self._sessions.get(entry.agent.session_id) is entry:
+                self._bytes += entry.measured - entry.size
+            entry.size = entry.measured
+            entry.busy -= 1
+            entry.last_used = self._clock()
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """Evict least recently used sessions; caller holds the lock."""
+        now = self._clock()
+        skipped = 0
+        while len(self._sessions) > skipped:
+            session_id, entry = next(iter(self._sessions.items()))
+            over = len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes
+            idle = self.idle_timeout > 0 and now - entry.last_used > self.idle_timeout
+            if not (over or idle):
+                break
+            if entry.busy:
+                # In use right now; look past it
+                self._sessions.move_to_end(session_id)
+                skipped += 1
+                continue
+            del self._sessions[session_id]
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[OllamaAgent]:
+        """Use a session's agent exclusively for the duration of the block.
+
+        Args:
+            session_id: Session to use; unknown ids start a new session
+
+        Yields:
+            The session's OllamaAgent
+        """
+        entry = self._acquire(session_id)
+        try:
+            with entry.lock:
+                try:
+                    self._enter(session_id, entry)
+                    yield entry.agent
+                finally:
+                    # Finished turns are already in the store (see _end_turn)
+                    entry.measured = _session_size(entry.agent)
+        finally:
+            self._release(entry)
+
+    def run(self, session_id: str, query: str, verbose: bool = False) -> str:
+        """Run a query in a session.
+
+        Args:
+            session_id: Session to run in
+            query: User query/prompt
+            verbose: If True, print tool execution info
+
+        Returns:
+            Final response string from the agent
+        """
+        with self.session(session_id) as agent:
+            return agent.run(query, verbose=verbose)
+
+    async def arun(self, session_id: str, query: str, verbose: bool = False) -> str:
+        """Run a query in a session without blocking the event loop.
+
+        Args:
+            session_id: Session to run in
+            query: User query/prompt
+            verbose: If True, print tool execution info
+
+        Returns:
+            Final response string from the agent
+        """
+        entry = self._acquire(session_id)
+        try:
+            entering = asyncio.get_running_loop().run_in_executor(
+                _get_lock_waiters(), self._lock_and_enter, session_id, entry
+            )
+            try:
+                await asyncio.shield(entering)
+            except asyncio.CancelledError:
+                # The thread still takes the lock; hand it back once it has
+                entering.add_done_callback(
+                    lambda f: f.cancelled() or f.exception() or entry.lock.release()
+                )
+                raise
+            try:
+                return await entry.agent.arun(query, verbose=verbose)
+            finally:
+                entry.measured = _session_size(entry.agent)
+                entry.lock.release()
+        finally:
+            self._release(entry)
+
+    def run_stream(self, session_id: str, query: str, verbose: bool = False) -> Iterator[str]:
+        """Stream a response in a session.
+
+        The session stays busy until the generator is exhausted or closed.
+
+        Args:
+            session_id: Session to run in
+            query: User query/prompt
+            verbose: If True, print tool execution info
+
+        Yields:
+            Text chunks of the final answer
+        """
+        with self.session(session_id) as agent:
+            yield from agent.run_stream(query, verbose=verbose)
+
+    def evict_idle(self) -> None:
+        """Evict sessions past the idle timeout without waiting for a request."""
+        with self._lock:
+            self._evict_locked()
+
+    def drop(self, session_id: str, delete: bool = False) -> None:
+        """Remove a session from memory.
+
+        Args:
+            session_id: Session to drop
+            delete: If True, also delete its stored log
+        """
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry.size
+        if delete:
+            self.store.delete(session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def stats(self) -> Dict[str, int]:
+        """Return session counters.
+
+        Returns:
+            Dict with active sessions, estimated bytes, hits, loads and evictions
+        """
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,277 @@
+"""Append-only conversation store for saving and resuming sessions."""
+
+import json
+import os
+import re
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from .history import SUMMARY_NAME, is_summary
+
+# Compact record codes. Each log line is a JSON array whose first item is one
+# of these; the rest depends on the kind:
+#   ["u", content]                  user message (or text-protocol tool result)
+#   ["a", content, tool_calls?]     assistant message
+#   ["t", content, tool_call_id]    native tool result
+#   ["S", summary, kept]            rolling summary replacing all earlier
+#                                   messages except the last `kept`
+#   ["x"]                           conversation cleared
+_USER = "u"
+_ASSISTANT = "a"
+_TOOL = "t"
+_SUMMARY = "S"
+_CLEAR = "x"
+
+# Marker lines start with these bytes, so the live tail can be found
+# without parsing the records before it
+_SUMMARY_PREFIX = b'["S",'
+_CLEAR_LINE = b'["x"]'
+
+_ROLES = {_USER: "user", _ASSISTANT: "assistant", _TOOL: "tool", _SUMMARY: "system"}
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+def validate_session_id(session_id: str) -> str:
+    """Check that a session id is safe to use as a file name.
+
+    Args:
+        session_id: Session id to check
+
+    Returns:
+        The session id
+
+    Raises:
+        ValueError: If the id contains anything but letters, digits, '_', '-' or '.'
+    """
+    if not isinstance(session_id, str) or not _SESSION_ID.match(session_id):
+        raise ValueError(
+            f"Invalid session id '{session_id}': use letters, digits, '_', '-' or '.'"
+        )
+    return session_id
+
+
+def _encode(message: BaseMessage) -> bytes:
+    """Encode a message as one compact log line."""
+    if is_summary(message):
+        raise ValueError("Summaries are written with append_summary()")
+    if isinstance(message, AIMessage):
+        record: list = [_ASSISTANT, message.content]
+        if message.tool_calls:
+            record.append(message.tool_calls)
+    elif isinstance(message, ToolMessage):
+        record = [_TOOL, message.content, message.tool_call_id]
+    elif isinstance(message, HumanMessage):
+        record = [_USER, message.content]
+    else:
+        raise ValueError(f"Cannot store message of type '{message.type}'")
+    return _dump(record)
+
+
+def _dump(record: list) -> bytes:
+    """Serialize a record without whitespace."""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+def _decode(record: list) -> BaseMessage:
+    """Rebuild a LangChain message from a record."""
+    kind = record[0]
+    if kind == _ASSISTANT:
+        tool_calls = record[2] if len(record) > 2 else []
+        return AIMessage(content=record[1], tool_calls=tool_calls)
+    if kind == _TOOL:
+        return ToolMessage(content=record[1], tool_call_id=record[2])
+    if kind == _SUMMARY:
+        return SystemMessage(content=record[1], name=SUMMARY_NAME)
+    return HumanMessage(content=record[1])
+
+
+class ConversationStore:
+    """Per-session append-only message logs in a directory.
+
+    Each session is a ``<session_id>.jsonl`` file of compact records. Turns
+    are appended, never rewritten, so saving costs one small write per turn
+    however long the conversation gets. When the agent folds old turns into
+    a summary, a summary marker is appended; loading starts from the last
+    marker, so resuming a long session only parses the live tail.
+
+    Example:
+        >>> store = ConversationStore("~/.local/share/ollama-agent/sessions")
+        >>> agent = OllamaAgent(store=store, session_id="alice")
+        >>> agent.run("Hi, I'm Alice")
+        >>> # later, in another process
+        >>> agent = OllamaAgent(store=store, session_id="alice")
+        >>> agent.run("What's my name?")
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """Initialize the store, creating the directory if needed.
+
+        Args:
+            path: Directory holding the session logs
+        """
+        self.path = Path(path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _file(self, session_id: str) -> Path:
+        """Return the log file for a session, validating the id."""
+        return self.path / f"{validate_session_id(session_id)}.jsonl"
+
+    def _lock(self, session_id: str) -> threading.Lock:
+        """Return the write lock for a session."""
+        with self._locks_guard:
+            lock = self._locks.get(session_id)
+            if lock is None:
+                lock = self._locks[session_id] = threading.Lock()
+            return lock
+
+    def _write(self, session_id: str, data: bytes) -> None:
+        """Append raw record bytes to a session log."""
+        path = self._file(session_id)
+        with self._lock(session_id):
+            with open(path, "ab") as f:
+                f.write(data)
+
+    def append(self, session_id: str, messages: List[BaseMessage]) -> None:
+        """Append messages to a session log.
+
+        Args:
+            session_id: Session to write to
+            messages: User, assistant or tool messages, in order
+        """
+        if messages:
+            self._write(session_id, b"".join(_encode(msg) for msg in messages))
+
+    def append_summary(self, session_id: str, summary: BaseMessage, kept: int) -> None:
+        """Record that earlier messages were folded into a summary.
+
+        Args:
+            session_id: Session to write to
+            summary: The summary message
+            kept: Number of most recent messages that stay verbatim after it
+        """
+        self._write(session_id, _dump([_SUMMARY, summary.content, kept]))
+
+    def clear(self, session_id: str) -> None:
+        """Record that the conversation was reset. The transcript is kept."""
+        self._write(session_id, _CLEAR_LINE + b"\n")
+
+    def save(self, session_id: str, messages: List[BaseMessage]) -> None:
+        """Replace a session log with a snapshot of live messages.
+
+        Useful to shrink a log whose early turns were summarized away. The
+        file is swapped atomically, so readers never see a partial log.
+
+        Args:
+            session_id: Session to write
+            messages: Conversation messages without the system prompt; a
+                     summary may only come first
+        """
+        lines = [
+            # A leading summary keeps nothing from before it
+            _dump([_SUMMARY, msg.content, 0]) if is_summary(msg) else _encode(msg)
+            for msg in messages
+        ]
+        path = self._file(session_id)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with self._lock(session_id):
+            tmp.write_bytes(b"".join(lines))
+            os.replace(tmp, path)
+
+    def _read_lines(self, session_id: str) -> List[bytes]:
+        """Read a session log as raw lines, without parsing them."""
+        try:
+            data = self._file(session_id).read_bytes()
+        except FileNotFoundError:
+            return []
+        return data.splitlines()
+
+    def load(self, session_id: str) -> List[BaseMessage]:
+        """Load the live messages of a session.
+
+        Only records from the last summary or clear marker onward are
+        parsed; the summarized part of a long conversation is skipped.
+
+        Args:
+            session_id: Session to load
+
+        Returns:
+            Messages to place after the system prompt (empty if the session
+            does not exist)
+        """
+        lines = self._read_lines(session_id)
+        start = 0
+        for i in range(len(lines) - 1, -1, -1):
+            line = lines[i]
+            if line == _CLEAR_LINE:
+                start = i + 1
+                break
+            if line.startswith(_SUMMARY_PREFIX):
+                kept = json.loads(line)[2]
+                # The kept messages are the message lines right before the
+                # marker; an earlier summary among them is replayed too
+                start = i
+                while kept and start > 0:
+                    start -= 1
+                    if lines[start] and not lines[start].startswith(_SUMMARY_PREFIX):
+                        kept -= 1
+                break
+
+        messages: List[BaseMessage] = []
+        for line in lines[start:]:
+            if not line:
+                continue
+            record = json.loads(line)
+            if record[0] == _SUMMARY:
+                kept = messages[max(len(messages) - record[2], 0):] if record[2] else []
+                messages = [_decode(record)] + kept
+            else:
+                messages.append(_decode(record))
+        return messages
+
+    def iter_history(
+        self, session_id: str, offset: int = 0, limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over the full transcript of a session, oldest first.
+
+        Unlike load(), this includes turns that were summarized or cleared.
+        Records before ``offset`` are skipped without being parsed.
+
+        Args:
+            session_id: Session to read
+            offset: Number of messages to skip
+            limit: Max messages to yield (default: all)
+
+        Yields:
+            {"role": str, "content": str} dicts
+        """
+        lines = (line for line in self._read_lines(session_id) if line and line != _CLEAR_LINE)
+        stop = None if limit is None else offset + limit
+        for line in islice(lines, offset, stop):
+            record = json.loads(line)
+            yield {"role": _ROLES[record[0]], "content": record[1]}
+
+    def exists(self, session_id: str) -> bool:
+        """Check whether a session log exists."""
+        return self._file(session_id).exists()
+
+    def delete(self, session_id: str) -> None:
+        """Delete a session log if it exists."""
+        with self._lock(session_id):
+            self._file(session_id).unlink(missing_ok=True)
+
+    def sessions(self) -> List[str]:
+        """List stored session ids."""
+        return sorted(p.stem for p in self.path.glob("*.jsonl"))
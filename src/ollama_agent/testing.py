@@ -0,0 +1,197 @@
+"""Fake Ollama server for end-to-end tests and benchmarks."""
+
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# A reply is plain text, or a message dict (e.g. with "tool_calls")
+Reply = Union[str, Dict[str, Any]]
+
+_TOKEN = re.compile(r"\s*\S+|\s+")
+
+
+def _tokens(text: str) -> List[str]:
+    """Split text into word-sized tokens, keeping whitespace."""
+    return _TOKEN.findall(text) or [""]
+
+
+class FakeOllama:
+    """Minimal stand-in for the Ollama HTTP API.
+
+    Serves ``/api/chat`` (streaming NDJSON or a single JSON reply),
+    ``/api/tags`` and ``/api/version`` from a background thread. Replies are
+    scripted, so agents, the server mode and benchmarks can be exercised
+    without a model.
+
+    Example:
+        >>> with FakeOllama(["TOOL: calculator\\nINPUT: 2+2", "It's 4."]) as fake:
+        ...     agent = OllamaAgent(base_url=fake.url)
+        ...     agent.run("What's 2+2?")
+        "It's 4."
+    """
+
+    def __init__(
+        self,
+        replies: Union[Reply, List[Reply], Callable[[List[Dict[str, Any]]], Reply], None] = None,
+        latency: float = 0.0,
+        token_delay: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """Initialize the fake server. Call start() or use it as a context manager.
+
+        Args:
+            replies: A fixed reply, a list of replies served in turn (the
+                    last one repeats), or a function of the request messages
+            latency: Seconds to wait before the first token
+            token_delay: Seconds to wait between streamed tokens
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+        """
+        if replies is None:
+            replies = "Hello from FakeOllama."
+        self.replies = replies
+        self.latency = latency
+        self.token_delay = token_delay
+        self.requests: List[Dict[str, Any]] = []
+        self._next = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass to OllamaAgent(base_url=...)."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllama":
+        """Start serving in a daemon thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="fake-ollama",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllama":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _reply(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Pick the next reply and normalize it to a message dict."""
+        if callable(self.replies):
+            reply = self.replies(messages)
+        elif isinstance(self.replies, list):
+            with self._lock:
+                reply = self.replies[min(self._next, len(self.replies) - 1)]
+                self._next += 1
+        else:
+            reply = self.replies
+        if isinstance(reply, str):
+            return {"role": "assistant", "content": reply}
+        return {"role": "assistant", "content": "", **reply}
+
+    def _handler_class(self) -> type:
+        """Build the request handler bound to this instance."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; don't let them wait on ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_chunk(self, payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload).encode() + b"\n"
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self) -> None:
+                if self.path == "/api/tags":
+                    self._send_json({"models": [{"name": "fake", "model": "fake"}]})
+                elif self.path == "/api/version":
+                    self._send_json({"version": "0.0.0-fake"})
+                else:
+                    self._send_json({"error": "not found"}, 404)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path != "/api/chat":
+                    self._send_json({"error": "not found"}, 404)
+                    return
+                with fake._lock:
+                    fake.requests.append(request)
+
+                messages = request.get("messages", [])
+                message = fake._reply(messages)
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+                model = request.get("model", "fake")
+                prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+                tokens = _tokens(message["content"])
+                final = {
+                    "model": model,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "done": True,
+                    "done_reason": "stop",
+                    "total_duration": int((fake.latency + fake.token_delay * len(tokens)) * 1e9),
+                    "load_duration": 0,
+                    "prompt_eval_count": prompt_chars // 4 + 1,
+                    "prompt_eval_duration": int(fake.latency * 1e9),
+                    "eval_count": len(tokens),
+                    "eval_duration": int(fake.token_delay * len(tokens) * 1e9),
+                }
+
+                if not request.get("stream", True):
+                    self._send_json({**final, "message": message})
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for i, token in enumerate(tokens):
+                        if i and fake.token_delay:
+                            time.sleep(fake.token_delay)
+                        part = {"role": "assistant", "content": token}
+                        if i == 0 and message.get("tool_calls"):
+                            part["tool_calls"] = message["tool_calls"]
+                        self._write_chunk(
+                            {"model": model, "created_at": final["created_at"],
+                             "message": part, "done": False}
+                        )
+                    self._write_chunk({**final, "message": {"role": "assistant", "content": ""}})
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client cancelled the generation
+                    self.close_connection = True
+
+        return Handler
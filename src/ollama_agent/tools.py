@@ -1,29 +1,333 @@
 """Tool registry and built-in tools for ollama-agent."""
 
-import json
+import asyncio
+import inspect
 import math
 import os
 import subprocess
-import urllib.error
-import urllib.request
+import threading
+from collections.abc import MutableMapping
+from contextvars import ContextVar
 from datetime import datetime
 from functools import wraps
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional
-
-from ddgs import DDGS
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Mapping, NamedTuple, Optional
 
+from .cache import TTLCache
 from .config import config
 from .exceptions import ToolNotFoundError, ToolRegistrationError
+from .http_client import get_http_client
+
+if TYPE_CHECKING:
+    import httpx
+    from ddgs import DDGS
+
+
+class RegistrySnapshot(NamedTuple):
+    """One immutable version of a ToolRegistry.
+
+    Attributes:
+        version: Bumped by every change to the registry
+        tools: Read-only mapping of tool name -> tool dictionary
+        approvals: Read-only mapping of tool name -> approval type
+    """
+
+    version: int
+    tools: Mapping[str, Dict[str, Any]]
+    approvals: Mapping[str, str]
+
+
+class ToolRegistry(MutableMapping):
+    """Thread-safe tool registry built from immutable snapshots.
+
+    Readers never lock: every read goes to the current snapshot, and
+    writers copy it, apply their change and swap the new one in under a
+    lock. A reader holding on to ``snapshot()`` keeps seeing that version
+    however the registry changes afterwards, which is how an agent run
+    sees one consistent set of tools. Copying makes writes O(n), fine for
+    registries that are read far more often than they change.
+
+    Example:
+        >>> registry = ToolRegistry()
+        >>> registry.register("echo", {"func": str, "description": "Echo input"})
+        >>> snapshot = registry.snapshot()
+        >>> registry.unregister("echo")
+        >>> "echo" in snapshot.tools
+        True
+    """
+
+    def __init__(self, approvals: Optional[Dict[str, str]] = None):
+        """Initialize an empty registry.
 
-# Tool metadata for approval requirements
-_TOOLS_REQUIRING_APPROVAL: Dict[str, str] = {
-    "run_command": "commands",
-    "write_file": "files",
+        Args:
+            approvals: Approval types for tools registered later, by name
+        """
+        self._lock = threading.Lock()
+        self._snapshot = RegistrySnapshot(
+            0, MappingProxyType({}), MappingProxyType(dict(approvals or {}))
+        )
+
+    def snapshot(self) -> RegistrySnapshot:
+        """Return the current version of the registry."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Number bumped by every change to the registry."""
+        return self._snapshot.version
+
+    def _swap(
+        self, tools: Dict[str, Dict[str, Any]], approvals: Optional[Dict[str, str]] = None
+    ) -> None:
+        # Callers hold self._lock
+        current = self._snapshot
+        self._snapshot = RegistrySnapshot(
+            current.version + 1,
+            MappingProxyType(tools),
+            current.approvals if approvals is None else MappingProxyType(approvals),
+        )
+
+    def register(
+        self, name: str, tool: Dict[str, Any], requires_approval: Optional[str] = None
+    ) -> None:
+        """Add a tool.
+
+        Args:
+            name: Tool name
+            tool: Tool dictionary with "func" and "description"
+            requires_approval: Optional approval type ("commands" or "files")
+
+        Raises:
+            ToolRegistrationError: If tool already exists
+        """
+        with self._lock:
+            current = self._snapshot
+            if name in current.tools:
+                raise ToolRegistrationError(name, "Tool already exists")
+            approvals = None
+            if requires_approval:
+                approvals = {**current.approvals, name: requires_approval}
+            self._swap({**current.tools, name: tool}, approvals)
+
+    def register_many(
+        self, tools: Mapping[str, Dict[str, Any]], approvals: Optional[Mapping[str, str]] = None
+    ) -> None:
+        """Add several tools as a single change.
+
+        Args:
+            tools: Tool dictionaries by name
+            approvals: Approval types ("commands" or "files") by tool name
+
+        Raises:
+            ToolRegistrationError: If a tool already exists; the tools before
+                                   it are still added
+        """
+        approvals = approvals or {}
+        with self._lock:
+            current = self._snapshot
+            added: Dict[str, Dict[str, Any]] = {}
+            error = None
+            for name, tool in tools.items():
+                if name in current.tools or name in added:
+                    error = ToolRegistrationError(name, "Tool already exists")
+                    break
+                added[name] = tool
+            if added:
+                required = {name: approvals[name] for name in added if approvals.get(name)}
+                self._swap(
+                    {**current.tools, **added},
+                    {**current.approvals, **required} if required else None,
+                )
+        if error is not None:
+            raise error
+
+    def unregister(self, name: str) -> None:
+        """Remove a tool and its approval requirement.
+
+        Raises:
+            ToolNotFoundError: If tool doesn't exist
+        """
+        try:
+            del self[name]
+        except KeyError:
+            raise ToolNotFoundError(name) from None
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        """Add or replace several tools as a single change."""
+        with self._lock:
+            self._swap({**self._snapshot.tools, **dict(*args, **kwargs)})
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        return self._snapshot.tools[name]
+
+    def __setitem__(self, name: str, tool: Dict[str, Any]) -> None:
+        with self._lock:
+            self._swap({**self._snapshot.tools, name: tool})
+
+    def __delitem__(self, name: str) -> None:
+        with self._lock:
+            current = self._snapshot
+            tools = dict(current.tools)
+            del tools[name]
+            approvals = None
+            if name in current.approvals:
+                approvals = {k: v for k, v in current.approvals.items() if k != name}
+            self._swap(tools, approvals)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._snapshot.tools
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._snapshot.tools)
+
+    def __len__(self) -> int:
+        return len(self._snapshot.tools)
+
+    def copy(self) -> Dict[str, Dict[str, Any]]:
+        """Return the current tools as a plain dict."""
+        return dict(self._snapshot.tools)
+
+    def __repr__(self) -> str:
+        return f"ToolRegistry(version={self.version}, tools={list(self)})"
+
+
+# Global tool registry, with the built-in tools that need approval
+_TOOLS = ToolRegistry(approvals={"run_command": "commands", "write_file": "files"})
+
+# Result cache TTLs (seconds) for the built-in network tools
+_BUILTIN_CACHE_TTLS: Dict[str, float] = {
+    "web_search": 300,
+    "weather": 300,
+    "wikipedia": 3600,
+    "ip_info": 300,
 }
 
-# Global tool registry
-_TOOLS: Dict[str, Dict[str, Any]] = {}
+
+# Set when a cached tool answers from its cache; read by the agent's metrics
+tool_cache_hit: ContextVar[bool] = ContextVar("ollama_agent_tool_cache_hit", default=False)
+
+
+class _ToolFailure(str):
+    """Error message returned by a built-in tool; never cached."""
+
+
+def _cached(func: Callable, cache: TTLCache) -> Callable:
+    """Memoize a tool function by its arguments.
+
+    Fresh hits are returned directly. Stale hits are returned too, while a
+    single background refresh updates the entry. Exceptions and built-in
+    failure results are never cached. Coroutine functions get a coroutine
+    wrapper that refreshes in an asyncio task.
+
+    Args:
+        func: Tool function or coroutine function
+        cache: Cache holding the results
+
+    Returns:
+        Wrapped function with a ``cache`` attribute
+    """
+    refreshing: set = set()
+    lock = threading.Lock()
+
+    def _store(args: tuple, result: Any) -> None:
+        if not isinstance(result, _ToolFailure):
+            cache.set(args, result)
+
+    def _claim(args: tuple) -> bool:
+        with lock:
+            if args in refreshing:
+                return False
+            refreshing.add(args)
+            return True
+
+    if inspect.iscoroutinefunction(func):
+        tasks: set = set()
+
+        async def _arefresh(args: tuple) -> None:
+            try:
+                _store(args, await func(*args))
+            except Exception:
+                pass
+            finally:
+                refreshing.discard(args)
+
+        @wraps(func)
+        async def async_wrapper(*args):
+            hit = cache.get(args)
+            if hit is not None:
+                tool_cache_hit.set(True)
+                value, stale = hit
+                if stale and _claim(args):
+                    task = asyncio.get_running_loop().create_task(_arefresh(args))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                return value
+            result = await func(*args)
+            _store(args, result)
+            return result
+
+        async_wrapper.cache = cache
+        return async_wrapper
+
+    def _refresh(args: tuple) -> None:
+        try:
+            _store(args, func(*args))
+        except Exception:
+            pass
+        finally:
+            refreshing.discard(args)
+
+    @wraps(func)
+    def wrapper(*args):
+        hit = cache.get(args)
+        if hit is not None:
+            tool_cache_hit.set(True)
+            value, stale = hit
+            if stale and _claim(args):
+                threading.Thread(target=_refresh, args=(args,), daemon=True).start()
+            return value
+        result = func(*args)
+        _store(args, result)
+        return result
+
+    wrapper.cache = cache
+    return wrapper
+
+
+def _make_tool(
+    func: Callable,
+    description: str,
+    afunc: Optional[Callable] = None,
+    cache_ttl: Optional[float] = None,
+    cache_stale_ttl: float = 0,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Build a registry entry, adding a result cache when a TTL is given.
+
+    The sync and async variants of a tool share one cache.
+
+    Returns:
+        Tool dictionary with "func", "description" and optional
+        "afunc"/"cache"/"timeout"
+    """
+    tool: Dict[str, Any] = {"func": func, "description": description}
+    if timeout is not None:
+        tool["timeout"] = timeout
+    if afunc is not None:
+        tool["afunc"] = afunc
+    if cache_ttl:
+        cache = TTLCache(cache_ttl, max_size=config.tool_cache_size, stale_ttl=cache_stale_ttl)
+        tool["cache"] = cache
+        tool["func"] = _cached(func, cache)
+        if afunc is not None:
+            tool["afunc"] = _cached(afunc, cache)
+    return tool
+
+
+def registry_version() -> int:
+    """Return a number that changes whenever a tool is registered or removed."""
+    return _TOOLS.version
 
 
 def get_approval_type(tool_name: str) -> Optional[str]:
@@ -35,7 +339,7 @@ def get_approval_type(tool_name: str) -> Optional[str]:
     Returns:
         Approval type string ("commands" or "files") or None
     """
-    return _TOOLS_REQUIRING_APPROVAL.get(tool_name)
+    return _TOOLS.snapshot().approvals.get(tool_name)
 
 
 def is_command_blocked(command: str) -> bool:
@@ -55,13 +359,24 @@ def register_tool(
     name: str,
     description: str,
     requires_approval: Optional[str] = None,
+    cache_ttl: Optional[float] = None,
+    cache_stale_ttl: float = 0,
+    timeout: Optional[float] = None,
 ) -> Callable:
     """Decorator to register a function as a tool.
 
+    Both regular functions and ``async def`` coroutine functions can be
+    registered. Coroutine tools are awaited directly by ``OllamaAgent.arun``.
+
     Args:
         name: Tool name (used in TOOL: calls)
         description: Description shown to the LLM
         requires_approval: Optional approval type ("commands" or "files")
+        cache_ttl: Optional seconds to cache results per input
+        cache_stale_ttl: Extra seconds an expired result may be served while
+                         it is refreshed in the background
+        timeout: Seconds the agent waits for a call before giving up
+                 (default: the agent's tool_timeout, 0 = no limit)
 
     Returns:
         Decorator function
@@ -73,16 +388,17 @@ def register_tool(
     """
 
     def decorator(func: Callable) -> Callable:
-        if name in _TOOLS:
-            raise ToolRegistrationError(name, "Tool already exists")
-
-        _TOOLS[name] = {
-            "func": func,
-            "description": description,
-        }
-
-        if requires_approval:
-            _TOOLS_REQUIRING_APPROVAL[name] = requires_approval
+        _TOOLS.register(
+            name,
+            _make_tool(
+                func,
+                description,
+                cache_ttl=cache_ttl,
+                cache_stale_ttl=cache_stale_ttl,
+                timeout=timeout,
+            ),
+            requires_approval,
+        )
 
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -98,28 +414,67 @@ def register_tool_func(
     func: Callable,
     description: str,
     requires_approval: Optional[str] = None,
+    cache_ttl: Optional[float] = None,
+    cache_stale_ttl: float = 0,
+    timeout: Optional[float] = None,
 ) -> None:
     """Register a function as a tool (non-decorator version).
 
     Args:
         name: Tool name
-        func: The function to register
+        func: The function or coroutine function to register
         description: Description shown to the LLM
         requires_approval: Optional approval type ("commands" or "files")
+        cache_ttl: Optional seconds to cache results per input
+        cache_stale_ttl: Extra seconds an expired result may be served while
+                         it is refreshed in the background
+        timeout: Seconds the agent waits for a call before giving up
+                 (default: the agent's tool_timeout, 0 = no limit)
 
     Raises:
         ToolRegistrationError: If tool already exists
     """
-    if name in _TOOLS:
-        raise ToolRegistrationError(name, "Tool already exists")
+    _TOOLS.register(
+        name,
+        _make_tool(
+            func,
+            description,
+            cache_ttl=cache_ttl,
+            cache_stale_ttl=cache_stale_ttl,
+            timeout=timeout,
+        ),
+        requires_approval,
+    )
 
-    _TOOLS[name] = {
-        "func": func,
-        "description": description,
-    }
 
-    if requires_approval:
-        _TOOLS_REQUIRING_APPROVAL[name] = requires_approval
+def register_tools(tools: Dict[str, Dict[str, Any]]) -> None:
+    """Register several functions as tools in a single registry change.
+
+    Args:
+        tools: Tools by name, each {"func", "description"} with the optional
+               keyword arguments of register_tool_func ("requires_approval",
+               "cache_ttl", "cache_stale_ttl", "timeout")
+
+    Raises:
+        ToolRegistrationError: If a tool already exists; the tools before it
+                               are still added
+    """
+    entries = {
+        name: _make_tool(
+            info["func"],
+            info["description"],
+            cache_ttl=info.get("cache_ttl"),
+            cache_stale_ttl=info.get("cache_stale_ttl", 0),
+            timeout=info.get("timeout"),
+        )
+        for name, info in tools.items()
+    }
+    approvals = {
+        name: info["requires_approval"]
+        for name, info in tools.items()
+        if info.get("requires_approval")
+    }
+    _TOOLS.register_many(entries, approvals)
 
 
 def unregister_tool(name: str) -> None:
@@ -131,11 +486,7 @@ def unregister_tool(name: str) -> None:
     Raises:
         ToolNotFoundError: If tool doesn't exist
     """
-    if name not in _TOOLS:
-        raise ToolNotFoundError(name)
-
-    del _TOOLS[name]
-    _TOOLS_REQUIRING_APPROVAL.pop(name, None)
+    _TOOLS.unregister(name)
 
 
 def get_tool(name: str) -> Dict[str, Any]:
@@ -150,9 +501,10 @@ def get_tool(name: str) -> Dict[str, Any]:
     Raises:
         ToolNotFoundError: If tool doesn't exist
     """
-    if name not in _TOOLS:
-        raise ToolNotFoundError(name)
-    return _TOOLS[name]
+    try:
+        return _TOOLS[name]
+    except KeyError:
+        raise ToolNotFoundError(name) from None
 
 
 def get_all_tools() -> Dict[str, Dict[str, Any]]:
@@ -176,25 +528,55 @@ def list_tools() -> list[str]:
 # ============ BUILT-IN TOOLS ============
 
 
+def _format_search_results(results: list) -> str:
+    """Format DuckDuckGo results into a numbered list."""
+    if not results:
+        return "No results found."
+
+    formatted = []
+    for i, r in enumerate(results, 1):
+        formatted.append(
+            f"{i}. {r.get('title', 'No title')}\n"
+            f"   URL: {r.get('href', '')}\n"
+            f"   {r.get('body', '')}"
+        )
+    return "\n\n".join(formatted)
+
+
+_ddgs_local = threading.local()
+
+
+def _get_ddgs() -> "DDGS":
+    """Return this thread's DDGS client, reusing its open connections."""
+    ddgs = getattr(_ddgs_local, "ddgs", None)
+    if ddgs is None:
+        # Imported on the first search, it's only needed by web_search
+        from ddgs import DDGS
+
+        ddgs = _ddgs_local.ddgs = DDGS(timeout=int(config.http_timeout))
+    return ddgs
+
+
+def _search(query: str) -> list:
+    """Run a DuckDuckGo text search and return the raw results."""
+    return list(_get_ddgs().text(query, max_results=config.max_search_results))
+
+
 def _web_search(query: str) -> str:
     """Search the web using DuckDuckGo."""
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=config.max_search_results))
-
-        if not results:
-            return "No results found."
-
-        formatted = []
-        for i, r in enumerate(results, 1):
-            formatted.append(
-                f"{i}. {r.get('title', 'No title')}\n"
-                f"   URL: {r.get('href', '')}\n"
-                f"   {r.get('body', '')}"
-            )
-        return "\n\n".join(formatted)
+        return _format_search_results(_search(query))
+    except Exception as e:
+        return _ToolFailure(f"Search failed: {e}")
+
+
+async def _aweb_search(query: str) -> str:
+    """Search the web using DuckDuckGo without blocking the event loop."""
+    try:
+        # DDGS has no async client, keep the blocking search off the loop
+        return _format_search_results(await asyncio.to_thread(_search, query))
     except Exception as e:
-        return f"Search failed: {e}"
+        return _ToolFailure(f"Search failed: {e}")
 
 
 def _get_current_time() -> str:
@@ -280,28 +662,61 @@ def _system_info() -> str:
     return "\n".join(info) if info else "Could not retrieve system info"
 
 
+def _weather_url(location: str, fmt: str) -> str:
+    """Build a wttr.in URL for a location and output format."""
+    loc = location.replace(" ", "+") if location else ""
+    return f"https://wttr.in/{loc}?format={fmt}"
+
+
+def _fetch(url: str, headers: Dict[str, str]) -> "httpx.Response":
+    """Fetch a URL over the shared pool, raising for error status codes."""
+    resp = get_http_client().get(url, headers=headers)
+    resp.raise_for_status()
+    return resp
+
+
+def _fetch_text(url: str, headers: Dict[str, str]) -> str:
+    """Fetch a URL and return its body as stripped text."""
+    return _fetch(url, headers).text.strip()
+
+
+async def _afetch(url: str, headers: Dict[str, str]) -> "httpx.Response":
+    """Fetch a URL asynchronously, raising for error status codes."""
+    resp = await get_http_client().aget(url, headers=headers)
+    resp.raise_for_status()
+    return resp
+
+
+_WEATHER_FORMAT = "3"
+_WEATHER_DETAILED_FORMAT = "%l:+%c+%t+%h+%w"
+_WEATHER_HEADERS = {"User-Agent": "curl/7.0"}
+
+
 def _weather(location: str = "") -> str:
     """Get weather using wttr.in (free, no API key)."""
     try:
-        loc = location.replace(" ", "+") if location else ""
-        url = f"https://wttr.in/{loc}?format=3"
-        req = urllib.request.Request(url, headers={"User-Agent": "curl/7.0"})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            return resp.read().decode().strip()
+        return _fetch_text(_weather_url(location, _WEATHER_FORMAT), _WEATHER_HEADERS)
     except Exception as e:
-        return f"Weather fetch failed: {e}"
+        return _ToolFailure(f"Weather fetch failed: {e}")
+
+
+async def _aweather(location: str = "") -> str:
+    """Get weather using wttr.in asynchronously."""
+    try:
+        resp = await _afetch(_weather_url(location, _WEATHER_FORMAT), _WEATHER_HEADERS)
+        return resp.text.strip()
+    except Exception as e:
+        return _ToolFailure(f"Weather fetch failed: {e}")
 
 
 def _weather_detailed(location: str = "") -> str:
     """Get detailed weather forecast."""
     try:
-        loc = location.replace(" ", "+") if location else ""
-        url = f"https://wttr.in/{loc}?format=%l:+%c+%t+%h+%w"
-        req = urllib.request.Request(url, headers={"User-Agent": "curl/7.0"})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            return resp.read().decode().strip()
+        return _fetch_text(
+            _weather_url(location, _WEATHER_DETAILED_FORMAT), _WEATHER_HEADERS
+        )
     except Exception as e:
-        return f"Weather fetch failed: {e}"
+        return _ToolFailure(f"Weather fetch failed: {e}")
 
 
 def _calculator(expression: str) -> str:
@@ -375,44 +790,78 @@ def _list_directory(path: str = ".") -> str:
         return f"ERROR: {e}"
 
 
+_AGENT_HEADERS = {"User-Agent": "OllamaAgent/1.0"}
+_IP_INFO_URL = "https://ipinfo.io/json"
+
+
+def _wikipedia_url(query: str) -> str:
+    """Build the Wikipedia REST summary URL for a query."""
+    return f"https://en.wikipedia.org/api/rest_v1/page/summary/{query.replace(' ', '_')}"
+
+
+def _format_wikipedia(data: Dict[str, Any], query: str) -> str:
+    """Format a Wikipedia summary response."""
+    title = data.get("title", query)
+    extract = data.get("extract", "No summary available.")
+    url = data.get("content_urls", {}).get("desktop", {}).get("page", "")
+    return f"**{title}**\n\n{extract}\n\nSource: {url}"
+
+
 def _wikipedia(query: str) -> str:
     """Search Wikipedia for a summary."""
+    import httpx
+
     try:
-        search_url = (
-            f"https://en.wikipedia.org/api/rest_v1/page/summary/{query.replace(' ', '_')}"
-        )
-        req = urllib.request.Request(
-            search_url, headers={"User-Agent": "OllamaAgent/1.0"}
-        )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode())
-            title = data.get("title", query)
-            extract = data.get("extract", "No summary available.")
-            url = data.get("content_urls", {}).get("desktop", {}).get("page", "")
-            return f"**{title}**\n\n{extract}\n\nSource: {url}"
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
+        resp = _fetch(_wikipedia_url(query), _AGENT_HEADERS)
+        return _format_wikipedia(resp.json(), query)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
             return f"No Wikipedia article found for '{query}'"
-        return f"Wikipedia error: {e}"
+        return _ToolFailure(f"Wikipedia error: {e}")
     except Exception as e:
-        return f"Wikipedia error: {e}"
+        return _ToolFailure(f"Wikipedia error: {e}")
+
+
+async def _awikipedia(query: str) -> str:
+    """Search Wikipedia for a summary asynchronously."""
+    import httpx
+
+    try:
+        resp = await _afetch(_wikipedia_url(query), _AGENT_HEADERS)
+        return _format_wikipedia(resp.json(), query)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return f"No Wikipedia article found for '{query}'"
+        return _ToolFailure(f"Wikipedia error: {e}")
+    except Exception as e:
+        return _ToolFailure(f"Wikipedia error: {e}")
+
+
+def _format_ip_info(data: Dict[str, Any]) -> str:
+    """Format an ipinfo.io response."""
+    return (
+        f"IP: {data.get('ip', 'N/A')}\n"
+        f"Location: {data.get('city', '')}, {data.get('region', '')}, {data.get('country', '')}\n"
+        f"ISP: {data.get('org', 'N/A')}"
+    )
 
 
 def _ip_info() -> str:
     """Get public IP and basic network info."""
     try:
-        req = urllib.request.Request(
-            "https://ipinfo.io/json", headers={"User-Agent": "OllamaAgent/1.0"}
-        )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode())
-            return (
-                f"IP: {data.get('ip', 'N/A')}\n"
-                f"Location: {data.get('city', '')}, {data.get('region', '')}, {data.get('country', '')}\n"
-                f"ISP: {data.get('org', 'N/A')}"
-            )
+        resp = _fetch(_IP_INFO_URL, _AGENT_HEADERS)
+        return _format_ip_info(resp.json())
     except Exception as e:
-        return f"Could not fetch IP info: {e}"
+        return _ToolFailure(f"Could not fetch IP info: {e}")
+
+
+async def _aip_info() -> str:
+    """Get public IP and basic network info asynchronously."""
+    try:
+        resp = await _afetch(_IP_INFO_URL, _AGENT_HEADERS)
+        return _format_ip_info(resp.json())
+    except Exception as e:
+        return _ToolFailure(f"Could not fetch IP info: {e}")
 
 
 # Register all built-in tools
@@ -451,8 +900,25 @@ def _register_builtin_tools():
         ("ip_info", _ip_info, "Get your public IP and location info. No input needed."),
     ]
 
+    # Native coroutine variants used by OllamaAgent.arun
+    async_variants = {
+        "web_search": _aweb_search,
+        "weather": _aweather,
+        "wikipedia": _awikipedia,
+        "ip_info": _aip_info,
+    }
+
+    tools = {}
     for name, func, description in builtins:
-        _TOOLS[name] = {"func": func, "description": description}
+        cache_ttl = _BUILTIN_CACHE_TTLS.get(name) if config.tool_cache_size else None
+        tools[name] = _make_tool(
+            func,
+            description,
+            afunc=async_variants.get(name),
+            cache_ttl=cache_ttl,
+            cache_stale_ttl=cache_ttl or 0,
+        )
+    _TOOLS.update(tools)
 
 
 # Initialize built-in tools
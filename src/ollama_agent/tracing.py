@@ -0,0 +1,184 @@
+"""Per-run span traces in Chrome trace-event format."""
+
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Union
+
+from .config import config as default_config
+
+
+class Trace:
+    """Spans recorded during one agent run.
+
+    Times are ``time.perf_counter()`` seconds; they are exported relative to
+    the start of the trace. Spans may be added from any thread, and each
+    thread becomes its own track in the viewer.
+
+    Example:
+        >>> agent.run("What's 2+2?", trace=True)
+        >>> agent.last_trace.save("run.json")  # open in https://ui.perfetto.dev
+    """
+
+    def __init__(self, name: str = "run"):
+        self.name = name
+        self.started = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: Optional[float] = None,
+        **args: Any,
+    ) -> None:
+        """Record a finished span on the calling thread.
+
+        Args:
+            name: Span name
+            category: Span category, e.g. "llm" or "tool"
+            start: perf_counter() time the span started
+            end: perf_counter() time it ended (default: now)
+            **args: Attributes shown with the span
+        """
+        end = time.perf_counter() if end is None else end
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self.started) * 1e6, 3),
+            "dur": round((end - start) * 1e6, 3),
+            "tid": thread.ident,
+            "args": {k: v for k, v in args.items() if v is not None},
+        }
+        with self._lock:
+            self.events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        """Record the enclosed block as a span.
+
+        Yields:
+            The span's attributes; entries added inside the block are kept
+        """
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(name, category, start, **args)
+
+    @property
+    def duration(self) -> float:
+        """Seconds from the start of the trace to its last span end."""
+        with self._lock:
+            return max((e["ts"] + e["dur"] for e in self.events), default=0.0) / 1e6
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """Return the trace as a Chrome trace-event JSON object."""
+        pid = os.getpid()
+        with self._lock:
+            metadata = [
+                {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                for tid, name in self._threads.items()
+            ]
+            events = [{**event, "pid": pid} for event in self.events]
+        events.sort(key=lambda e: (e["ts"], -e["dur"]))
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Write the trace as JSON that Perfetto and chrome://tracing can open.
+
+        Args:
+            path: File to write
+
+        Returns:
+            The path written
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome()), encoding="utf-8")
+        return path
+
+
+class Tracer:
+    """Sample agent runs and keep or write their traces.
+
+    Only a ``sample_rate`` fraction of runs is traced; the rest cost a single
+    random draw, so a low rate can stay on in production.
+
+    Example:
+        >>> tracer = Tracer("traces", sample_rate=0.01)
+        >>> agent = OllamaAgent(tracer=tracer)
+        >>> tracer.traces[-1].to_chrome()
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        sample_rate: float = 1.0,
+        keep: int = 100,
+        rng: Callable[[], float] = random.random,
+    ):
+        """Initialize the tracer.
+
+        Args:
+            directory: Where to write one JSON file per traced run
+                      (default: keep traces in memory only)
+            sample_rate: Fraction of runs to trace, 0 to 1
+            keep: Number of recent traces kept in ``traces``
+            rng: Random source in [0, 1), injectable for testing
+        """
+        self.directory = Path(directory).expanduser() if directory else None
+        self.sample_rate = sample_rate
+        self.traces: Deque[Trace] = deque(maxlen=keep)
+        self._rng = rng
+        self._seq = itertools.count()
+
+    def sample(self) -> Optional[Trace]:
+        """Start a trace for a run if it is sampled."""
+        if self.sample_rate <= 0 or self._rng() >= self.sample_rate:
+            return None
+        return Trace()
+
+    def record(self, trace: Trace) -> Optional[Path]:
+        """Keep a finished trace, writing it to the directory if there is one.
+
+        Returns:
+            The file written, or None
+        """
+        self.traces.append(trace)
+        if self.directory is None:
+            return None
+        name = f"{trace.name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self._seq)}.json"
+        return trace.save(self.directory / name)
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Return the process-wide tracer for TRACE_DIR, or None if unset.
+
+    Returns:
+        Shared Tracer instance, or None
+    """
+    global _tracer
+    if _tracer is None and default_config.trace_dir:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(
+                    default_config.trace_dir, sample_rate=default_config.trace_sample_rate
+                )
+    return _tracer
@@ -1,10 +1,30 @@
 """Tests for the agent module."""
 
+import asyncio
+import threading
+import time
+
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
 
-from ollama_agent.agent import OllamaAgent, _build_system_prompt, DEFAULT_SYSTEM_PROMPT
+from ollama_agent.agent import (
+    OllamaAgent,
+    _PROMPT_CACHE_SIZE,
+    _prompt_cache,
+    _build_system_prompt,
+    _tool_schema,
+    _ToolCallScanner,
+    DEFAULT_SYSTEM_PROMPT,
+    NATIVE_SYSTEM_PROMPT,
+)
 from ollama_agent.exceptions import ToolNotFoundError
+from ollama_agent.executor import ToolExecutor, get_tool_executor
+from ollama_agent.history import is_tool_update
+from ollama_agent.metrics import Metrics
+from ollama_agent.store import ConversationStore
+from ollama_agent.tools import TOOLS, register_tool_func, unregister_tool
 
 
 class TestBuildSystemPrompt:
@@ -56,6 +76,29 @@ class TestBuildSystemPrompt:
     def test_default_system_prompt_has_placeholder(self):
         assert "{tools}" in DEFAULT_SYSTEM_PROMPT
 
+    def test_native_prompt_omits_protocol_and_tool_list(self):
+        tools = {"my_tool": {"func": lambda: None, "description": "Test tool"}}
+        prompt = _build_system_prompt(tools, native_tools=True)
+        assert prompt == NATIVE_SYSTEM_PROMPT
+        assert "TOOL:" not in prompt
+        assert "my_tool" not in prompt
+
+    def test_native_custom_prompt_placeholder_still_filled(self):
+        tools = {"my_tool": {"func": lambda: None, "description": "Test tool"}}
+        prompt = _build_system_prompt(tools, "Bot.\n{tools}", native_tools=True)
+        assert "my_tool" in prompt
+
+
+class TestToolSchema:
+    """Tests for _tool_schema function."""
+
+    def test_schema_shape(self):
+        schema = _tool_schema("weather", {"description": "Get weather"})
+        assert schema["type"] == "function"
+        assert schema["function"]["name"] == "weather"
+        assert schema["function"]["description"] == "Get weather"
+        assert "input" in schema["function"]["parameters"]["properties"]
+
 
 class TestOllamaAgentInit:
     """Tests for OllamaAgent initialization."""
@@ -65,6 +108,9 @@ class TestOllamaAgentInit:
         agent = OllamaAgent()
         assert agent._model == "llama3.2" or agent._model is not None
         assert agent.approval_callback is None
+        # The model is created on first use
+        mock_chat.assert_not_called()
+        assert agent.llm is agent.llm
         mock_chat.assert_called_once()
 
     @patch("ollama_agent.agent.ChatOllama")
@@ -103,6 +149,41 @@ class TestOllamaAgentInit:
         assert agent._system_prompt is None
 
 
+class TestOllamaAgentWarm:
+    """Tests for model warm-up."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_keep_alive_passed_to_client(self, mock_chat):
+        OllamaAgent(keep_alive="30m").llm
+        assert mock_chat.call_args.kwargs["keep_alive"] == "30m"
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_warm_prefills_system_prompt(self, mock_chat):
+        agent = OllamaAgent()
+        assert agent.is_warm is False
+
+        assert agent.warm() is True
+        assert agent.is_warm is True
+        agent.llm.model_copy.assert_called_once_with(update={"num_predict": 1})
+        warm_llm = agent.llm.model_copy.return_value
+        sent = warm_llm.invoke.call_args[0][0]
+        assert sent == [agent._messages[0]]
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_warm_failure_is_reported(self, mock_chat):
+        agent = OllamaAgent()
+        agent.llm.model_copy.return_value.invoke.side_effect = ConnectionError("down")
+
+        assert agent.warm() is False
+        assert agent.is_warm is False
+        assert isinstance(agent.warm_error, ConnectionError)
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_warm_up_in_background_on_init(self, mock_chat):
+        agent = OllamaAgent(warm_up=True)
+        assert agent.wait_until_warm(timeout=2) is True
+
+
 class TestOllamaAgentParseToolCall:
     """Tests for _parse_tool_call method."""
 
@@ -134,6 +215,26 @@ class TestOllamaAgentParseToolCall:
         result = agent._parse_tool_call(response)
         assert result is None
 
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_parse_multiple_tool_calls(self, mock_chat):
+        agent = OllamaAgent()
+        response = (
+            "TOOL: weather\nINPUT: Paris\n"
+            "TOOL: get_current_time\nINPUT:\n"
+            "TOOL: weather\nINPUT: Rome"
+        )
+        assert agent._parse_tool_calls(response) == [
+            ("weather", "Paris"),
+            ("get_current_time", ""),
+            ("weather", "Rome"),
+        ]
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_parse_multiple_skips_unknown_tools(self, mock_chat):
+        agent = OllamaAgent()
+        response = "TOOL: nope\nINPUT: x\nTOOL: calculator\nINPUT: 1+1"
+        assert agent._parse_tool_calls(response) == [("calculator", "1+1")]
+
 
 class TestOllamaAgentExecuteTool:
     """Tests for _execute_tool method."""
@@ -176,6 +277,205 @@ class TestOllamaAgentExecuteTool:
         assert executed is True
 
 
+class TestOllamaAgentExecuteTools:
+    """Tests for concurrent execution of several tool calls."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_runs_calls_concurrently(self, mock_chat):
+        barrier = threading.Barrier(3, timeout=2)
+
+        def wait_for_others(city: str) -> str:
+            barrier.wait()
+            return f"sunny in {city}"
+
+        agent = OllamaAgent(
+            tools={"weather": {"func": wait_for_others, "description": "Weather"}}
+        )
+        calls = [("weather", "Paris"), ("weather", "Rome"), ("weather", "Oslo")]
+        outcomes = agent._execute_tools(calls)
+        assert outcomes == [
+            ("sunny in Paris", True),
+            ("sunny in Rome", True),
+            ("sunny in Oslo", True),
+        ]
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_denied_calls_are_skipped(self, mock_chat):
+        agent = OllamaAgent(approval_callback=lambda tool, tool_input: False)
+        outcomes = agent._execute_tools([("run_command", "ls"), ("calculator", "2*3")])
+        assert outcomes[0][1] is False
+        assert outcomes[1] == ("6", True)
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_results_sent_back_in_one_message(self, mock_chat):
+        mock_llm = MagicMock()
+        mock_llm.invoke.side_effect = [
+            MagicMock(content="TOOL: calculator\nINPUT: 1+1\nTOOL: calculator\nINPUT: 2*5"),
+            MagicMock(content="2 and 10."),
+        ]
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent()
+        assert agent.run("Compute both") == "2 and 10."
+        assert mock_llm.invoke.call_count == 2
+        result_message = agent._messages[-2].content
+        assert result_message.startswith("TOOL RESULT:\n")
+        assert "[1] calculator (1+1):\n2" in result_message
+        assert "[2] calculator (2*5):\n10" in result_message
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_arun_gathers_calls(self, mock_chat):
+        running = []
+
+        async def slow(text: str) -> str:
+            running.append(text)
+            await asyncio.sleep(0.01)
+            return str(len(running))
+
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = AsyncMock(
+            side_effect=[
+                MagicMock(content="TOOL: slow\nINPUT: a\nTOOL: slow\nINPUT: b"),
+                MagicMock(content="done"),
+            ]
+        )
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent(tools={"slow": {"func": slow, "description": "Slow"}})
+        assert asyncio.run(agent.arun("go")) == "done"
+        # Both calls started before either finished
+        assert "[1] slow (a):\n2" in agent._messages[-2].content
+
+
+class TestOllamaAgentToolTimeouts:
+    """Tests for tool calls that take too long."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_hung_tool_times_out(self, mock_chat):
+        release = threading.Event()
+        metrics = Metrics()
+        agent = OllamaAgent(
+            tools={
+                "hang": {"func": lambda x: release.wait(), "description": "Hang", "timeout": 0.05},
+                "echo": {"func": lambda x: x, "description": "Echo"},
+            },
+            metrics=metrics,
+            tool_executor=ToolExecutor(metrics=metrics),
+        )
+        try:
+            outcomes = agent._execute_tools([("hang", "a"), ("echo", "b")])
+            assert outcomes[0] == (
+                "Tool timed out: hang did not finish within 0.05 seconds and was cancelled.",
+                False,
+            )
+            assert outcomes[1] == ("b", True)
+            result, executed = agent._execute_tool("hang", "c")
+            assert result.startswith("Tool timed out") and not executed
+        finally:
+            release.set()
+        tools = metrics.stats()["tools"]
+        assert tools["hang"]["timeout"] == 2
+        assert tools["echo"]["ok"] == 1
+        # The abandoned calls finish later without being recorded again
+        deadline = time.monotonic() + 2
+        while agent.tool_executor.stats()["busy"] and time.monotonic() < deadline:
+            time.sleep(0.001)
+        assert agent.tool_executor.stats()["busy"] == 0
+        assert metrics.stats()["tools"]["hang"]["calls"] == 2
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_timeout_starts_when_call_runs(self, mock_chat):
+        def slow(text):
+            time.sleep(0.08)
+            return text
+
+        agent = OllamaAgent(
+            tools={"slow": {"func": slow, "description": "Slow", "timeout": 0.15}},
+            tool_executor=ToolExecutor(max_workers=1),
+        )
+        calls = [("slow", "a"), ("slow", "b")]
+        # The second call finishes 0.16s after it was submitted, but ran for 0.08s
+        assert agent._execute_tools(calls) == [("a", True), ("b", True)]
+        assert asyncio.run(agent._aexecute_tools(calls)) == [("a", True), ("b", True)]
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_queued_call_not_started(self, mock_chat):
+        release = threading.Event()
+        metrics = Metrics()
+        agent = OllamaAgent(
+            tools={
+                "hang": {"func": lambda x: release.wait(), "description": "Hang", "timeout": 5},
+                "echo": {"func": lambda x: x, "description": "Echo", "timeout": 0.05},
+            },
+            metrics=metrics,
+            tool_executor=ToolExecutor(max_workers=1, max_stuck=0),
+        )
+        hung = agent._submit_tool("hang", "x")
+        try:
+            result, executed = agent._execute_tool("echo", "a")
+            assert result.startswith("Tool not run: echo waited 0.05 seconds") and not executed
+            result, executed = asyncio.run(agent._aexecute_tool("echo", "b"))
+            assert result.startswith("Tool not run: echo") and not executed
+        finally:
+            release.set()
+        assert hung.future.result(timeout=2) == (True, True)
+        assert metrics.stats()["tools"]["echo"]["timeout"] == 2
+        assert agent.tool_executor.stats()["timeouts"] == 2
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_agents_share_default_pool(self, mock_chat):
+        first, second = OllamaAgent(), OllamaAgent()
+        assert first.tool_executor is second.tool_executor is get_tool_executor()
+        assert first._fork().tool_executor is first.tool_executor
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_timeout_settings(self, mock_chat):
+        tools = {
+            "default": {"func": str, "description": "Default timeout"},
+            "unlimited": {"func": str, "description": "No timeout", "timeout": 0},
+        }
+        agent = OllamaAgent(tools=tools, tool_timeout=7)
+        assert agent._timeout_for("default") == 7
+        assert agent._timeout_for("unlimited") is None
+        agent.add_tool("quick", str, "Quick", timeout=0.5)
+        assert agent._timeout_for("quick") == 0.5
+        assert OllamaAgent(tools=dict(tools), tool_timeout=0)._timeout_for("default") is None
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_arun_cancels_coroutine_tool(self, mock_chat):
+        cancelled = []
+
+        async def hang(text: str) -> str:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(text)
+                raise
+            return "never"
+
+        agent = OllamaAgent(
+            tools={"hang": {"func": hang, "description": "Hang", "timeout": 0.05}}
+        )
+        result, executed = asyncio.run(agent._aexecute_tool("hang", "x"))
+        assert result.startswith("Tool timed out: hang") and not executed
+        assert cancelled == ["x"]
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_arun_abandons_sync_tool(self, mock_chat):
+        release = threading.Event()
+        agent = OllamaAgent(
+            tools={"hang": {"func": lambda x: release.wait(), "description": "Hang"}},
+            tool_timeout=0.05,
+            tool_executor=ToolExecutor(),
+        )
+        try:
+            result, executed = asyncio.run(agent._aexecute_tool("hang", "x"))
+            assert result.startswith("Tool timed out: hang") and not executed
+            assert agent.tool_executor.stats()["stuck"] == 1
+        finally:
+            release.set()
+
+
 class TestOllamaAgentRun:
     """Tests for run method."""
 
@@ -219,6 +519,270 @@ class TestOllamaAgentRun:
         assert result == "Max iterations reached."
 
 
+class TestOllamaAgentArun:
+    """Tests for arun method."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_arun_simple_response(self, mock_chat):
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = AsyncMock(return_value=MagicMock(content="Hi there!"))
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent()
+        assert asyncio.run(agent.arun("Hello")) == "Hi there!"
+        mock_llm.invoke.assert_not_called()
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_arun_awaits_async_tool(self, mock_chat):
+        async def shout(text: str) -> str:
+            await asyncio.sleep(0)
+            return text.upper()
+
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = AsyncMock(
+            side_effect=[
+                MagicMock(content="TOOL: shout\nINPUT: hello"),
+                MagicMock(content="It says HELLO."),
+            ]
+        )
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent(tools={"shout": {"func": shout, "description": "Shout"}})
+        assert asyncio.run(agent.arun("Shout hello")) == "It says HELLO."
+        assert "TOOL RESULT:\nHELLO" in agent._messages[-2].content
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_aexecute_prefers_async_variant(self, mock_chat):
+        async def afunc(text: str) -> str:
+            return "async"
+
+        tools = {"dual": {"func": lambda text: "sync", "afunc": afunc, "description": "Dual"}}
+        agent = OllamaAgent(tools=tools)
+        assert asyncio.run(agent._aexecute_tool("dual", "x")) == ("async", True)
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_aexecute_runs_sync_tool_in_thread(self, mock_chat):
+        agent = OllamaAgent()
+        assert asyncio.run(agent._aexecute_tool("calculator", "3 * 3")) == ("9", True)
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_aexecute_with_async_approval_denied(self, mock_chat):
+        async def deny(tool, tool_input):
+            return False
+
+        agent = OllamaAgent(approval_callback=deny)
+        result, executed = asyncio.run(agent._aexecute_tool("run_command", "ls"))
+        assert executed is False
+        assert "denied" in result.lower()
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_sync_execute_runs_async_tool(self, mock_chat):
+        async def afunc(text: str) -> str:
+            return f"got {text}"
+
+        agent = OllamaAgent(tools={"a": {"func": afunc, "description": "Async"}})
+        assert agent._execute_tool("a", "x") == ("got x", True)
+
+
+def _stream_chunks(*chunks, consumed=None):
+    """Yield mock message chunks, recording how many were consumed."""
+    for chunk in chunks:
+        if consumed is not None:
+            consumed.append(chunk)
+        yield MagicMock(content=chunk)
+
+
+class TestToolCallScanner:
+    """Tests for incremental tool call scanning."""
+
+    def test_plain_text_released_immediately(self):
+        scanner = _ToolCallScanner()
+        assert scanner.feed("Hello") == "Hello"
+        assert scanner.feed(" world") == " world"
+        assert scanner.complete is False
+
+    def test_protocol_lines_held_back(self):
+        scanner = _ToolCallScanner()
+        visible = scanner.feed("TO") + scanner.feed("OL: weather\nINP")
+        assert visible == ""
+        assert scanner.calls_end == 0
+        scanner.feed("UT: Paris\n")
+        assert scanner.calls_end == len("TOOL: weather\nINPUT: Paris\n")
+        assert scanner.complete is False
+
+    def test_complete_once_model_moves_on(self):
+        scanner = _ToolCallScanner()
+        scanner.feed("TOOL: weather\nINPUT: Paris\n\n")
+        assert scanner.complete is False
+        assert scanner.feed("I will") == ""
+        assert scanner.complete is True
+
+    def test_accepts_several_calls(self):
+        scanner = _ToolCallScanner()
+        scanner.feed("TOOL: weather\nINPUT: Paris\nTOOL: weather\nINPUT: Rome\n")
+        assert scanner.complete is False
+        assert scanner.calls_end == len(scanner.text)
+
+    def test_prose_before_tool_call_is_released(self):
+        scanner = _ToolCallScanner()
+        visible = scanner.feed("Let me check.\nTOOL: weather\n")
+        assert visible == "Let me check.\n"
+
+    def test_flush_returns_pending_text(self):
+        scanner = _ToolCallScanner()
+        assert scanner.feed("T") == ""
+        assert scanner.flush() == "T"
+
+
+class TestOllamaAgentRunStream:
+    """Tests for run_stream method."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_streams_final_answer(self, mock_chat):
+        mock_llm = MagicMock()
+        mock_llm.stream.return_value = _stream_chunks("Hello", "! How ", "can I help?")
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent()
+        chunks = list(agent.run_stream("Hello"))
+        assert chunks == ["Hello", "! How ", "can I help?"]
+        assert agent._messages[-1].content == "Hello! How can I help?"
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_stops_generation_after_complete_tool_call(self, mock_chat):
+        consumed = []
+        mock_llm = MagicMock()
+        mock_llm.stream.side_effect = [
+            _stream_chunks(
+                "TOOL: calculator\n",
+                "INPUT: 2 + 2\n",
+                "I will now explain",
+                " at great length.",
+                consumed=consumed,
+            ),
+            _stream_chunks("The answer is 4."),
+        ]
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent()
+        chunks = list(agent.run_stream("What is 2 + 2?"))
+
+        assert "".join(chunks) == "The answer is 4."
+        assert len(consumed) == 3
+        assert agent._messages[-2].content.startswith("TOOL RESULT:\n4")
+        assert agent._messages[-3].content == "TOOL: calculator\nINPUT: 2 + 2\n"
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_tool_call_at_end_of_stream(self, mock_chat):
+        mock_llm = MagicMock()
+        mock_llm.stream.side_effect = [
+            _stream_chunks("TOOL: get_current_time\n", "INPUT:"),
+            _stream_chunks("Done."),
+        ]
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent()
+        assert list(agent.run_stream("Time?")) == ["Done."]
+        assert mock_llm.stream.call_count == 2
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_max_iterations(self, mock_chat):
+        mock_llm = MagicMock()
+        mock_llm.stream.side_effect = lambda messages: _stream_chunks(
+            "TOOL: get_current_time\n", "INPUT:\n"
+        )
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent(max_iterations=2)
+        assert list(agent.run_stream("Loop")) == ["Max iterations reached."]
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_error_is_yielded(self, mock_chat):
+        mock_llm = MagicMock()
+        mock_llm.stream.side_effect = RuntimeError("connection refused")
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent()
+        assert list(agent.run_stream("Hi")) == ["Error: connection refused"]
+
+
+class TestOllamaAgentNativeTools:
+    """Tests for native tool-calling mode."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_binds_tool_schemas(self, mock_chat):
+        mock_llm = MagicMock()
+        mock_chat.return_value = mock_llm
+        tools = {"echo": {"func": lambda x: x, "description": "Echo"}}
+
+        agent = OllamaAgent(tools=tools, native_tools=True)
+        assert agent._chat_llm is mock_llm.bind_tools.return_value
+        schemas = mock_llm.bind_tools.call_args[0][0]
+        assert [s["function"]["name"] for s in schemas] == ["echo"]
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_run_executes_structured_tool_calls(self, mock_chat):
+        mock_llm = MagicMock()
+        bound = mock_llm.bind_tools.return_value
+        bound.invoke.side_effect = [
+            AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "calculator", "args": {"input": "6*7"}, "id": "call_1"},
+                    {"name": "calculator", "args": {"expression": "1+1"}, "id": "call_2"},
+                ],
+            ),
+            AIMessage(content="42 and 2"),
+        ]
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent(native_tools=True)
+        assert agent.run("Compute") == "42 and 2"
+
+        tool_messages = [m for m in agent._messages if isinstance(m, ToolMessage)]
+        assert [(m.tool_call_id, m.content) for m in tool_messages] == [
+            ("call_1", "42"),
+            ("call_2", "2"),
+        ]
+        assert agent.get_history()[3]["role"] == "tool"
+        mock_llm.invoke.assert_not_called()
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_text_protocol_ignored_in_native_mode(self, mock_chat):
+        mock_llm = MagicMock()
+        mock_llm.bind_tools.return_value.invoke.return_value = AIMessage(
+            content="TOOL: calculator\nINPUT: 1+1"
+        )
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent(native_tools=True)
+        assert agent.run("Hi") == "TOOL: calculator\nINPUT: 1+1"
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_run_stream_native(self, mock_chat):
+        mock_llm = MagicMock()
+        bound = mock_llm.bind_tools.return_value
+        bound.stream.side_effect = [
+            iter(
+                [
+                    AIMessageChunk(content=""),
+                    AIMessageChunk(
+                        content="",
+                        tool_calls=[
+                            {"name": "calculator", "args": {"input": "2+3"}, "id": "c1"}
+                        ],
+                    ),
+                ]
+            ),
+            iter([AIMessageChunk(content="It is "), AIMessageChunk(content="5.")]),
+        ]
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent(native_tools=True)
+        assert list(agent.run_stream("2+3?")) == ["It is ", "5."]
+        assert agent._messages[-2].content == "5"
+
+
 class TestOllamaAgentReset:
     """Tests for reset method."""
 
@@ -259,6 +823,209 @@ class TestOllamaAgentToolManagement:
         with pytest.raises(ToolNotFoundError):
             agent.remove_tool("nonexistent")
 
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_add_tools_updates_once(self, mock_chat):
+        agent = OllamaAgent(tools={})
+        tools = {f"tool_{i}": {"func": lambda x: x, "description": f"Tool {i}"} for i in range(50)}
+        with patch.object(agent, "_update_tools", wraps=agent._update_tools) as update:
+            agent.add_tools(tools)
+        update.assert_called_once()
+        assert "tool_49" in agent._messages[0].content
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_add_tools_global_is_one_registry_change(self, mock_chat):
+        agent = OllamaAgent()
+        tools = {
+            f"bulk_{i}": {"func": lambda x: x, "description": f"Bulk {i}", "timeout": 5}
+            for i in range(50)
+        }
+        tools["bulk_1"]["requires_approval"] = "files"
+        version = TOOLS.version
+        try:
+            agent.add_tools(tools)
+            assert TOOLS.version == version + 1
+            assert TOOLS["bulk_49"]["timeout"] == 5
+            assert TOOLS.snapshot().approvals["bulk_1"] == "files"
+            assert "bulk_49" in agent._messages[0].content
+        finally:
+            for name in tools:
+                unregister_tool(name)
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_updating_tools_defers_until_outermost_block(self, mock_chat):
+        agent = OllamaAgent(tools={"old": {"func": lambda: None, "description": "Old"}})
+        with agent.updating_tools():
+            with agent.updating_tools():
+                agent.add_tool("new", lambda x: x, "New")
+            agent.remove_tool("old")
+            assert "- old:" in agent._messages[0].content
+        prompt = agent._messages[0].content
+        assert "- new:" in prompt
+        assert "- old:" not in prompt
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_global_prompt_rendered_once(self, mock_chat):
+        first = OllamaAgent()
+        second = OllamaAgent()
+        first.reset()
+        assert first._messages[0].content is second._messages[0].content
+
+        first.add_tool("test_prompt_cache_tool", lambda x: x, "Cache test")
+        try:
+            assert "test_prompt_cache_tool" in first._messages[0].content
+            second.reset()
+            assert second._messages[0].content is first._messages[0].content
+        finally:
+            first.remove_tool("test_prompt_cache_tool")
+        assert "test_prompt_cache_tool" not in first._messages[0].content
+
+
+class TestHotToolUpdates:
+    """Tests for tool changes in the middle of a conversation."""
+
+    @staticmethod
+    def _agent(mock_chat, **kwargs):
+        mock_chat.return_value.invoke.return_value = AIMessage(content="Hi.")
+        agent = OllamaAgent(
+            tools={"echo": {"func": lambda x: x, "description": "Echo"}}, **kwargs
+        )
+        agent.run("hello")
+        return agent
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_add_tool_keeps_history_and_prompt(self, mock_chat):
+        agent = self._agent(mock_chat)
+        system = agent._messages[0]
+        history = list(agent._messages)
+
+        agent.add_tool("shout", str.upper, "Uppercase text")
+        assert agent._messages[0] is system
+        assert agent._messages[:-1] == history
+        update = agent._messages[-1]
+        assert is_tool_update(update)
+        assert update.content == "TOOLS UPDATED:\nNow available:\n- shout: Uppercase text"
+
+        # The next model call sees the whole conversation plus the update
+        agent.run("shout hi")
+        sent = mock_chat.return_value.invoke.call_args[0][0]
+        assert sent[0] is system
+        assert update in sent
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_remove_and_batch(self, mock_chat):
+        agent = self._agent(mock_chat)
+        with agent.updating_tools():
+            agent.remove_tool("echo")
+            agent.add_tool("shout", str.upper, "Uppercase text")
+            agent.add_tool("whisper", str.lower, "Lowercase text")
+            agent.remove_tool("whisper")
+        updates = [m for m in agent._messages if is_tool_update(m)]
+        assert len(updates) == 1
+        assert updates[0].content.endswith("- shout: Uppercase text\nNo longer available: echo")
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_no_update_without_change(self, mock_chat):
+        agent = self._agent(mock_chat)
+        with agent.updating_tools():
+            agent.add_tool("shout", str.upper, "Uppercase text")
+            agent.remove_tool("shout")
+        assert not any(is_tool_update(m) for m in agent._messages)
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_reset_lists_current_tools(self, mock_chat):
+        agent = self._agent(mock_chat)
+        agent.add_tool("shout", str.upper, "Uppercase text")
+        agent.reset()
+        assert len(agent._messages) == 1
+        assert "- shout: Uppercase text" in agent._messages[0].content
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_native_rebinds_tools(self, mock_chat):
+        agent = self._agent(mock_chat, native_tools=True)
+        mock_chat.return_value.bind_tools.reset_mock()
+        agent.add_tool("shout", str.upper, "Uppercase text")
+        assert agent._chat_llm is mock_chat.return_value.bind_tools.return_value
+        schemas = mock_chat.return_value.bind_tools.call_args[0][0]
+        assert [s["function"]["name"] for s in schemas] == ["echo", "shout"]
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_updates_not_stored(self, mock_chat, tmp_path):
+        store = ConversationStore(tmp_path)
+        agent = self._agent(mock_chat, store=store, session_id="s1")
+        agent.add_tool("shout", str.upper, "Uppercase text")
+        agent.run("again")
+        assert [m.content for m in store.load("s1")] == ["hello", "Hi.", "again", "Hi."]
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_run_pins_global_tools(self, mock_chat):
+        late_calls = []
+
+        def register_late(_):
+            # Another thread changing the global registry mid-run
+            thread = threading.Thread(
+                target=register_tool_func,
+                args=("test_pin_late", late_calls.append, "Registered mid-run"),
+            )
+            thread.start()
+            thread.join()
+            return "registered"
+
+        register_tool_func("test_pin_register", register_late, "Register another tool")
+        try:
+            mock_chat.return_value.invoke.side_effect = [
+                AIMessage(content="TOOL: test_pin_register\nINPUT: go"),
+                AIMessage(content="TOOL: test_pin_late\nINPUT: x"),
+                AIMessage(content="TOOL: test_pin_late\nINPUT: y"),
+                AIMessage(content="Done."),
+            ]
+            agent = OllamaAgent()
+            # The run started before test_pin_late existed and never sees it
+            assert agent.run("register").startswith("TOOL: test_pin_late")
+            assert late_calls == []
+            assert agent._pinned is None
+
+            # The next turn announces it and can call it
+            assert agent.run("use it") == "Done."
+            assert late_calls == ["y"]
+            (update,) = [m for m in agent._messages if is_tool_update(m)]
+            assert "- test_pin_late: Registered mid-run" in update.content
+        finally:
+            for name in ("test_pin_register", "test_pin_late"):
+                if name in TOOLS:
+                    unregister_tool(name)
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_prompt_cache_follows_registry_version(self, mock_chat):
+        first = OllamaAgent()._messages[0].content
+        assert OllamaAgent()._messages[0].content is first
+        register_tool_func("test_cache_version", str.upper, "Cache version test")
+        try:
+            prompt = OllamaAgent()._messages[0].content
+            assert "test_cache_version" in prompt
+            assert prompt is not first
+        finally:
+            unregister_tool("test_cache_version")
+        assert OllamaAgent()._messages[0].content == first
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_prompt_cache_concurrent_agents(self, mock_chat):
+        errors = []
+
+        def create(worker):
+            try:
+                for i in range(50):
+                    OllamaAgent(system_prompt=f"Prompt {worker}-{i}\n{{tools}}")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=create, args=(w,)) for w in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert len(_prompt_cache) <= _PROMPT_CACHE_SIZE
+
 
 class TestOllamaAgentProperties:
     """Tests for agent properties."""
@@ -0,0 +1,101 @@
+"""Tests for the batch module."""
+
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.batch import BatchResult
+
+
+def _echo_llm(delay=0.0, tracker=None):
+    """Mock LLM that echoes the last user message after an optional delay."""
+    mock_llm = MagicMock()
+
+    def invoke(messages):
+        if tracker is not None:
+            tracker.enter()
+        time.sleep(delay)
+        if tracker is not None:
+            tracker.leave()
+        return MagicMock(content=f"echo: {messages[-1].content}")
+
+    mock_llm.invoke.side_effect = invoke
+    return mock_llm
+
+
+class _ConcurrencyTracker:
+    """Record the maximum number of concurrent LLM calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def enter(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def leave(self):
+        with self._lock:
+            self.current -= 1
+
+
+class TestRunMany:
+    """Tests for OllamaAgent.run_many."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_returns_all_results(self, mock_chat):
+        mock_chat.return_value = _echo_llm()
+        agent = OllamaAgent()
+
+        results = list(agent.run_many(["a", "b", "c"], concurrency=2))
+        assert sorted(r.index for r in results) == [0, 1, 2]
+        for result in results:
+            assert isinstance(result, BatchResult)
+            assert result.response == f"echo: {result.query}"
+            assert result.latency >= 0
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_bounded_concurrency(self, mock_chat):
+        tracker = _ConcurrencyTracker()
+        mock_chat.return_value = _echo_llm(delay=0.02, tracker=tracker)
+        agent = OllamaAgent()
+
+        results = list(agent.run_many((str(i) for i in range(12)), concurrency=3))
+        assert len(results) == 12
+        assert tracker.peak <= 3
+        assert tracker.peak > 1
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_consumes_input_lazily(self, mock_chat):
+        mock_chat.return_value = _echo_llm()
+        agent = OllamaAgent()
+        pulled = []
+
+        def queries():
+            for i in range(1000):
+                pulled.append(i)
+                yield str(i)
+
+        results = agent.run_many(queries(), concurrency=2)
+        next(results)
+        results.close()
+        assert len(pulled) <= 4
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_does_not_touch_agent_history(self, mock_chat):
+        mock_chat.return_value = _echo_llm()
+        agent = OllamaAgent()
+
+        list(agent.run_many(["a", "b"], concurrency=2))
+        assert len(agent._messages) == 1
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_invalid_concurrency(self, mock_chat):
+        agent = OllamaAgent()
+        with pytest.raises(ValueError):
+            list(agent.run_many(["a"], concurrency=0))
@@ -0,0 +1,88 @@
+"""Tests for the overhead benchmarks in benchmarks/overhead.py."""
+
+import json
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from overhead import (
+    _ScriptedModel,
+    bench_import,
+    bench_loop_overhead,
+    bench_parse_tool_call,
+    bench_system_prompt,
+    bench_throughput,
+    compare,
+    main,
+    run_benchmarks,
+)
+
+FAST = {"min_time": 0.001, "repeat": 1}
+
+
+class TestBenchmarks:
+    """Tests for the individual benchmarks."""
+
+    def test_scripted_model(self):
+        model = _ScriptedModel(1)
+        assert model.invoke([HumanMessage(content="hi")]).content.startswith("TOOL:")
+        done = [HumanMessage(content="hi"), HumanMessage(content="TOOL RESULT:\nping")]
+        assert not model.invoke(done).content.startswith("TOOL:")
+
+    def test_loop_overhead(self):
+        result = bench_loop_overhead(tool_iterations=2, **FAST)
+        assert result["iterations_per_run"] == 3
+        assert 0 < result["best_seconds_per_iteration"] <= result["seconds_per_iteration"]
+
+    def test_parse_tool_call(self):
+        result = bench_parse_tool_call((1, 4), **FAST)
+        assert set(result) == {"1KB", "4KB"}
+        assert result["4KB"]["mb_per_sec"] > 0
+
+    def test_system_prompt(self):
+        result = bench_system_prompt((5, 50), **FAST)
+        assert set(result) == {"5", "50"}
+
+    def test_throughput(self):
+        result = bench_throughput((1, 2), latency=0.0, runs_per_worker=1)
+        assert set(result) == {"1", "2"}
+        assert result["2"]["runs_per_sec"] > 0
+        assert result["2"]["p50_seconds"] <= result["2"]["p95_seconds"]
+
+    def test_import_is_lazy(self):
+        result = bench_import(repeat=1)
+        # Import time varies with the machine; what keeps it low is that
+        # ``import ollama_agent`` loads none of the heavy dependencies
+        assert result["package"]["loaded"] == []
+        # Creating an agent needs only langchain_core's message types; the
+        # Ollama client, search tool and HTTP stack wait for first use
+        assert result["agent"]["loaded"] == ["langchain_core"]
+
+
+class TestRunBenchmarks:
+    """Tests for run_benchmarks, compare and the command line."""
+
+    def test_only(self):
+        result = run_benchmarks(only=["system_prompt"], quick=True)
+        assert list(result["benchmarks"]) == ["system_prompt"]
+        assert result["meta"]["options"]["quick"] is True
+        assert result["meta"]["version"]
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            run_benchmarks(only=["nope"])
+
+    def test_compare(self):
+        old = {"benchmarks": {"a": {"seconds": 2.0, "runs_per_sec": 10.0, "gone": 1.0}}}
+        new = {"benchmarks": {"a": {"seconds": 1.0, "runs_per_sec": 5.0}}}
+        rows = {row["metric"]: row["change"] for row in compare(old, new)}
+        assert rows == {"a.seconds": 0.5, "a.runs_per_sec": -0.5}
+
+    def test_main_writes_and_compares(self, tmp_path, capsys):
+        out = tmp_path / "bench.json"
+        argv = ["--quick", "--only", "parse_tool_call", "--only", "system_prompt"]
+        main(argv + ["--out", str(out)])
+        data = json.loads(out.read_text())
+        assert set(data["benchmarks"]) == {"parse_tool_call", "system_prompt"}
+        main(argv + ["--compare", str(out)])
+        assert "->" in capsys.readouterr().out
@@ -0,0 +1,217 @@
+"""Tests for the cache module."""
+
+import threading
+
+from unittest.mock import MagicMock, patch
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.cache import DiskResponseCache, TTLCache, make_cache_key
+
+
+class _Clock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMakeCacheKey:
+    """Tests for make_cache_key function."""
+
+    def test_stable_for_equal_inputs(self):
+        messages = [SystemMessage(content="sys"), HumanMessage(content="hi")]
+        same = [SystemMessage(content="sys"), HumanMessage(content="hi")]
+        assert make_cache_key("m", {"temperature": 0}, messages) == make_cache_key(
+            "m", {"temperature": 0}, same
+        )
+
+    def test_differs_by_model_options_and_messages(self):
+        messages = [HumanMessage(content="hi")]
+        base = make_cache_key("m", {"temperature": 0}, messages)
+        assert make_cache_key("other", {"temperature": 0}, messages) != base
+        assert make_cache_key("m", {"temperature": 0, "seed": 1}, messages) != base
+        assert make_cache_key("m", {"temperature": 0}, [AIMessage(content="hi")]) != base
+
+
+    def test_includes_tool_calls(self):
+        call = [{"name": "weather", "args": {"input": "Paris"}, "id": "1"}]
+        other = [{"name": "weather", "args": {"input": "Rome"}, "id": "1"}]
+        assert make_cache_key("m", {}, [AIMessage(content="", tool_calls=call)]) != make_cache_key(
+            "m", {}, [AIMessage(content="", tool_calls=other)]
+        )
+
+
+class TestDiskResponseCache:
+    """Tests for DiskResponseCache."""
+
+    def test_get_and_set(self, tmp_path):
+        cache = DiskResponseCache(tmp_path / "cache.db")
+        assert cache.get("k") is None
+        cache.set("k", "value")
+        assert cache.get("k") == "value"
+        assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1, "bytes": 5}
+
+    def test_shared_between_instances(self, tmp_path):
+        DiskResponseCache(tmp_path / "cache.db").set("k", "value")
+        assert DiskResponseCache(tmp_path / "cache.db").get("k") == "value"
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = DiskResponseCache(tmp_path / "cache.db", max_bytes=10)
+        cache.set("a", "aaaa")
+        cache.set("b", "bbbb")
+        cache.get("a")  # a is now more recent than b
+        cache.set("c", "cccc")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "aaaa"
+        assert cache.get("c") == "cccc"
+
+    def test_concurrent_writers(self, tmp_path):
+        path = tmp_path / "cache.db"
+        errors = []
+
+        def write(n):
+            try:
+                cache = DiskResponseCache(path)
+                for i in range(20):
+                    cache.set(f"{n}-{i}", "x" * 10)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        assert DiskResponseCache(path).stats()["entries"] == 80
+
+    def test_clear(self, tmp_path):
+        cache = DiskResponseCache(tmp_path / "cache.db")
+        cache.set("k", "v")
+        cache.clear()
+        assert cache.get("k") is None
+
+
+class TestNativeToolsResponseCache:
+    """Tests for caching structured tool-call responses."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_tool_calls_survive_cache_round_trip(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+        mock_llm.bind_tools.return_value.invoke.side_effect = lambda messages: (
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "calculator", "args": {"input": "1+2"}, "id": "c1"}],
+            )
+            if len(messages) == 2
+            else AIMessage(content="3")
+        )
+        mock_chat.return_value = mock_llm
+        cache = DiskResponseCache(tmp_path / "cache.db")
+
+        for _ in range(2):
+            agent = OllamaAgent(temperature=0, native_tools=True, response_cache=cache)
+            assert agent.run("1+2?") == "3"
+        assert mock_llm.bind_tools.return_value.invoke.call_count == 2
+        assert cache.hits == 2
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_fresh_hit(self):
+        cache = TTLCache(ttl=10, clock=_Clock())
+        cache.set("k", "v")
+        assert cache.get("k") == ("v", False)
+
+    def test_expires_after_ttl(self):
+        clock = _Clock()
+        cache = TTLCache(ttl=10, clock=clock)
+        cache.set("k", "v")
+        clock.now = 11
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_stale_window(self):
+        clock = _Clock()
+        cache = TTLCache(ttl=10, stale_ttl=5, clock=clock)
+        cache.set("k", "v")
+        clock.now = 12
+        assert cache.get("k") == ("v", True)
+        clock.now = 16
+        assert cache.get("k") is None
+
+    def test_lru_eviction(self):
+        cache = TTLCache(ttl=10, max_size=2, clock=_Clock())
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == (1, False)
+
+    def test_stats(self):
+        cache = TTLCache(ttl=10, clock=_Clock())
+        cache.set("k", "v")
+        cache.get("k")
+        cache.get("missing")
+        assert cache.stats() == {"hits": 1, "stale_hits": 0, "misses": 1, "entries": 1}
+
+
+class TestAgentResponseCache:
+    """Tests for the response cache wired into OllamaAgent."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_replays_deterministic_conversation(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = MagicMock(content="Hello!")
+        mock_chat.return_value = mock_llm
+        cache = DiskResponseCache(tmp_path / "cache.db")
+
+        assert OllamaAgent(temperature=0, response_cache=cache).run("Hi") == "Hello!"
+        assert OllamaAgent(temperature=0, response_cache=cache).run("Hi") == "Hello!"
+        assert mock_llm.invoke.call_count == 1
+        assert cache.hits == 1
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_bypassed_when_sampling_is_random(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = MagicMock(content="Hello!")
+        mock_chat.return_value = mock_llm
+        cache = DiskResponseCache(tmp_path / "cache.db")
+
+        OllamaAgent(temperature=0.7, response_cache=cache).run("Hi")
+        OllamaAgent(temperature=0.7, response_cache=cache).run("Hi")
+        assert mock_llm.invoke.call_count == 2
+        assert cache.stats()["entries"] == 0
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_fixed_seed_enables_cache(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = MagicMock(content="Hello!")
+        mock_chat.return_value = mock_llm
+        cache = DiskResponseCache(tmp_path / "cache.db")
+
+        OllamaAgent(temperature=0.7, seed=42, response_cache=cache).run("Hi")
+        OllamaAgent(temperature=0.7, seed=42, response_cache=cache).run("Hi")
+        assert mock_llm.invoke.call_count == 1
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_run_stream_replays_from_cache(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+        mock_llm.stream.side_effect = lambda messages: (
+            MagicMock(content=text) for text in ("Hel", "lo!")
+        )
+        mock_chat.return_value = mock_llm
+        cache = DiskResponseCache(tmp_path / "cache.db")
+
+        first = list(OllamaAgent(temperature=0, response_cache=cache).run_stream("Hi"))
+        second = list(OllamaAgent(temperature=0, response_cache=cache).run_stream("Hi"))
+        assert "".join(first) == "".join(second) == "Hello!"
+        assert mock_llm.stream.call_count == 1
@@ -2,7 +2,7 @@
 
 import pytest
 
-from ollama_agent.config import Config, _parse_bool
+from ollama_agent.config import Config, _parse_bool, _parse_keep_alive
 
 
 class TestParseBool:
@@ -33,6 +33,21 @@ class TestParseBool:
         assert _parse_bool("", default=True) is False  # default only used for None
 
 
+class TestParseKeepAlive:
+    """Tests for _parse_keep_alive function."""
+
+    def test_unset(self):
+        assert _parse_keep_alive(None) is None
+        assert _parse_keep_alive("") is None
+
+    def test_seconds(self):
+        assert _parse_keep_alive("-1") == -1
+        assert _parse_keep_alive("300") == 300
+
+    def test_duration(self):
+        assert _parse_keep_alive("30m") == "30m"
+
+
 class TestConfig:
     """Tests for Config class."""
 
@@ -60,6 +75,7 @@ class TestConfig:
         assert hasattr(config, "temperature")
         assert hasattr(config, "max_iterations")
         assert hasattr(config, "max_search_results")
+        assert hasattr(config, "batch_concurrency")
         assert hasattr(config, "require_approval_commands")
         assert hasattr(config, "require_approval_files")
         assert hasattr(config, "blocked_commands")
@@ -0,0 +1,237 @@
+"""Tests for the endpoints module."""
+
+import asyncio
+import gc
+import threading
+
+import httpx
+import pytest
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.endpoints import EndpointPool, _is_endpoint_failure
+from ollama_agent.exceptions import ConfigurationError
+from ollama_agent.testing import FakeOllama
+
+# Nothing listens on port 1
+DEAD_URL = "http://127.0.0.1:1"
+
+
+class _ServerError(Exception):
+    status_code = 503
+
+
+class _BadRequest(Exception):
+    status_code = 400
+
+
+def _pool(urls, **kwargs):
+    kwargs.setdefault("probe_interval", 0)
+    return EndpointPool(urls, **kwargs)
+
+
+class TestEndpointPool:
+    """Tests for EndpointPool class."""
+
+    def test_requires_urls(self):
+        with pytest.raises(ConfigurationError):
+            _pool([])
+
+    def test_rejects_bad_percentile(self):
+        with pytest.raises(ConfigurationError):
+            _pool(["http://a"], hedge_percentile=1.5)
+
+    def test_is_endpoint_failure(self):
+        assert _is_endpoint_failure(ConnectionError())
+        assert _is_endpoint_failure(httpx.ReadTimeout("slow"))
+        assert _is_endpoint_failure(_ServerError())
+        assert not _is_endpoint_failure(_BadRequest())
+        assert not _is_endpoint_failure(ValueError())
+
+    def test_spreads_calls(self):
+        pool = _pool(["http://a", "http://b"])
+        urls = [pool.call(lambda ep: ep.url) for _ in range(4)]
+        assert urls.count("http://a") == urls.count("http://b") == 2
+
+    def test_prefers_least_outstanding(self):
+        pool = _pool(["http://a", "http://b"])
+        pool.endpoints[0].outstanding = 3
+        assert pool.call(lambda ep: ep.url) == "http://b"
+
+    def test_failover(self):
+        pool = _pool(["http://a", "http://b"])
+
+        def call(ep):
+            if ep.url == "http://a":
+                raise ConnectionError("refused")
+            return ep.url
+
+        assert {pool.call(call) for _ in range(3)} == {"http://b"}
+        stats = pool.stats()["endpoints"]
+        assert stats["http://a"]["healthy"] is False
+        assert stats["http://a"]["failures"] == 1
+        assert stats["http://b"]["requests"] == 3
+
+    def test_all_down_raises_last_error(self):
+        pool = _pool(["http://a", "http://b"])
+
+        def call(ep):
+            raise _ServerError(ep.url)
+
+        with pytest.raises(_ServerError):
+            pool.call(call)
+        assert all(ep.outstanding == 0 for ep in pool.endpoints)
+
+    def test_request_errors_are_not_retried(self):
+        pool = _pool(["http://a", "http://b"])
+        seen = []
+
+        def call(ep):
+            seen.append(ep.url)
+            raise _BadRequest()
+
+        with pytest.raises(_BadRequest):
+            pool.call(call)
+        assert len(seen) == 1
+        assert all(ep.healthy for ep in pool.endpoints)
+
+    def test_down_endpoint_retried_after_timeout(self):
+        now = [0.0]
+        pool = _pool(["http://a", "http://b"], retry_after=5, clock=lambda: now[0])
+        pool.endpoints[0].healthy = False
+        assert {pool.call(lambda ep: ep.url) for _ in range(3)} == {"http://b"}
+        now[0] = 10.0
+        assert "http://a" in {pool.call(lambda ep: ep.url) for _ in range(3)}
+
+    def test_probe_updates_health(self):
+        def handler(request):
+            return httpx.Response(200 if request.url.host == "a" else 500)
+
+        pool = _pool(["http://a", "http://b"], transport=httpx.MockTransport(handler))
+        pool.endpoints[0].healthy = False
+        pool.probe()
+        assert pool.endpoints[0].healthy is True
+        assert pool.endpoints[1].healthy is False
+
+    def test_probing_starts_on_use_and_stops_with_pool(self):
+        transport = httpx.MockTransport(lambda r: httpx.Response(200, json={}))
+        pool = EndpointPool(["http://a"], probe_interval=0.01, transport=transport)
+        assert pool._probe_thread is None
+        pool.call(lambda ep: ep.url)
+        thread = pool._probe_thread
+        assert thread.is_alive()
+        del pool
+        gc.collect()
+        thread.join(2)
+        assert not thread.is_alive()
+
+    def test_stream_fails_over_before_first_item(self):
+        pool = _pool(["http://a", "http://b"])
+
+        def stream(ep):
+            if ep.url == "http://a":
+                raise ConnectionError("refused")
+            yield from ["x", "y"]
+
+        assert list(pool.stream(stream)) == ["x", "y"]
+        assert list(pool.stream(stream)) == ["x", "y"]
+        assert pool.stats()["endpoints"]["http://b"]["requests"] == 2
+
+    def test_stream_counts_outstanding_until_done(self):
+        pool = _pool(["http://a"])
+        items = pool.stream(lambda ep: iter([1, 2]))
+        assert next(items) == 1
+        assert pool.endpoints[0].outstanding == 1
+        items.close()
+        assert pool.endpoints[0].outstanding == 0
+
+    def test_hedges_slow_call(self):
+        pool = _pool(["http://a", "http://b"], hedge_percentile=0.5, hedge_min_samples=1)
+        pool._latencies.append(0.01)
+        with FakeOllama("slow", latency=1) as slow, FakeOllama("fast") as fast:
+            urls = {"http://a": slow.url, "http://b": fast.url}
+
+            def call(ep):
+                url = urls[ep.url]
+                return httpx.post(f"{url}/api/chat", json={"stream": False}, timeout=5)
+
+            # Whichever is picked first, the fast one answers
+            for _ in range(2):
+                assert pool.call(call).json()["message"]["content"] == "fast"
+        assert pool.hedges >= 1
+        pool.close()
+
+    def test_acall_hedges_and_cancels_loser(self):
+        pool = _pool(["http://a", "http://b"], hedge_percentile=0.5, hedge_min_samples=1)
+        pool._latencies.append(0.01)
+        cancelled = []
+
+        async def call(ep):
+            if ep.url == "http://a":
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(ep.url)
+                    raise
+            return ep.url
+
+        async def main():
+            return [await pool.acall(call) for _ in range(2)]
+
+        assert asyncio.run(main()) == ["http://b", "http://b"]
+        assert cancelled == ["http://a"]
+        assert pool.hedge_wins == 1
+
+    def test_stats(self):
+        pool = _pool(["http://a/"])
+        pool.call(lambda ep: None)
+        stats = pool.stats()
+        assert pool.urls == ["http://a"]
+        assert stats["endpoints"]["http://a"]["requests"] == 1
+        assert stats["endpoints"]["http://a"]["p50"] is not None
+        assert stats["hedges"] == 0
+
+
+class TestAgentEndpoints:
+    """Tests for OllamaAgent with an endpoint pool."""
+
+    def test_run_spreads_across_endpoints(self):
+        with FakeOllama("One.") as a, FakeOllama("Two.") as b:
+            agent = OllamaAgent(model="fake", endpoints=[a.url, b.url])
+            answers = {agent.run("hi") for _ in range(4)}
+        assert answers == {"One.", "Two."}
+        assert len(a.requests) == len(b.requests) == 2
+        agent.endpoints.close()
+
+    def test_run_fails_over_dead_endpoint(self):
+        with FakeOllama("Alive.") as fake:
+            agent = OllamaAgent(model="fake", endpoints=[DEAD_URL, fake.url])
+            assert [agent.run("hi") for _ in range(2)] == ["Alive.", "Alive."]
+        assert agent.endpoints.stats()["endpoints"][DEAD_URL]["healthy"] is False
+        agent.endpoints.close()
+
+    def test_stream_fails_over_dead_endpoint(self):
+        with FakeOllama("Streamed answer.") as fake:
+            agent = OllamaAgent(model="fake", endpoints=[DEAD_URL, fake.url])
+            chunks = list(agent.run_stream("hi"))
+        assert "".join(chunks) == "Streamed answer."
+        agent.endpoints.close()
+
+    def test_agents_start_no_probe_threads(self):
+        before = {t for t in threading.enumerate() if t.name == "ollama-agent-probe"}
+        agents = [OllamaAgent(model="fake", endpoints=["http://a", "http://b"]) for _ in range(5)]
+        after = {t for t in threading.enumerate() if t.name == "ollama-agent-probe"}
+        assert after == before
+        assert len(agents) == 5
+
+    def test_native_tools_bound_per_endpoint(self):
+        with FakeOllama("Done.") as fake:
+            agent = OllamaAgent(model="fake", endpoints=[fake.url], native_tools=True)
+            assert agent.run("hi") == "Done."
+        assert fake.requests[0]["tools"]
+        agent.endpoints.close()
+
+    def test_arun_uses_pool(self):
+        with FakeOllama("Async.") as fake:
+            agent = OllamaAgent(model="fake", endpoints=[DEAD_URL, fake.url])
+            assert asyncio.run(agent.arun("hi")) == "Async."
+        agent.endpoints.close()
@@ -0,0 +1,121 @@
+"""Tests for the executor module."""
+
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from ollama_agent.executor import ToolExecutor
+from ollama_agent.metrics import Metrics
+
+
+def _wait_for(predicate, timeout=2.0):
+    """Poll until predicate() is true."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.001)
+
+
+class TestToolExecutor:
+    """Tests for ToolExecutor."""
+
+    def test_runs_calls(self):
+        executor = ToolExecutor(max_workers=2)
+        futures = [executor.submit(pow, 2, n) for n in range(5)]
+        assert [f.result(timeout=2) for f in futures] == [1, 2, 4, 8, 16]
+        with pytest.raises(ZeroDivisionError):
+            executor.submit(divmod, 1, 0).result(timeout=2)
+        _wait_for(lambda: executor.stats()["busy"] == 0)
+        stats = executor.stats()
+        assert stats["workers"] <= 2
+        assert (stats["queued"], stats["completed"]) == (0, 6)
+        executor.shutdown()
+        _wait_for(lambda: executor.stats()["workers"] == 0)
+        with pytest.raises(RuntimeError):
+            executor.submit(pow, 2, 2)
+
+    def test_abandon_queued_call(self):
+        executor = ToolExecutor(max_workers=1, max_stuck=0)
+        release = threading.Event()
+        blocker = executor.submit(release.wait)
+        queued = executor.submit(pow, 2, 2)
+        with pytest.raises(FutureTimeoutError):
+            queued.result(timeout=0.01)
+        executor.abandon(queued)
+        assert queued.cancelled()
+        release.set()
+        assert blocker.result(timeout=2) is True
+        _wait_for(lambda: executor.stats()["queued"] == 0)
+        assert executor.stats()["timeouts"] == 1
+
+    def test_stuck_worker_is_replaced(self):
+        executor = ToolExecutor(max_workers=1)
+        release = threading.Event()
+        hung = executor.submit(release.wait)
+        _wait_for(lambda: executor.stats()["busy"] == 1)
+        waiting = executor.submit(pow, 3, 2)
+        executor.abandon(hung)
+        # The waiting call gets a new worker while the hung one still runs
+        assert waiting.result(timeout=2) == 9
+        _wait_for(lambda: executor.stats()["busy"] == 1)
+        stats = executor.stats()
+        assert (stats["workers"], stats["stuck"]) == (1, 1)
+        release.set()
+        _wait_for(lambda: executor.stats()["stuck"] == 0)
+        assert executor.stats()["busy"] == 0
+
+    def test_parallel_after_abandon(self):
+        executor = ToolExecutor(max_workers=2)
+        # More calls than workers, so some are picked up from the queue
+        gate = threading.Event()
+        backlog = [executor.submit(gate.wait) for _ in range(4)]
+        gate.set()
+        assert all(f.result(timeout=2) for f in backlog)
+        release = threading.Event()
+        hung = executor.submit(release.wait)
+        _wait_for(lambda: executor.stats()["busy"] == 1)
+        executor.abandon(hung)
+        # The hung thread is replaced: two calls still run at the same time
+        barrier = threading.Barrier(2, timeout=2)
+        calls = [executor.submit(barrier.wait) for _ in range(2)]
+        assert sorted(f.result(timeout=3) for f in calls) == [0, 1]
+        release.set()
+
+    def test_idle_workers_exit(self):
+        executor = ToolExecutor(max_workers=2, idle_timeout=0.05)
+        futures = [executor.submit(time.sleep, 0.01) for _ in range(2)]
+        assert [f.result(timeout=2) for f in futures] == [None, None]
+        _wait_for(lambda: executor.stats()["workers"] == 0)
+        # A later call starts a new worker
+        assert executor.submit(pow, 2, 3).result(timeout=2) == 8
+
+    def test_max_stuck(self):
+        executor = ToolExecutor(max_workers=1, max_stuck=0)
+        release = threading.Event()
+        hung = executor.submit(release.wait)
+        _wait_for(lambda: executor.stats()["busy"] == 1)
+        waiting = executor.submit(pow, 3, 2)
+        executor.abandon(hung)
+        # No replacement: the call waits for the hung one
+        with pytest.raises(FutureTimeoutError):
+            waiting.result(timeout=0.05)
+        assert executor.stats()["stuck"] == 0
+        release.set()
+        assert waiting.result(timeout=2) == 9
+
+    def test_metrics(self):
+        metrics = Metrics()
+        executor = ToolExecutor(max_workers=2, metrics=metrics)
+        release = threading.Event()
+        hung = executor.submit(release.wait)
+        _wait_for(lambda: executor.stats()["busy"] == 1)
+        executor.abandon(hung)
+        pool = metrics.stats()["tool_pool"]
+        assert (pool["workers"], pool["busy"], pool["queued"], pool["stuck"]) == (0, 1, 0, 1)
+        assert pool["queue_wait"]["count"] == 1
+        release.set()
+        _wait_for(lambda: metrics.stats()["tool_pool"]["busy"] == 0)
+        assert "ollama_agent_tool_workers_stuck 0" in metrics.prometheus()
@@ -0,0 +1,188 @@
+"""Tests for the history module."""
+
+import threading
+
+from unittest.mock import MagicMock, patch
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.history import (
+    SUMMARY_NAME,
+    HistoryCompactor,
+    estimate_tokens,
+    is_summary,
+)
+
+
+def _conversation(turns, size=400):
+    """Build a system prompt followed by user/assistant turns."""
+    messages = [SystemMessage(content="system prompt")]
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"question {i} " + "x" * size))
+        messages.append(AIMessage(content=f"answer {i} " + "y" * size))
+    return messages
+
+
+class TestEstimateTokens:
+    """Tests for estimate_tokens function."""
+
+    def test_grows_with_content(self):
+        short = [HumanMessage(content="hi")]
+        long = [HumanMessage(content="hi" * 100)]
+        assert estimate_tokens(long) > estimate_tokens(short)
+
+
+class TestHistoryCompactor:
+    """Tests for HistoryCompactor."""
+
+    def test_under_budget_does_nothing(self):
+        summarize = MagicMock(return_value="summary")
+        compactor = HistoryCompactor(summarize, token_budget=100_000, background=False)
+        messages = _conversation(5)
+        compactor.schedule(messages)
+        summarize.assert_not_called()
+        assert len(messages) == 11
+
+    def test_compacts_older_turns(self):
+        compactor = HistoryCompactor(
+            lambda msgs: f"{len(msgs)} messages", token_budget=100, keep_recent=4,
+            background=False,
+        )
+        messages = _conversation(5)
+        system, recent = messages[0], messages[-4:]
+        compactor.schedule(messages)
+
+        assert messages[0] is system
+        assert is_summary(messages[1])
+        assert "6 messages" in messages[1].content
+        assert messages[2:] == recent
+        assert compactor.compactions == 1
+
+    def test_rolling_summary_includes_previous_summary(self):
+        seen = []
+
+        def summarize(msgs):
+            seen.append(msgs)
+            return "rolled"
+
+        compactor = HistoryCompactor(summarize, token_budget=100, keep_recent=2, background=False)
+        messages = _conversation(3)
+        compactor.schedule(messages)
+        messages.extend(_conversation(2)[1:])
+        compactor.schedule(messages)
+
+        assert is_summary(seen[1][0])
+        assert sum(is_summary(m) for m in messages) == 1
+
+    def test_keeps_tool_results_with_their_turn(self):
+        compactor = HistoryCompactor(lambda msgs: "s", token_budget=10, keep_recent=2, background=False)
+        messages = [
+            SystemMessage(content="system"),
+            HumanMessage(content="first " * 50),
+            AIMessage(content="answer " * 50),
+            HumanMessage(content="second"),
+            AIMessage(content="TOOL: weather\nINPUT: Paris"),
+            HumanMessage(content="TOOL RESULT:\nsunny"),
+            AIMessage(content="It is sunny."),
+        ]
+        compactor.schedule(messages)
+        # The cut lands on the "second" user turn, not on the tool result
+        assert messages[2].content == "second"
+
+    def test_background_result_applied_on_next_turn(self):
+        release = threading.Event()
+
+        def summarize(msgs):
+            release.wait(2)
+            return "later"
+
+        compactor = HistoryCompactor(summarize, token_budget=100, keep_recent=2)
+        messages = _conversation(4)
+        compactor.schedule(messages)
+        assert compactor.apply(messages) is False
+
+        release.set()
+        compactor.wait(2)
+        assert compactor.apply(messages) is True
+        assert messages[1].name == SUMMARY_NAME
+
+    def test_stale_result_discarded_after_reset(self):
+        compactor = HistoryCompactor(lambda msgs: "s", token_budget=100, keep_recent=2)
+        messages = _conversation(4)
+        compactor.schedule(messages)
+        compactor.wait(2)
+
+        messages[:] = [SystemMessage(content="fresh")]
+        assert compactor.apply(messages) is False
+        assert len(messages) == 1
+
+    def test_summarize_errors_are_recorded(self):
+        def summarize(msgs):
+            raise RuntimeError("model down")
+
+        compactor = HistoryCompactor(summarize, token_budget=100, keep_recent=2, background=False)
+        messages = _conversation(4)
+        compactor.schedule(messages)
+        assert isinstance(compactor.last_error, RuntimeError)
+        assert len(messages) == 9
+
+
+class TestAgentHistoryBudget:
+    """Tests for history compaction wired into OllamaAgent."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_disabled_by_default(self, mock_chat):
+        agent = OllamaAgent()
+        assert agent._compactor is None
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_compacts_between_turns(self, mock_chat):
+        mock_llm = MagicMock()
+
+        def invoke(messages):
+            if messages[0].content.startswith("Summarize"):
+                return MagicMock(content="user asked many questions")
+            return MagicMock(content="answer " + "z" * 400)
+
+        mock_llm.invoke.side_effect = invoke
+        mock_chat.return_value = mock_llm
+
+        agent = OllamaAgent(history_token_budget=300)
+        for i in range(5):
+            agent.run(f"question {i}")
+            agent._compactor.wait(2)
+
+        assert agent._compactor.compactions >= 1
+        assert any(is_summary(m) for m in agent._messages)
+        assert agent._messages[0].content.startswith("You are a helpful assistant")
+        assert agent.get_history()[-1]["content"].startswith("answer")
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_compaction_folds_tool_updates_into_prompt(self, mock_chat):
+        summarized = []
+
+        def invoke(messages):
+            if messages[0].content.startswith("Summarize"):
+                summarized.append(messages[1].content)
+                return MagicMock(content="user asked many questions")
+            return MagicMock(content="answer " + "z" * 400)
+
+        mock_chat.return_value.invoke.side_effect = invoke
+        agent = OllamaAgent(tools={}, history_token_budget=300)
+        agent._compactor.background = False
+        agent.run("question 0")
+        agent.add_tool("shout", str.upper, "Uppercase text")
+        assert "shout" not in agent._messages[0].content
+        for i in range(1, 4):
+            agent.run(f"question {i}")
+
+        assert agent._compactor.compactions >= 1
+        assert "- shout: Uppercase text" in agent._messages[0].content
+        assert not any("TOOLS UPDATED" in text for text in summarized)
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_fork_gets_own_compactor(self, mock_chat):
+        agent = OllamaAgent(history_token_budget=300)
+        forked = agent._fork()
+        assert forked._compactor is not agent._compactor
+        assert forked._compactor.token_budget == 300
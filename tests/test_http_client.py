@@ -0,0 +1,114 @@
+"""Tests for the http_client module."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import httpx
+
+from ollama_agent.http_client import HTTPClient, get_http_client
+from ollama_agent.tools import _ip_info, _wikipedia
+
+
+class TestHTTPClient:
+    """Tests for HTTPClient class."""
+
+    def test_get_reuses_one_client(self):
+        seen = []
+
+        def handler(request):
+            seen.append(str(request.url))
+            return httpx.Response(200, text="ok")
+
+        client = HTTPClient(transport=httpx.MockTransport(handler))
+        assert client.get("https://a.example/1").text == "ok"
+        first = client._sync_client()
+        client.get("https://a.example/2")
+        assert client._sync_client() is first
+        assert seen == ["https://a.example/1", "https://a.example/2"]
+
+    def test_per_host_limit(self):
+        active = {"now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def handler(request):
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            time.sleep(0.02)
+            with lock:
+                active["now"] -= 1
+            return httpx.Response(200)
+
+        client = HTTPClient(
+            max_connections_per_host=2, transport=httpx.MockTransport(handler)
+        )
+        threads = [
+            threading.Thread(target=client.get, args=("https://a.example/",))
+            for _ in range(6)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert active["max"] <= 2
+
+    def test_aget_uses_async_transport(self):
+        async def handler(request):
+            return httpx.Response(200, json={"ok": True})
+
+        client = HTTPClient(async_transport=httpx.MockTransport(handler))
+
+        async def main():
+            first = await client.aget("https://a.example/")
+            state = await client._async_state()
+            await client.aget("https://a.example/")
+            assert await client._async_state() == state
+            return first
+
+        assert asyncio.run(main()).json() == {"ok": True}
+
+    def test_async_clients_close_with_their_loop(self):
+        client = HTTPClient(async_transport=httpx.MockTransport(lambda r: httpx.Response(200)))
+        opened = []
+
+        async def main():
+            await client.aget("https://a.example/")
+            opened.append((await client._async_state())[0])
+
+        for _ in range(5):
+            asyncio.run(main())
+        assert client._async_clients == {}
+        assert len(opened) == 5 and all(c.is_closed for c in opened)
+
+    def test_close_resets_client(self):
+        client = HTTPClient(transport=httpx.MockTransport(lambda r: httpx.Response(200)))
+        first = client._sync_client()
+        client.close()
+        assert client._client is None
+        assert client._sync_client() is not first
+
+    def test_get_http_client_is_shared(self):
+        assert get_http_client() is get_http_client()
+
+
+class TestPooledBuiltins:
+    """Tests for built-in tools using the shared client."""
+
+    def _client(self, handler):
+        return HTTPClient(transport=httpx.MockTransport(handler))
+
+    def test_wikipedia_not_found(self):
+        client = self._client(lambda r: httpx.Response(404))
+        with patch("ollama_agent.tools.get_http_client", return_value=client):
+            assert _wikipedia("Nope") == "No Wikipedia article found for 'Nope'"
+
+    def test_ip_info(self):
+        client = self._client(
+            lambda r: httpx.Response(200, json={"ip": "1.2.3.4", "org": "ISP"})
+        )
+        with patch("ollama_agent.tools.get_http_client", return_value=client):
+            result = _ip_info()
+        assert "IP: 1.2.3.4" in result
+        assert "ISP: ISP" in result
@@ -0,0 +1,211 @@
+"""Tests for the metrics module."""
+
+import asyncio
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.cache import DiskResponseCache
+from ollama_agent.metrics import Histogram, Metrics
+from ollama_agent.tools import _make_tool
+from ollama_agent.testing import FakeOllama
+
+METADATA = {
+    "done": True,
+    "load_duration": 100_000_000,
+    "prompt_eval_count": 40,
+    "prompt_eval_duration": 200_000_000,
+    "eval_count": 50,
+    "eval_duration": 2_000_000_000,
+}
+
+
+class TestHistogram:
+    """Tests for Histogram class."""
+
+    def test_observe(self):
+        histogram = Histogram((1, 2, 5))
+        for value in (0.5, 1, 1.5, 10):
+            histogram.observe(value)
+        assert histogram.counts == [2, 1, 0, 1]
+        assert histogram.count == 4
+        assert histogram.sum == 13
+
+    def test_quantile(self):
+        histogram = Histogram((1, 2, 5))
+        assert histogram.quantile(0.5) is None
+        for value in (0.5, 1.5, 1.5, 4):
+            histogram.observe(value)
+        assert histogram.quantile(0.5) == 2
+        assert histogram.quantile(0.95) == 5
+        histogram.observe(100)
+        assert histogram.quantile(1.0) == float("inf")
+
+
+class TestMetrics:
+    """Tests for Metrics class."""
+
+    def test_record_llm_from_metadata(self):
+        metrics = Metrics()
+        metrics.record_llm("m", 2.5, METADATA)
+        stats = metrics.stats()["llm"]["m"]
+        assert stats["calls"] == 1
+        assert stats["prompt_tokens"] == 40
+        assert stats["eval_tokens"] == 50
+        assert stats["prefill"]["avg"] == 0.2
+        assert stats["decode"]["avg"] == 2.0
+        assert stats["tokens_per_second"]["avg"] == 25
+        # Not streamed: load plus prefill
+        assert abs(stats["ttft"]["avg"] - 0.3) < 1e-9
+
+    def test_measured_ttft_wins(self):
+        metrics = Metrics()
+        metrics.record_llm("m", 1.0, METADATA, ttft=0.05)
+        assert metrics.stats()["llm"]["m"]["ttft"]["avg"] == 0.05
+
+    def test_cached_and_errors(self):
+        metrics = Metrics()
+        metrics.record_llm("m", 0.0, cached=True)
+        metrics.record_llm("m", 0.1, error=True)
+        stats = metrics.stats()["llm"]["m"]
+        assert stats["calls"] == 2
+        assert stats["cache_hits"] == 1
+        assert stats["errors"] == 1
+        # Cache hits don't skew latency
+        assert stats["latency"]["count"] == 1
+
+    def test_ignores_missing_metadata(self):
+        metrics = Metrics()
+        metrics.record_llm("m", 1.0, {"done": True})
+        stats = metrics.stats()["llm"]["m"]
+        assert "ttft" not in stats
+        assert "prompt_tokens" not in stats
+
+    def test_record_tool_and_run(self):
+        metrics = Metrics()
+        metrics.record_tool("calculator", 0.01, ok=True)
+        metrics.record_tool("calculator", 0.0, ok=True, cached=True)
+        metrics.record_tool("calculator", 0.02, ok=False)
+        metrics.record_run("m", 1.5, 3, "ok")
+        metrics.record_run("m", 9.0, 10, "max_iterations")
+        stats = metrics.stats()
+        tool = stats["tools"]["calculator"]
+        assert (tool["calls"], tool["ok"], tool["error"], tool["cache_hits"]) == (3, 2, 1, 1)
+        run = stats["runs"]["m"]
+        assert (run["runs"], run["ok"], run["max_iterations"]) == (2, 1, 1)
+        assert run["iterations"]["avg"] == 6.5
+
+    def test_hooks(self):
+        metrics = Metrics()
+        events = []
+
+        def broken(event, data):
+            raise RuntimeError("ignored")
+
+        metrics.add_hook(broken)
+        metrics.add_hook(lambda event, data: events.append((event, data)))
+        metrics.record_llm("m", 1.0, METADATA)
+        metrics.record_tool("t", 0.1, ok=True)
+        assert [event for event, _ in events] == ["llm", "tool"]
+        assert events[0][1]["eval_tokens"] == 50
+        metrics.remove_hook(broken)
+        assert len(metrics._hooks) == 1
+
+    def test_prometheus(self):
+        metrics = Metrics()
+        metrics.record_llm("m", 0.3, METADATA)
+        metrics.record_tool('we"ird', 0.01, ok=True)
+        text = metrics.prometheus()
+        assert "# TYPE ollama_agent_llm_calls_total counter" in text
+        assert 'ollama_agent_llm_calls_total{model="m"} 1' in text
+        assert "# TYPE ollama_agent_llm_seconds histogram" in text
+        assert 'ollama_agent_llm_seconds_bucket{model="m",le="0.25"} 0' in text
+        assert 'ollama_agent_llm_seconds_bucket{model="m",le="0.5"} 1' in text
+        assert 'ollama_agent_llm_seconds_bucket{model="m",le="+Inf"} 1' in text
+        assert 'ollama_agent_llm_seconds_count{model="m"} 1' in text
+        assert 'ollama_agent_prompt_tokens_total{model="m"} 40' in text
+        assert 'tool="we\\"ird",status="ok"' in text
+        assert text.endswith("\n")
+
+    def test_reset(self):
+        metrics = Metrics()
+        metrics.record_llm("m", 1.0)
+        metrics.reset()
+        assert metrics.prometheus() == ""
+        assert metrics.stats() == {"llm": {}, "tools": {}, "tool_pool": {}, "runs": {}}
+
+
+class TestAgentMetrics:
+    """Tests for metrics recorded by OllamaAgent."""
+
+    def test_run_records_calls_tools_and_iterations(self):
+        metrics = Metrics()
+        with FakeOllama(["TOOL: calculator\nINPUT: 2+2", "It's 4."]) as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, metrics=metrics)
+            assert agent.run("2+2?") == "It's 4."
+        stats = metrics.stats()
+        assert stats["llm"]["fake"]["calls"] == 2
+        assert stats["llm"]["fake"]["eval_tokens"] > 0
+        assert stats["tools"]["calculator"]["ok"] == 1
+        assert stats["runs"]["fake"]["ok"] == 1
+        assert stats["runs"]["fake"]["iterations"]["avg"] == 2
+
+    def test_stream_measures_ttft(self):
+        metrics = Metrics()
+        with FakeOllama("One two three.", latency=0.05) as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, metrics=metrics)
+            assert "".join(agent.run_stream("hi")) == "One two three."
+        stats = metrics.stats()["llm"]["fake"]
+        assert stats["ttft"]["count"] == 1
+        assert stats["ttft"]["avg"] >= 0.05
+        assert stats["eval_tokens"] == 3
+
+    def test_stream_closed_early(self):
+        metrics = Metrics()
+        with FakeOllama("One two three.", latency=0.01) as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, metrics=metrics)
+            stream = agent.run_stream("hi", trace=True)
+            assert next(stream)
+            stream.close()
+        assert metrics.stats()["runs"]["fake"]["cancelled"] == 1
+        events = agent.last_trace.to_chrome()["traceEvents"]
+        (run,) = [e for e in events if e.get("name") == "run"]
+        assert run["args"]["outcome"] == "cancelled"
+        assert agent._trace is None and agent._pinned is None
+
+    def test_arun_and_errors(self):
+        metrics = Metrics()
+        agent = OllamaAgent(model="fake", base_url="http://127.0.0.1:1", metrics=metrics)
+        assert asyncio.run(agent.arun("hi")).startswith("Error:")
+        stats = metrics.stats()
+        assert stats["llm"]["fake"]["errors"] == 1
+        assert stats["runs"]["fake"]["error"] == 1
+
+    def test_cache_hits(self, tmp_path):
+        metrics = Metrics()
+        calls = []
+
+        def lookup(x):
+            calls.append(x)
+            return x.upper()
+
+        tools = {"lookup": _make_tool(lookup, "Look up", cache_ttl=60)}
+        replies = ["TOOL: lookup\nINPUT: a", "Done."]
+        with FakeOllama(replies) as fake:
+            agent = OllamaAgent(
+                model="fake", base_url=fake.url, tools=tools, temperature=0,
+                response_cache=DiskResponseCache(tmp_path / "cache.db"), metrics=metrics,
+            )
+            agent.run("go")
+            agent.reset()
+            agent.run("go")
+            # Same conversation again: both model calls come from the cache
+            assert len(fake.requests) == 2
+        stats = metrics.stats()
+        assert stats["llm"]["fake"]["cache_hits"] == 2
+        assert stats["tools"]["lookup"]["cache_hits"] == 1
+        assert calls == ["a"]
+
+    def test_disabled(self):
+        with FakeOllama("Hi.") as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url)
+            agent.metrics = None
+            assert agent.run("hi") == "Hi."
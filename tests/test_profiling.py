@@ -0,0 +1,155 @@
+"""Tests for the profiling module."""
+
+import asyncio
+import json
+import threading
+import tracemalloc
+
+from langchain_core.messages import HumanMessage
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.profiling import Profiler, RunProfile, deep_size
+from ollama_agent.testing import FakeOllama
+
+
+def _busy():
+    return sum(i * i for i in range(20000))
+
+
+class TestDeepSize:
+    """Tests for deep_size."""
+
+    def test_counts_contents_once(self):
+        text = "x" * 10000
+        assert deep_size([text]) > 10000
+        assert deep_size([text, text]) < 2 * 10000
+        assert deep_size({"a": [1, 2]}) > deep_size({})
+
+    def test_messages(self):
+        short = [HumanMessage(content="hi")]
+        long = [HumanMessage(content="hi" * 5000)]
+        assert deep_size(long) - deep_size(short) >= 9990
+
+
+class TestRunProfile:
+    """Tests for RunProfile class."""
+
+    def test_report(self):
+        profile = RunProfile()
+        data = [bytearray(1000) for _ in range(100)]
+        _busy()
+        report = profile.finish(["a", "b"], top=5, model="m")
+        assert report["model"] == "m"
+        assert report["messages"]["count"] == 2
+        assert len(report["cpu"]) <= 5
+        assert any("_busy" in row["function"] for row in report["cpu"])
+        assert report["memory"]["peak_bytes"] >= report["memory"]["traced_bytes"] > 0
+        assert report["memory"]["top"][0]["size_diff"] > 0
+        assert profile.stats is not None
+        assert not tracemalloc.is_tracing()
+        del data
+
+    def test_worker_thread(self):
+        profile = RunProfile(memory=False)
+
+        def work():
+            with profile.thread():
+                _busy()
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+        report = profile.finish([])
+        assert any("_busy" in row["function"] for row in report["cpu"])
+        assert "memory" not in report
+
+    def test_nested_tracemalloc(self):
+        outer = RunProfile(cpu=False)
+        inner = RunProfile(cpu=False)
+        inner.finish([])
+        assert tracemalloc.is_tracing()
+        outer.finish([])
+        assert not tracemalloc.is_tracing()
+
+
+class TestProfiler:
+    """Tests for Profiler class."""
+
+    def test_every(self):
+        profiler = Profiler(every=3, cpu=False, memory=False)
+        started = [profiler.start() for _ in range(6)]
+        assert [p is not None for p in started] == [True, False, False, True, False, False]
+        assert profiler.start(force=True) is not None
+
+    def test_writes_files(self, tmp_path):
+        profiler = Profiler(tmp_path, memory=False)
+        profile = profiler.start()
+        profiler.finish(profile, [], outcome="ok")
+        assert profile.path.parent == tmp_path
+        assert json.loads(profile.path.read_text())["outcome"] == "ok"
+        assert profile.path.with_suffix(".prof").exists()
+
+    def test_size_limit(self, tmp_path):
+        profiler = Profiler(tmp_path, memory=False, max_mb=0.0001)
+        for _ in range(3):
+            profiler.finish(profiler.start(), [])
+        total = sum(p.stat().st_size for p in tmp_path.iterdir())
+        assert total <= profiler.max_bytes
+
+
+class TestAgentProfiling:
+    """Tests for profiled OllamaAgent runs."""
+
+    def test_run_profile(self):
+        replies = ["TOOL: calculator\nINPUT: 2+2\nTOOL: calculator\nINPUT: 3+3", "Done."]
+        with FakeOllama(replies) as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url)
+            assert agent.run("math", profile=True) == "Done."
+        report = agent.last_profile.report
+        assert report["model"] == "fake"
+        assert report["outcome"] == "ok"
+        assert report["iterations"] == 2
+        assert report["messages"]["count"] == len(agent._messages)
+        # Tool calls on the pool threads are part of the CPU profile
+        functions = {name for _, _, name in agent.last_profile.stats.stats}
+        assert "_calculator" in functions
+        assert agent._profile is None
+
+    def test_stream_closed_early(self):
+        with FakeOllama("One two three.", latency=0.01) as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url)
+            stream = agent.run_stream("hi", profile=True)
+            assert next(stream)
+            assert tracemalloc.is_tracing()
+            stream.close()
+        assert not tracemalloc.is_tracing()
+        assert agent.last_profile.report["outcome"] == "cancelled"
+        assert agent._profile is None
+
+    def test_arun_cancelled(self):
+        async def main(agent):
+            task = asyncio.create_task(agent.arun("hi", profile=True))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        with FakeOllama("Hi.", latency=1.0) as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url)
+            asyncio.run(main(agent))
+        assert not tracemalloc.is_tracing()
+        assert agent.last_profile.report["outcome"] == "cancelled"
+
+    def test_sampled_by_profiler(self, tmp_path):
+        profiler = Profiler(tmp_path, every=2, memory=False)
+        with FakeOllama("Hi.") as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, profiler=profiler)
+            agent.run("hi")
+            asyncio.run(agent.arun("hi"))
+            "".join(agent.run_stream("hi"))
+        assert len(list(tmp_path.glob("run-*.json"))) == 2
+
+    def test_off_by_default(self):
+        with FakeOllama("Hi.") as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url)
+            agent.run("hi")
+        assert agent.last_profile is None
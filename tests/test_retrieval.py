@@ -0,0 +1,116 @@
+"""Tests for the retrieval module."""
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.retrieval import ToolIndex, tokenize
+from ollama_agent.testing import FakeOllama
+
+
+def _tool(description):
+    return {"func": lambda x="": f"ran {x}", "description": description}
+
+
+TOOLS = {
+    "weather_forecast": _tool("Get the weather forecast for a city"),
+    "stock_price": _tool("Look up the current price of a stock ticker"),
+    "send_email": _tool("Send an email message to a recipient"),
+    "translate": _tool("Translate text between languages"),
+    "unit_convert": _tool("Convert between units of measurement"),
+}
+
+
+def _system_prompt(fake, i=-1):
+    return fake.requests[i]["messages"][0]["content"]
+
+
+class TestToolIndex:
+    """Tests for ToolIndex class."""
+
+    def test_tokenize(self):
+        terms = tokenize("getWeather_forecasts for Paris")
+        assert terms == ["get", "weather", "forecast", "for", "pari"]
+        assert tokenize("class") == ["class"]
+
+    def test_search_ranks_relevant_tools(self):
+        index = ToolIndex(TOOLS)
+        assert index.search("what's the weather in Paris?", 1) == ["weather_forecast"]
+        assert set(index.search("email the stock price to Bob", 2)) == {"stock_price", "send_email"}
+
+    def test_name_outweighs_description(self):
+        tools = {
+            "translate": _tool("Change text into another language"),
+            "detect_language": _tool("Detect the language of a text, e.g. to translate it"),
+        }
+        assert ToolIndex(tools).search("translate this", 1) == ["translate"]
+
+    def test_pads_in_registration_order(self):
+        index = ToolIndex(TOOLS)
+        assert index.search("hello there", 2) == ["weather_forecast", "stock_price"]
+        assert index.search("convert 5 miles", 2) == ["unit_convert", "weather_forecast"]
+
+    def test_matches(self):
+        index = ToolIndex(TOOLS)
+        assert index.matches(dict(TOOLS))
+        assert not index.matches({**TOOLS, "extra": _tool("x")})
+        assert len(index) == 5
+
+
+class TestAgentToolRetrieval:
+    """Tests for OllamaAgent with tool_top_k."""
+
+    def test_prompt_lists_top_k(self):
+        with FakeOllama("Sunny.") as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, tools=dict(TOOLS), tool_top_k=2)
+            agent.run("What's the weather forecast in Oslo?")
+        prompt = _system_prompt(fake)
+        assert "weather_forecast" in prompt
+        assert sum(name in prompt for name in TOOLS) == 2
+
+    def test_selection_follows_each_query(self):
+        with FakeOllama(["Sunny.", "Done."]) as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, tools=dict(TOOLS), tool_top_k=1)
+            agent.run("weather in Oslo")
+            agent.run("translate hello to French")
+        assert "weather_forecast" in _system_prompt(fake, 0)
+        assert "translate" in _system_prompt(fake, 1)
+        assert "weather_forecast" not in _system_prompt(fake, 1)
+
+    def test_hidden_tool_still_runs(self):
+        replies = ["TOOL: unit_convert\nINPUT: 5 mi", "Done."]
+        with FakeOllama(replies) as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, tools=dict(TOOLS), tool_top_k=1)
+            assert agent.run("weather in Oslo") == "Done."
+        assert "ran 5 mi" in fake.requests[1]["messages"][-1]["content"]
+
+    def test_unknown_tool_falls_back_to_all_tools(self):
+        replies = ["TOOL: forecast\nINPUT: Oslo", "Done."]
+        with FakeOllama(replies) as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, tools=dict(TOOLS), tool_top_k=1)
+            agent.run("weather in Oslo")
+        assert all(name in _system_prompt(fake, 1) for name in TOOLS)
+        assert "now lists all available tools" in fake.requests[1]["messages"][-1]["content"]
+        assert agent._prompt_tools is None
+
+    def test_off_when_registry_is_small(self):
+        with FakeOllama("Hi.") as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, tools=dict(TOOLS), tool_top_k=5)
+            agent.run("hi")
+        assert all(name in _system_prompt(fake) for name in TOOLS)
+        assert agent._tool_index is None
+
+    def test_index_rebuilt_when_tools_change(self):
+        tools = dict(TOOLS)
+        with FakeOllama("Ok.") as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, tools=tools, tool_top_k=1)
+            tools["fetch_news"] = _tool("Fetch the latest news headlines")
+            agent.run("latest news")
+        assert "fetch_news" in _system_prompt(fake)
+
+    def test_native_binds_selected_tools(self):
+        with FakeOllama("Sunny.") as fake:
+            agent = OllamaAgent(
+                model="fake", base_url=fake.url, tools=dict(TOOLS), tool_top_k=2, native_tools=True
+            )
+            agent.run("weather forecast")
+        names = [t["function"]["name"] for t in fake.requests[-1]["tools"]]
+        assert len(names) == 2
+        assert "weather_forecast" in names
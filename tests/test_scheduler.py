@@ -0,0 +1,180 @@
+"""Tests for the scheduler module."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+from langchain_core.messages import AIMessage
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.scheduler import (
+    BACKGROUND_PRIORITY,
+    Scheduler,
+    current_request,
+    scheduling,
+)
+
+
+def _wait_for(predicate, timeout=2.0):
+    """Poll until predicate() is true."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.001)
+
+
+def _grant_order(scheduler, requests):
+    """Queue (tenant, priority) requests behind a held slot, return grant order."""
+    order = []
+    threads = []
+
+    def worker(tenant, priority, label):
+        with scheduler.slot(tenant, priority):
+            order.append(label)
+
+    with scheduler.slot("holder"):
+        for i, (tenant, priority) in enumerate(requests):
+            t = threading.Thread(target=worker, args=(tenant, priority, f"{tenant}{i}"))
+            t.start()
+            threads.append(t)
+            _wait_for(lambda: scheduler.queued == i + 1)
+    for t in threads:
+        t.join()
+    return order
+
+
+class TestScheduler:
+    """Tests for Scheduler class."""
+
+    def test_rejects_zero_slots(self):
+        with pytest.raises(ValueError):
+            Scheduler(0)
+
+    def test_caps_in_flight(self):
+        scheduler = Scheduler(2)
+        active = {"now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def worker():
+            with scheduler.slot("t"):
+                with lock:
+                    active["now"] += 1
+                    active["max"] = max(active["max"], active["now"])
+                time.sleep(0.01)
+                with lock:
+                    active["now"] -= 1
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert active["max"] == 2
+        assert scheduler.in_flight == 0
+        assert scheduler.stats()["tenants"]["t"]["requests"] == 8
+
+    def test_priority_first(self):
+        order = _grant_order(Scheduler(1), [("a", 0), ("b", 0), ("c", 5)])
+        assert order[0] == "c2"
+
+    def test_fair_between_tenants(self):
+        # A batch from one tenant, then a single request from another
+        requests = [("batch", 0)] * 4 + [("user", 0)]
+        order = _grant_order(Scheduler(1), requests)
+        assert order.index("user4") <= 1
+
+    def test_weights(self):
+        scheduler = Scheduler(1, weights={"big": 3})
+        requests = [("big", 0)] * 6 + [("small", 0)] * 6
+        order = _grant_order(scheduler, requests)
+        first = [label.rstrip("0123456789") for label in order[:8]]
+        assert first.count("big") == 6
+
+    def test_records_wait(self):
+        clock = [0.0]
+        scheduler = Scheduler(1, clock=lambda: clock[0])
+        with scheduler.slot("a") as first:
+            assert first.wait == 0.0
+            done = []
+
+            def worker():
+                with scheduler.slot("b") as ticket:
+                    done.append(ticket.wait)
+
+            t = threading.Thread(target=worker)
+            t.start()
+            _wait_for(lambda: scheduler.queued == 1)
+            clock[0] = 2.5
+        t.join()
+        assert done == [2.5]
+        assert scheduler.stats()["tenants"]["b"]["max_wait"] == 2.5
+
+    def test_aslot(self):
+        scheduler = Scheduler(1)
+        order = []
+
+        async def worker(name, priority):
+            async with scheduler.aslot(name, priority):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        async def main():
+            await asyncio.gather(worker("first", 0), worker("low", 0), worker("high", 9))
+
+        asyncio.run(main())
+        assert order == ["first", "high", "low"]
+
+    def test_cancelled_waiter_frees_queue(self):
+        scheduler = Scheduler(1)
+
+        async def main():
+            async with scheduler.aslot("a"):
+                waiter = asyncio.ensure_future(scheduler.aslot("b").__aenter__())
+                await asyncio.sleep(0.01)
+                assert scheduler.queued == 1
+                waiter.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await waiter
+            assert scheduler.queued == 0
+            assert scheduler.in_flight == 0
+
+        asyncio.run(main())
+
+    def test_scheduling_context(self):
+        assert current_request() == (None, None)
+        with scheduling("acme", 3):
+            assert current_request() == ("acme", 3)
+        assert current_request() == (None, None)
+
+
+class TestAgentScheduling:
+    """Tests for the scheduler wired into OllamaAgent."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_model_calls_take_slots(self, mock_chat):
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = AIMessage(content="ok")
+        mock_chat.return_value = mock_llm
+        scheduler = Scheduler(1)
+
+        agent = OllamaAgent(scheduler=scheduler, tenant="acme")
+        agent.run("hi")
+        with scheduling("other"):
+            agent.run("hi")
+
+        tenants = scheduler.stats()["tenants"]
+        assert tenants["acme"]["requests"] == 1
+        assert tenants["other"]["requests"] == 1
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_background_calls_low_priority(self, mock_chat):
+        agent = OllamaAgent(scheduler=Scheduler(1), priority=5)
+        assert agent._slot_args(background=True) == ("default", BACKGROUND_PRIORITY)
+        assert agent._slot_args(background=False) == ("default", 5)
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_no_scheduler_by_default(self, mock_chat):
+        assert OllamaAgent().scheduler is None
@@ -0,0 +1,181 @@
+"""Tests for the server module, end to end against a fake Ollama."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.server import AgentServer, main
+from ollama_agent.sessions import SessionManager
+from ollama_agent.store import ConversationStore
+from ollama_agent.testing import FakeOllama
+
+
+def _serve(fake, tmp_path, test, **kwargs):
+    """Run an async test against an AgentServer backed by a fake Ollama."""
+    agent = OllamaAgent(model="fake", base_url=fake.url)
+    manager = SessionManager(agent, store=ConversationStore(tmp_path))
+    server = AgentServer(manager, host="127.0.0.1", port=0, **kwargs)
+
+    async def main():
+        async with server:
+            async with httpx.AsyncClient(base_url=server.url, timeout=10) as client:
+                return await test(client, server)
+
+    return asyncio.run(main())
+
+
+class TestAgentServer:
+    """Tests for AgentServer class."""
+
+    def test_chat(self, tmp_path):
+        async def test(client, server):
+            resp = await client.post("/chat", json={"message": "hi"})
+            assert resp.status_code == 200
+            assert resp.json() == {"response": "Hello there.", "session_id": None}
+
+        with FakeOllama("Hello there.") as fake:
+            _serve(fake, tmp_path, test)
+
+    def test_chat_runs_tools(self, tmp_path):
+        async def test(client, server):
+            resp = await client.post("/chat", json={"message": "2+2?"})
+            assert resp.json()["response"] == "It's 4."
+
+        with FakeOllama(["TOOL: calculator\nINPUT: 2+2", "It's 4."]) as fake:
+            _serve(fake, tmp_path, test)
+            assert "TOOL RESULT:\n4" in fake.requests[1]["messages"][-1]["content"]
+
+    def test_stream(self, tmp_path):
+        async def test(client, server):
+            lines = []
+            async with client.stream(
+                "POST", "/chat", json={"message": "hi", "stream": True}
+            ) as resp:
+                assert resp.headers["content-type"] == "application/x-ndjson"
+                async for line in resp.aiter_lines():
+                    lines.append(json.loads(line))
+            assert "".join(line.get("chunk", "") for line in lines) == "One two three."
+            assert lines[-1] == {"done": True, "session_id": None}
+
+        with FakeOllama("One two three.") as fake:
+            _serve(fake, tmp_path, test)
+
+    def test_sessions(self, tmp_path):
+        async def test(client, server):
+            await client.post("/chat", json={"message": "first", "session_id": "u1"})
+            await client.post("/chat", json={"message": "second", "session_id": "u1"})
+
+            resp = await client.get("/sessions/u1", params={"offset": 2, "limit": 1})
+            assert resp.json()["messages"] == [{"role": "user", "content": "second"}]
+
+            resp = await client.delete("/sessions/u1")
+            assert resp.status_code == 200
+            assert (await client.get("/sessions/u1")).status_code == 404
+
+        with FakeOllama("ok") as fake:
+            _serve(fake, tmp_path, test)
+            # The second turn carried the first one as context
+            assert len(fake.requests[1]["messages"]) == 4
+
+    def test_full_queue_rejected_with_429(self, tmp_path):
+        async def test(client, server):
+            requests = [client.post("/chat", json={"message": f"q{i}"}) for i in range(4)]
+            statuses = sorted(r.status_code for r in await asyncio.gather(*requests))
+            assert statuses == [200, 200, 429, 429]
+            assert server.rejected == 2
+
+        with FakeOllama("slow", latency=0.3) as fake:
+            _serve(fake, tmp_path, test, max_concurrency=1, max_queue=1)
+
+    def test_queue_timeout_returns_503(self, tmp_path):
+        async def test(client, server):
+            requests = [client.post("/chat", json={"message": f"q{i}"}) for i in range(2)]
+            responses = await asyncio.gather(*requests)
+            assert sorted(r.status_code for r in responses) == [200, 503]
+            assert any("Retry-After" in r.headers for r in responses)
+
+        with FakeOllama("slow", latency=0.3) as fake:
+            _serve(fake, tmp_path, test, max_concurrency=1, queue_timeout=0.05)
+
+    def test_bad_requests(self, tmp_path):
+        async def test(client, server):
+            assert (await client.post("/chat", content=b"nope")).status_code == 400
+            assert (await client.post("/chat", json={})).status_code == 400
+            bad_id = {"message": "hi", "session_id": "../x"}
+            assert (await client.post("/chat", json=bad_id)).status_code == 400
+            assert (await client.get("/chat")).status_code == 405
+            assert (await client.get("/missing")).status_code == 404
+
+        with FakeOllama() as fake:
+            _serve(fake, tmp_path, test)
+
+    def test_bad_content_length(self, tmp_path):
+        async def raw(server, request):
+            url = httpx.URL(server.url)
+            reader, writer = await asyncio.open_connection(url.host, url.port)
+            writer.write(request)
+            if b"short" in request:
+                writer.write_eof()
+            response = await reader.read()
+            writer.close()
+            return response.split(b"\r\n", 1)[0]
+
+        async def test(client, server):
+            head = b"POST /chat HTTP/1.1\r\nContent-Length: %s\r\n\r\n"
+            assert await raw(server, head % b"abc") == b"HTTP/1.1 400 Bad Request"
+            assert await raw(server, head % b"-5") == b"HTTP/1.1 400 Bad Request"
+            assert await raw(server, head % b"99999999") == b"HTTP/1.1 413 Payload Too Large"
+            assert await raw(server, head % b"50" + b"short") == b"HTTP/1.1 400 Bad Request"
+
+        with FakeOllama() as fake:
+            _serve(fake, tmp_path, test)
+
+    def test_unexpected_error_is_500(self, tmp_path, caplog):
+        (tmp_path / "broken.jsonl").write_text('["u", "hi"]\nnot json\n')
+
+        async def test(client, server):
+            resp = await client.post("/chat", json={"message": "hi", "session_id": "broken"})
+            assert resp.status_code == 500
+            assert resp.json() == {"error": "Internal server error"}
+            # The server keeps serving
+            assert (await client.get("/health")).status_code == 200
+
+        with FakeOllama() as fake:
+            _serve(fake, tmp_path, test)
+        assert "Error handling POST /chat" in caplog.text
+
+    def test_health(self, tmp_path):
+        async def test(client, server):
+            data = (await client.get("/health")).json()
+            assert data["status"] == "ok"
+            assert data["max_concurrency"] == 2
+            assert data["sessions"]["active"] == 0
+            assert data["endpoints"] is None
+            assert data["tool_pool"]["timeouts"] == 0
+
+        with FakeOllama() as fake:
+            _serve(fake, tmp_path, test, max_concurrency=2)
+
+    def test_metrics(self, tmp_path):
+        async def test(client, server):
+            await client.post("/chat", json={"message": "hi"})
+            resp = await client.get("/metrics")
+            assert resp.status_code == 200
+            assert resp.headers["content-type"].startswith("text/plain")
+            assert 'ollama_agent_llm_calls_total{model="fake"}' in resp.text
+            assert "ollama_agent_run_iterations_bucket" in resp.text
+
+        with FakeOllama() as fake:
+            _serve(fake, tmp_path, test)
+
+
+class TestMain:
+    """Tests for the console script."""
+
+    def test_help(self, capsys):
+        with pytest.raises(SystemExit):
+            main(["--help"])
+        assert "--max-queue" in capsys.readouterr().out
@@ -0,0 +1,234 @@
+"""Tests for the sessions module."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from unittest.mock import MagicMock, patch
+from langchain_core.messages import AIMessage
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.sessions import SessionManager
+from ollama_agent.store import ConversationStore
+
+
+class _Clock:
+    """Manually advanced clock for idle eviction tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _echo_llm(mock_chat):
+    """Make the mocked model answer with the last user message."""
+    mock_llm = MagicMock()
+    mock_llm.invoke.side_effect = lambda messages: AIMessage(
+        content=f"echo {messages[-1].content}"
+    )
+    mock_chat.return_value = mock_llm
+    return mock_llm
+
+
+class TestSessionManager:
+    """Tests for SessionManager class."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_sessions_share_model_and_prompt(self, mock_chat, tmp_path):
+        _echo_llm(mock_chat)
+        template = OllamaAgent()
+        manager = SessionManager(template, store=ConversationStore(tmp_path))
+
+        with manager.session("a") as a, manager.session("b") as b:
+            assert a is not b
+            assert a.llm is b.llm is template.llm
+            assert a._messages[0] is template._messages[0]
+        assert mock_chat.call_count == 1
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_tool_added_after_first_turn(self, mock_chat, tmp_path):
+        _echo_llm(mock_chat)
+        template = OllamaAgent(tools={"a": {"func": str, "description": "Tool a"}})
+        template.run("hi")
+        template.add_tool("b", str, "Tool b")
+        assert "- b: Tool b" not in template._messages[0].content
+        manager = SessionManager(template, store=ConversationStore(tmp_path))
+
+        assert "- b: Tool b" in template._fork()._messages[0].content
+        with manager.session("new") as agent:
+            assert "- b: Tool b" in agent._messages[0].content
+        # The template keeps its cached prompt and its tool update
+        assert "- b: Tool b" not in template._messages[0].content
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_sessions_keep_separate_history(self, mock_chat, tmp_path):
+        _echo_llm(mock_chat)
+        manager = SessionManager(OllamaAgent(), store=ConversationStore(tmp_path))
+
+        assert manager.run("a", "one") == "echo one"
+        manager.run("b", "two")
+        manager.run("a", "three")
+
+        with manager.session("a") as agent:
+            contents = [m["content"] for m in agent.get_history()[1:]]
+        assert contents == ["one", "echo one", "three", "echo three"]
+        assert manager.stats()["hits"] == 2
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_lru_eviction_spills_and_reloads(self, mock_chat, tmp_path):
+        _echo_llm(mock_chat)
+        manager = SessionManager(
+            OllamaAgent(), store=ConversationStore(tmp_path), max_sessions=2
+        )
+        manager.run("a", "first")
+        manager.run("b", "x")
+        manager.run("c", "y")
+
+        assert "a" not in manager
+        assert len(manager) == 2
+        assert manager.stats()["evictions"] == 1
+
+        with manager.session("a") as agent:
+            assert agent.get_history()[1]["content"] == "first"
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_idle_eviction(self, mock_chat, tmp_path):
+        _echo_llm(mock_chat)
+        clock = _Clock()
+        manager = SessionManager(
+            OllamaAgent(), store=ConversationStore(tmp_path), idle_timeout=60, clock=clock
+        )
+        manager.run("a", "hi")
+        clock.now = 30
+        manager.run("b", "hi")
+        clock.now = 75
+        manager.evict_idle()
+        assert "a" not in manager
+        assert "b" in manager
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_memory_cap(self, mock_chat, tmp_path):
+        _echo_llm(mock_chat)
+        manager = SessionManager(
+            OllamaAgent(), store=ConversationStore(tmp_path), max_memory_mb=0.01
+        )
+        for i in range(5):
+            manager.run(f"s{i}", "x" * 3000)
+        stats = manager.stats()
+        assert stats["evictions"] >= 1
+        assert stats["bytes"] <= manager.max_bytes
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_busy_session_not_evicted(self, mock_chat, tmp_path):
+        _echo_llm(mock_chat)
+        manager = SessionManager(
+            OllamaAgent(), store=ConversationStore(tmp_path), max_sessions=1
+        )
+        with manager.session("a") as agent:
+            manager.run("b", "hi")
+            assert "a" in manager
+            agent.run("still here")
+        assert len(manager) == 1
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_same_session_turns_serialized(self, mock_chat, tmp_path):
+        _echo_llm(mock_chat)
+        manager = SessionManager(OllamaAgent(), store=ConversationStore(tmp_path))
+        threads = [
+            threading.Thread(target=manager.run, args=("a", f"q{i}")) for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with manager.session("a") as agent:
+            assert len(agent.get_history()) == 17
+        # Every turn is logged exactly once
+        assert len(manager.store.load("a")) == 16
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_arun(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+
+        async def ainvoke(messages):
+            return AIMessage(content="async answer")
+
+        mock_llm.ainvoke.side_effect = ainvoke
+        mock_chat.return_value = mock_llm
+        manager = SessionManager(OllamaAgent(), store=ConversationStore(tmp_path))
+
+        async def main():
+            return await asyncio.gather(manager.arun("a", "hi"), manager.arun("b", "hi"))
+
+        assert asyncio.run(main()) == ["async answer", "async answer"]
+        assert len(manager) == 2
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_arun_cancelled_while_waiting(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+
+        async def ainvoke(messages):
+            return AIMessage(content="async answer")
+
+        mock_llm.ainvoke.side_effect = ainvoke
+        mock_chat.return_value = mock_llm
+        manager = SessionManager(OllamaAgent(), store=ConversationStore(tmp_path))
+        entered, done = threading.Event(), threading.Event()
+
+        def hold():
+            with manager.session("a"):
+                entered.set()
+                done.wait()
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        entered.wait()
+
+        async def main():
+            waiting = asyncio.create_task(manager.arun("a", "hi"))
+            await asyncio.sleep(0.05)
+            waiting.cancel()
+            try:
+                await waiting
+            except asyncio.CancelledError:
+                pass
+            done.set()
+            # The lock the cancelled turn would have taken is handed back
+            return await asyncio.wait_for(manager.arun("a", "again"), 2)
+
+        assert asyncio.run(main()) == "async answer"
+        holder.join()
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_arun_waiters_leave_default_executor_free(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+
+        async def ainvoke(messages):
+            # Like an async tool built on asyncio.to_thread
+            await asyncio.to_thread(time.sleep, 0.01)
+            return AIMessage(content="async answer")
+
+        mock_llm.ainvoke.side_effect = ainvoke
+        mock_chat.return_value = mock_llm
+        manager = SessionManager(OllamaAgent(), store=ConversationStore(tmp_path))
+
+        async def main():
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(3))
+            turns = [manager.arun("a", f"q{i}") for i in range(6)]
+            return await asyncio.wait_for(asyncio.gather(*turns), 5)
+
+        assert asyncio.run(main()) == ["async answer"] * 6
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_drop_and_delete(self, mock_chat, tmp_path):
+        _echo_llm(mock_chat)
+        store = ConversationStore(tmp_path)
+        manager = SessionManager(OllamaAgent(), store=store)
+        manager.run("a", "hi")
+        manager.drop("a", delete=True)
+        assert "a" not in manager
+        assert not store.exists("a")
+        assert manager.stats()["bytes"] == 0
@@ -0,0 +1,232 @@
+"""Tests for the store module."""
+
+import pytest
+
+from unittest.mock import MagicMock, patch
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.exceptions import ConfigurationError
+from ollama_agent.history import SUMMARY_NAME, is_summary, is_tool_update
+from ollama_agent.store import ConversationStore
+
+
+def _turns(start, count):
+    """Build user/assistant message pairs."""
+    messages = []
+    for i in range(start, start + count):
+        messages.append(HumanMessage(content=f"q{i}"))
+        messages.append(AIMessage(content=f"a{i}"))
+    return messages
+
+
+class TestConversationStore:
+    """Tests for ConversationStore class."""
+
+    def test_append_and_load_round_trip(self, tmp_path):
+        store = ConversationStore(tmp_path)
+        call = {"name": "weather", "args": {"input": "Paris"}, "id": "c1", "type": "tool_call"}
+        messages = [
+            HumanMessage(content="weather?"),
+            AIMessage(content="", tool_calls=[call]),
+            ToolMessage(content="sunny", tool_call_id="c1"),
+            AIMessage(content="It's sunny."),
+        ]
+        store.append("s1", messages[:2])
+        store.append("s1", messages[2:])
+
+        loaded = store.load("s1")
+        assert [type(m) for m in loaded] == [type(m) for m in messages]
+        assert loaded[1].tool_calls[0]["args"] == {"input": "Paris"}
+        assert loaded[2].tool_call_id == "c1"
+        assert loaded[3].content == "It's sunny."
+
+    def test_records_are_compact(self, tmp_path):
+        store = ConversationStore(tmp_path)
+        store.append("s1", [HumanMessage(content="hi")])
+        assert (tmp_path / "s1.jsonl").read_text() == '["u","hi"]\n'
+
+    def test_load_missing_session(self, tmp_path):
+        assert ConversationStore(tmp_path).load("nope") == []
+
+    def test_load_starts_from_last_summary(self, tmp_path):
+        store = ConversationStore(tmp_path)
+        store.append("s1", _turns(0, 3))
+        summary = SystemMessage(content="summary", name=SUMMARY_NAME)
+        store.append_summary("s1", summary, kept=2)
+        store.append("s1", _turns(3, 1))
+
+        loaded = store.load("s1")
+        assert is_summary(loaded[0])
+        assert [m.content for m in loaded[1:]] == ["q2", "a2", "q3", "a3"]
+
+    def test_kept_messages_span_earlier_summary(self, tmp_path):
+        store = ConversationStore(tmp_path)
+        store.append("s1", _turns(0, 3))
+        store.append_summary("s1", SystemMessage(content="s1", name=SUMMARY_NAME), kept=4)
+        store.append("s1", _turns(3, 1))
+        # Keeps q2..a3, two messages on each side of the first marker
+        store.append_summary("s1", SystemMessage(content="s2", name=SUMMARY_NAME), kept=4)
+
+        assert [m.content for m in store.load("s1")] == ["s2", "q2", "a2", "q3", "a3"]
+
+    def test_load_skips_records_before_marker(self, tmp_path):
+        store = ConversationStore(tmp_path)
+        store.append("s1", _turns(0, 2))
+        with open(tmp_path / "s1.jsonl", "ab") as f:
+            f.write(b"not json\n")
+        store.clear("s1")
+        store.append("s1", _turns(5, 1))
+        assert [m.content for m in store.load("s1")] == ["q5", "a5"]
+
+    def test_save_rewrites_snapshot(self, tmp_path):
+        store = ConversationStore(tmp_path)
+        store.append("s1", _turns(0, 5))
+        live = [SystemMessage(content="summary", name=SUMMARY_NAME)] + _turns(4, 1)
+        store.save("s1", live)
+
+        loaded = store.load("s1")
+        assert is_summary(loaded[0])
+        assert [m.content for m in loaded[1:]] == ["q4", "a4"]
+        assert len(list(store.iter_history("s1"))) == 3
+
+    def test_iter_history_pages_full_transcript(self, tmp_path):
+        store = ConversationStore(tmp_path)
+        store.append("s1", _turns(0, 3))
+        store.append_summary("s1", SystemMessage(content="sum", name=SUMMARY_NAME), 0)
+
+        page = list(store.iter_history("s1", offset=2, limit=3))
+        assert page == [
+            {"role": "user", "content": "q1"},
+            {"role": "assistant", "content": "a1"},
+            {"role": "user", "content": "q2"},
+        ]
+        assert list(store.iter_history("s1"))[-1] == {"role": "system", "content": "sum"}
+
+    def test_sessions_and_delete(self, tmp_path):
+        store = ConversationStore(tmp_path)
+        store.append("b", _turns(0, 1))
+        store.append("a", _turns(0, 1))
+        assert store.sessions() == ["a", "b"]
+        store.delete("a")
+        assert not store.exists("a")
+        assert store.sessions() == ["b"]
+
+    def test_rejects_unsafe_session_id(self, tmp_path):
+        with pytest.raises(ValueError):
+            ConversationStore(tmp_path).load("../etc/passwd")
+
+
+class TestAgentSessions:
+    """Tests for conversation persistence in OllamaAgent."""
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_turns_are_persisted_and_resumed(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = AIMessage(content="Hello Alice")
+        mock_chat.return_value = mock_llm
+        store = ConversationStore(tmp_path)
+
+        agent = OllamaAgent(store=store, session_id="alice")
+        agent.run("I'm Alice")
+
+        resumed = OllamaAgent(store=store, session_id="alice")
+        assert resumed.session_id == "alice"
+        assert resumed.get_history()[1:] == [
+            {"role": "user", "content": "I'm Alice"},
+            {"role": "assistant", "content": "Hello Alice"},
+        ]
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_tool_turns_are_persisted(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+        mock_llm.invoke.side_effect = [
+            AIMessage(content="TOOL: calculator\nINPUT: 2+2"),
+            AIMessage(content="4"),
+        ]
+        mock_chat.return_value = mock_llm
+        store = ConversationStore(tmp_path)
+
+        agent = OllamaAgent(store=store, session_id="s1")
+        agent.run("2+2?")
+
+        loaded = store.load("s1")
+        assert len(loaded) == len(agent._messages) - 1
+        assert loaded[2].content.startswith("TOOL RESULT:")
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_reset_clears_session(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = AIMessage(content="ok")
+        mock_chat.return_value = mock_llm
+        store = ConversationStore(tmp_path)
+
+        agent = OllamaAgent(store=store, session_id="s1")
+        agent.run("hi")
+        agent.reset()
+        assert store.load("s1") == []
+        assert len(list(store.iter_history("s1"))) == 2
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_compaction_writes_summary_marker(self, mock_chat, tmp_path):
+        mock_llm = MagicMock()
+
+        def invoke(messages):
+            if messages[0].content.startswith("Summarize"):
+                return AIMessage(content="earlier questions")
+            return AIMessage(content="answer " + "z" * 400)
+
+        mock_llm.invoke.side_effect = invoke
+        mock_chat.return_value = mock_llm
+        store = ConversationStore(tmp_path)
+
+        agent = OllamaAgent(history_token_budget=300, store=store, session_id="s1")
+        for i in range(5):
+            agent.run(f"question {i}")
+            agent._compactor.wait(2)
+
+        assert agent._compactor.compactions >= 1
+        loaded = store.load("s1")
+        assert [m.content for m in loaded] == [m.content for m in agent._messages[1:]]
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_resume_after_compaction_with_tool_update(self, mock_chat, tmp_path):
+        def invoke(messages):
+            if messages[0].content.startswith("Summarize"):
+                return AIMessage(content="earlier questions")
+            return AIMessage(content="answer " + "z" * 400)
+
+        mock_chat.return_value.invoke.side_effect = invoke
+        store = ConversationStore(tmp_path)
+        agent = OllamaAgent(tools={}, history_token_budget=300, store=store, session_id="s1")
+        agent._compactor.background = False
+        for i in range(5):
+            if i == 4:
+                agent.add_tool("shout", str.upper, "Uppercase text")
+            agent.run(f"question {i}")
+
+        assert agent._compactor.compactions >= 1
+        assert any(is_tool_update(m) for m in agent._messages[2:])
+        resumed = OllamaAgent(tools={}, store=store, session_id="s1")
+        expected = [m.content for m in agent._messages[1:] if not is_tool_update(m)]
+        assert [m.content for m in resumed._messages[1:]] == expected
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_fork_does_not_write_session(self, mock_chat, tmp_path):
+        agent = OllamaAgent(store=ConversationStore(tmp_path), session_id="s1")
+        assert agent._fork().session_id is None
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_resume_requires_store(self, mock_chat):
+        with pytest.raises(ConfigurationError):
+            OllamaAgent().resume("s1")
+
+    @patch("ollama_agent.agent.ChatOllama")
+    def test_get_history_pages(self, mock_chat):
+        agent = OllamaAgent()
+        agent._messages.extend(_turns(0, 3))
+        assert agent.get_history(offset=1, limit=2) == [
+            {"role": "user", "content": "q0"},
+            {"role": "assistant", "content": "a0"},
+        ]
+        assert len(list(agent.iter_history())) == 7
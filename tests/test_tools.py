@@ -1,14 +1,25 @@
 """Tests for the tools module."""
 
+import asyncio
+import inspect
+import threading
+import time
+
+import httpx
 import pytest
 from unittest.mock import patch, MagicMock
 
+from ollama_agent.cache import TTLCache
 from ollama_agent.tools import (
     TOOLS,
+    ToolRegistry,
+    _ToolFailure,
+    _cached,
     get_approval_type,
     is_command_blocked,
     register_tool,
     register_tool_func,
+    registry_version,
     unregister_tool,
     get_tool,
     get_all_tools,
@@ -138,6 +149,128 @@ class TestListDirectory:
         assert "ERROR" in result
 
 
+class TestAsyncBuiltins:
+    """Tests for the async variants of the network tools."""
+
+    def test_network_tools_have_async_variants(self):
+        for name in ("web_search", "weather", "wikipedia", "ip_info"):
+            assert inspect.iscoroutinefunction(TOOLS[name]["afunc"])
+
+    def test_async_weather(self):
+        resp = httpx.Response(200, text="Paris: +20C\n")
+        with patch("ollama_agent.tools._afetch", return_value=resp) as fetch:
+            result = asyncio.run(TOOLS["weather"]["afunc"]("Paris"))
+        assert result == "Paris: +20C"
+        assert fetch.call_args[0][0] == "https://wttr.in/Paris?format=3"
+
+    def test_async_wikipedia_not_found(self):
+        request = httpx.Request("GET", "https://en.wikipedia.org")
+        error = httpx.HTTPStatusError(
+            "not found", request=request, response=httpx.Response(404, request=request)
+        )
+        with patch("ollama_agent.tools._afetch", side_effect=error):
+            result = asyncio.run(TOOLS["wikipedia"]["afunc"]("Nope"))
+        assert "No Wikipedia article found" in result
+
+    def test_async_web_search_uses_thread(self):
+        results = [{"title": "T", "href": "https://x", "body": "B"}]
+        with patch("ollama_agent.tools._search", return_value=results):
+            result = asyncio.run(TOOLS["web_search"]["afunc"]("query"))
+        assert result.startswith("1. T")
+
+    def test_register_async_tool(self):
+        async def async_tool(x: str) -> str:
+            return x
+
+        register_tool_func("test_async_tool", async_tool, "Async tool")
+        assert inspect.iscoroutinefunction(_TOOLS["test_async_tool"]["func"])
+
+        # Cleanup
+        del _TOOLS["test_async_tool"]
+
+
+class TestToolResultCache:
+    """Tests for per-tool result caching."""
+
+    def test_network_builtins_are_cached(self):
+        for name in ("web_search", "weather", "wikipedia", "ip_info"):
+            assert isinstance(TOOLS[name]["cache"], TTLCache)
+        assert "cache" not in TOOLS["calculator"]
+
+    def test_cached_function_called_once_per_input(self):
+        calls = []
+
+        def lookup(key):
+            calls.append(key)
+            return key.upper()
+
+        wrapped = _cached(lookup, TTLCache(ttl=60))
+        assert wrapped("a") == "A"
+        assert wrapped("a") == "A"
+        assert wrapped("b") == "B"
+        assert calls == ["a", "b"]
+
+    def test_failures_not_cached(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            return _ToolFailure("Weather fetch failed: timeout")
+
+        wrapped = _cached(flaky, TTLCache(ttl=60))
+        wrapped()
+        wrapped()
+        assert len(calls) == 2
+
+    def test_stale_result_refreshed_in_background(self):
+        now = [0.0]
+        refreshed = threading.Event()
+        values = iter(["old", "new"])
+
+        def lookup(key):
+            value = next(values)
+            if value == "new":
+                refreshed.set()
+            return value
+
+        wrapped = _cached(lookup, TTLCache(ttl=10, stale_ttl=100, clock=lambda: now[0]))
+        assert wrapped("k") == "old"
+        now[0] = 20
+        assert wrapped("k") == "old"
+        assert refreshed.wait(2)
+        for _ in range(100):
+            if wrapped.cache.get(("k",))[0] == "new":
+                break
+            time.sleep(0.01)
+        assert wrapped("k") == "new"
+
+    def test_async_wrapper_shares_cache(self):
+        async def alookup(key):
+            return key * 2
+
+        cache = TTLCache(ttl=60)
+        wrapped = _cached(alookup, cache)
+        assert inspect.iscoroutinefunction(wrapped)
+        assert asyncio.run(wrapped("ab")) == "abab"
+        assert cache.get(("ab",)) == ("abab", False)
+
+    def test_register_tool_func_with_cache_ttl(self):
+        calls = []
+
+        def expensive(x):
+            calls.append(x)
+            return x
+
+        register_tool_func("test_cached_tool", expensive, "Cached", cache_ttl=60)
+        try:
+            _TOOLS["test_cached_tool"]["func"]("q")
+            _TOOLS["test_cached_tool"]["func"]("q")
+            assert calls == ["q"]
+            assert _TOOLS["test_cached_tool"]["cache"].stats()["hits"] == 1
+        finally:
+            del _TOOLS["test_cached_tool"]
+
+
 class TestToolRegistration:
     """Tests for tool registration functions."""
 
@@ -197,6 +330,111 @@ class TestToolRegistration:
         with pytest.raises(ToolNotFoundError):
             unregister_tool("nonexistent_tool_xyz")
 
+    def test_register_with_timeout(self):
+        register_tool_func("test_timeout_tool", str.upper, "Timeout test", timeout=2.5)
+        try:
+            assert get_tool("test_timeout_tool")["timeout"] == 2.5
+        finally:
+            unregister_tool("test_timeout_tool")
+        assert "timeout" not in get_tool("calculator")
+
+    def test_registry_version(self):
+        before = registry_version()
+        register_tool_func("test_version_tool", lambda x: x, "Version test")
+        assert registry_version() > before
+        changed = registry_version()
+        unregister_tool("test_version_tool")
+        assert registry_version() > changed
+
+
+class TestToolRegistry:
+    """Tests for the copy-on-write ToolRegistry."""
+
+    @staticmethod
+    def _tool(description="A tool"):
+        return {"func": lambda x: x, "description": description}
+
+    def test_snapshot_is_immutable(self):
+        registry = ToolRegistry()
+        registry.register("a", self._tool())
+        snapshot = registry.snapshot()
+        registry.register("b", self._tool())
+        registry.unregister("a")
+        assert list(snapshot.tools) == ["a"]
+        assert list(registry) == ["b"]
+        with pytest.raises(TypeError):
+            snapshot.tools["c"] = self._tool()
+
+    def test_every_write_bumps_version(self):
+        registry = ToolRegistry()
+        versions = [registry.version]
+        registry["a"] = self._tool()
+        versions.append(registry.version)
+        registry.update({"b": self._tool(), "c": self._tool()})
+        versions.append(registry.version)
+        del registry["a"]
+        versions.append(registry.version)
+        assert versions == [0, 1, 2, 3]
+        assert registry.copy().keys() == {"b", "c"}
+        with pytest.raises(KeyError):
+            del registry["a"]
+
+    def test_register_and_unregister(self):
+        registry = ToolRegistry(approvals={"shell": "commands"})
+        registry.register("shell", self._tool())
+        registry.register("save", self._tool(), requires_approval="files")
+        with pytest.raises(ToolRegistrationError):
+            registry.register("save", self._tool())
+        assert dict(registry.snapshot().approvals) == {"shell": "commands", "save": "files"}
+        registry.unregister("save")
+        assert "save" not in registry.snapshot().approvals
+        with pytest.raises(ToolNotFoundError):
+            registry.unregister("save")
+
+    def test_register_many(self):
+        registry = ToolRegistry()
+        registry.register("b", self._tool())
+        tools = {name: self._tool() for name in ("a", "c", "b", "d")}
+        with pytest.raises(ToolRegistrationError):
+            registry.register_many(tools, {"a": "files", "d": "commands"})
+        # One change adds the tools before the duplicate
+        assert registry.version == 2
+        assert list(registry) == ["b", "a", "c"]
+        assert dict(registry.snapshot().approvals) == {"a": "files"}
+        registry.register_many({})
+        assert registry.version == 2
+
+    def test_concurrent_writes(self):
+        registry = ToolRegistry()
+        registry.register("keep", self._tool())
+        errors = []
+
+        def churn(worker):
+            try:
+                for i in range(200):
+                    name = f"tool_{worker}_{i}"
+                    registry.register(name, self._tool())
+                    snapshot = registry.snapshot()
+                    assert name in snapshot.tools and "keep" in snapshot.tools
+                    if i % 2:
+                        registry.unregister(name)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=churn, args=(w,)) for w in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert len(registry) == 1 + 8 * 100
+        assert registry.version == 1 + 8 * 300
+
+    def test_global_registry(self):
+        assert isinstance(TOOLS, ToolRegistry)
+        assert TOOLS.version == registry_version()
+        assert TOOLS.snapshot().approvals["run_command"] == "commands"
+
 
 class TestToolQuery:
     """Tests for tool query functions."""
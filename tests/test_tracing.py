@@ -0,0 +1,134 @@
+"""Tests for the tracing module."""
+
+import asyncio
+import json
+import threading
+import time
+
+from ollama_agent.agent import OllamaAgent
+from ollama_agent.testing import FakeOllama
+from ollama_agent.tracing import Trace, Tracer
+
+
+def _spans(trace):
+    return [e for e in trace.to_chrome()["traceEvents"] if e["ph"] == "X"]
+
+
+class TestTrace:
+    """Tests for Trace class."""
+
+    def test_add_and_export(self):
+        trace = Trace()
+        start = time.perf_counter()
+        trace.add("llm", "llm", start, start + 0.25, model="m", skipped=None)
+        data = trace.to_chrome()
+        (meta,) = [e for e in data["traceEvents"] if e["ph"] == "M"]
+        assert meta["args"]["name"] == threading.current_thread().name
+        (span,) = _spans(trace)
+        assert span["name"] == "llm"
+        assert span["cat"] == "llm"
+        assert span["dur"] == 250000
+        assert span["ts"] >= 0
+        assert span["args"] == {"model": "m"}
+        assert span["pid"] == meta["pid"]
+        assert abs(trace.duration - (span["ts"] + span["dur"]) / 1e6) < 1e-9
+
+    def test_span_context_manager(self):
+        trace = Trace()
+        with trace.span("parse", "parse") as args:
+            args["calls"] = 2
+        assert _spans(trace)[0]["args"] == {"calls": 2}
+
+    def test_span_per_thread(self):
+        trace = Trace()
+
+        def work():
+            with trace.span("tool", "tool"):
+                pass
+
+        thread = threading.Thread(target=work, name="worker")
+        thread.start()
+        thread.join()
+        work()
+        names = {e["args"]["name"] for e in trace.to_chrome()["traceEvents"] if e["ph"] == "M"}
+        assert "worker" in names
+        assert len({e["tid"] for e in _spans(trace)}) == 2
+
+    def test_save(self, tmp_path):
+        trace = Trace()
+        trace.add("run", "run", trace.started)
+        path = trace.save(tmp_path / "sub" / "run.json")
+        data = json.loads(path.read_text())
+        assert data["displayTimeUnit"] == "ms"
+        assert data["traceEvents"][-1]["name"] == "run"
+
+
+class TestTracer:
+    """Tests for Tracer class."""
+
+    def test_sampling(self):
+        draws = iter([0.05, 0.5])
+        tracer = Tracer(sample_rate=0.1, rng=lambda: next(draws))
+        assert isinstance(tracer.sample(), Trace)
+        assert tracer.sample() is None
+        assert Tracer(sample_rate=0).sample() is None
+
+    def test_record_keeps_and_writes(self, tmp_path):
+        tracer = Tracer(tmp_path, keep=2)
+        paths = [tracer.record(Trace()) for _ in range(3)]
+        assert len(tracer.traces) == 2
+        assert len({p.name for p in paths}) == 3
+        assert all(p.exists() and p.parent == tmp_path for p in paths)
+        assert Tracer().record(Trace()) is None
+
+
+class TestAgentTracing:
+    """Tests for traced OllamaAgent runs."""
+
+    def test_run_trace(self):
+        replies = ["TOOL: calculator\nINPUT: 2+2\nTOOL: calculator\nINPUT: 3+3", "Done."]
+        with FakeOllama(replies) as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, tracer=Tracer(sample_rate=0))
+            assert agent.run("math", trace=True) == "Done."
+        spans = _spans(agent.last_trace)
+        names = [s["name"] for s in spans]
+        assert names.count("llm") == 2
+        assert names.count("calculator") == 2
+        assert names.count("parse") == 2
+        run = next(s for s in spans if s["name"] == "run")
+        assert run["args"] == {"model": "fake", "iterations": 2, "outcome": "ok"}
+        # Everything nests inside the run span
+        for span in spans:
+            assert run["ts"] <= span["ts"]
+            assert span["ts"] + span["dur"] <= run["ts"] + run["dur"] + 1
+        # Parallel tool calls run on pool threads
+        tool_tids = {s["tid"] for s in spans if s["cat"] == "tool"}
+        assert run["tid"] not in tool_tids
+        assert agent.tracer.traces[-1] is agent.last_trace
+
+    def test_approval_span(self):
+        with FakeOllama(["TOOL: run_command\nINPUT: ls", "No."]) as fake:
+            agent = OllamaAgent(
+                model="fake", base_url=fake.url, approval_callback=lambda name, arg: False
+            )
+            agent.run("list", trace=True)
+        (span,) = [s for s in _spans(agent.last_trace) if s["name"] == "approval"]
+        assert span["args"] == {"tool": "run_command", "approved": False}
+
+    def test_sampled_by_tracer(self, tmp_path):
+        with FakeOllama("Hi.") as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, tracer=Tracer(tmp_path))
+            agent.run("hi")
+            asyncio.run(agent.arun("hi"))
+            "".join(agent.run_stream("hi"))
+        assert len(list(tmp_path.glob("run-*.json"))) == 3
+        stream_llm = next(s for s in _spans(agent.last_trace) if s["name"] == "llm")
+        assert "ttft_ms" in stream_llm["args"]
+        assert stream_llm["args"]["eval_count"] == 1
+
+    def test_not_sampled(self):
+        with FakeOllama("Hi.") as fake:
+            agent = OllamaAgent(model="fake", base_url=fake.url, tracer=Tracer(sample_rate=0))
+            agent.run("hi")
+        assert agent.last_trace is None
+        assert agent._trace is None